@@ -0,0 +1,127 @@
+"""
+Reports, per pointer and for each of the conversion entry points: the number
+of stripped copies made of the input, the bytes those copies allocate (as
+measured by tracemalloc), the peak memory allocated during the conversion
+and the time taken.
+
+    python -m benchmarks.allocations [--records 1000]
+"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from statistics import mean
+from time import perf_counter
+from unittest import mock
+
+from benchmarks.corpus import ASID, NHS_NUMBER, data_pointers
+from nrlf_converter import nrl_to_r4, nrl_to_r4_direct, nrl_to_r4_many
+from nrlf_converter.utils.utils import strip_empty_json_paths
+
+# Modules that strip the input pointer during conversion
+STRIPPING_MODULES = (
+    "nrlf_converter.convert_nrl_to_r4.nrl_to_r4",
+    "nrlf_converter.utils.validation.model",
+)
+
+
+def _convert_many(document_pointer: dict):
+    (result,) = nrl_to_r4_many([(document_pointer, NHS_NUMBER, ASID)])
+    return result
+
+
+def _copy_size(document_pointer: dict) -> int:
+    tracemalloc.start()
+    copy = strip_empty_json_paths(document_pointer)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copy
+    return size
+
+
+def _copies_per_pointer(convert, document_pointers) -> float:
+    copies = 0
+
+    def _counting_strip(json, in_place=False):
+        nonlocal copies
+        copies += type(json) is dict and not in_place
+        return strip_empty_json_paths(json, in_place=in_place)
+
+    patches = [
+        mock.patch(f"{module}.strip_empty_json_paths", _counting_strip)
+        for module in STRIPPING_MODULES
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        for document_pointer in document_pointers:
+            convert(document_pointer)
+    finally:
+        for patch in patches:
+            patch.stop()
+    return copies / len(document_pointers)
+
+
+def _reset_peak():
+    # tracemalloc.reset_peak is new in Python 3.9. Before that, restarting
+    # tracemalloc resets the peak, but it forgets the memory traced so far, so
+    # memory allocated before a conversion and freed by it is not subtracted
+    # from its peak: on Python 3.8 the peaks are higher, and are only
+    # comparable with each other
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.stop()
+        tracemalloc.start()
+
+
+def _peak_per_pointer(convert, document_pointers) -> float:
+    peaks = []
+    tracemalloc.start()
+    for document_pointer in document_pointers:
+        _reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        convert(document_pointer)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+    return mean(peaks)
+
+
+def _time_per_pointer(convert, document_pointers) -> float:
+    start = perf_counter()
+    for document_pointer in document_pointers:
+        convert(document_pointer)
+    return (perf_counter() - start) / len(document_pointers)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000)
+    args = parser.parse_args()
+    document_pointers = data_pointers(n_records=args.records)
+    copy_size = mean(map(_copy_size, document_pointers))
+
+    sys.stdout.write(
+        f"{'entry point':<18} {'copies':>6} {'copied bytes':>12}"
+        f" {'peak bytes':>10} {'µs':>6}\n"
+    )
+    for name, convert in (
+        ("nrl_to_r4", lambda pointer: nrl_to_r4(pointer, NHS_NUMBER, ASID)),
+        (
+            "nrl_to_r4_direct",
+            lambda pointer: nrl_to_r4_direct(pointer, NHS_NUMBER, ASID),
+        ),
+        ("nrl_to_r4_many", _convert_many),
+    ):
+        copies = _copies_per_pointer(convert, document_pointers=document_pointers)
+        peak = _peak_per_pointer(convert, document_pointers=document_pointers)
+        seconds = _time_per_pointer(convert, document_pointers=document_pointers)
+        sys.stdout.write(
+            f"{name:<18} {copies:>6.1f} {copies * copy_size:>12.0f}"
+            f" {peak:>10.0f} {seconds * 1e6:>6.0f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Builds benchmark corpora from the test data. Each distinct record is a copy of
+one of the test pointers with its own logical id, in which a given share of
+records have SSP content, a 'relatesTo' and a long (12 character, REF) ODS
+code. Corpora of synthetic records (see benchmarks.generator) can be built
+with the same mix instead. A corpus of any size cycles over a pool of at most
+'pool_size' distinct records, so that large corpora do not need to be held in
+memory.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from itertools import cycle, islice
+from pathlib import Path
+from random import Random
+from typing import Iterator, List
+
+from benchmarks.generator import Distribution, ods_code_lengths, records
+from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import _document_reference
+from nrlf_converter.nrl.constants import SSP
+from nrlf_converter.nrl.document_pointer import DocumentPointer
+
+PATH_TO_DATA = (
+    Path(__file__).parent.parent / "nrlf_converter" / "nrl" / "tests" / "data"
+)
+NHS_NUMBER = "3964056618"
+ASID = "230811201350"
+DEFAULT_POOL_SIZE = 10_000
+DEFAULT_SEED = 0
+ORGANISATION_URL = "https://directory.spineservices.nhs.uk/STU3/Organization/"
+SSP_FORMAT = {"system": SSP.SYSTEM, "code": SSP.CODE, "display": "Unstructured"}
+NOT_SSP_FORMAT = {"system": "https://not-ssp", "code": "not-ssp", "display": "Not"}
+
+
+@dataclass(frozen=True)
+class Mix:
+    """The share of records with each feature"""
+
+    ssp: float = 0.5
+    relates_to: float = 0.5
+    long_ods: float = 0.1
+
+
+def _templates() -> List[str]:
+    return [path.read_text() for path in sorted(PATH_TO_DATA.iterdir())]
+
+
+def data_pointers(n_records: int) -> List[dict]:
+    """'n_records' of the test pointers as they are, cycling over them"""
+    document_pointers = [json.loads(template) for template in _templates()]
+    return list(islice(cycle(document_pointers), n_records))
+
+
+def _record(template: str, index: int, mix: Mix, random: Random) -> tuple:
+    document_pointer = json.loads(template)
+    logical_id = document_pointer["logicalIdentifier"]["logicalId"]
+    document_pointer["logicalIdentifier"]["logicalId"] = f"{index:08x}{logical_id[8:]}"
+    if random.random() < mix.long_ods:
+        document_pointer["custodian"][
+            "reference"
+        ] = f"{ORGANISATION_URL}RAT{index % 1000:09d}"
+    is_ssp = random.random() < mix.ssp
+    for position, content in enumerate(document_pointer["content"]):
+        content["format"] = dict(
+            SSP_FORMAT if is_ssp and position == 0 else NOT_SSP_FORMAT
+        )
+    if random.random() >= mix.relates_to:
+        document_pointer.pop("relatesTo", None)
+    return document_pointer, NHS_NUMBER, ASID
+
+
+def generated_pool(
+    n_records: int,
+    mix: Mix = Mix(),
+    seed: int = DEFAULT_SEED,
+    pool_size: int = DEFAULT_POOL_SIZE,
+) -> List[tuple]:
+    """As 'pool', but with synthetic records from benchmarks.generator"""
+    distribution = Distribution(
+        ods_code_lengths=ods_code_lengths(long_ods=mix.long_ods),
+        ssp=mix.ssp,
+        relates_to=mix.relates_to,
+    )
+    return list(
+        records(
+            n_records=min(n_records, pool_size), distribution=distribution, seed=seed
+        )
+    )
+
+
+def pool(
+    n_records: int,
+    mix: Mix = Mix(),
+    seed: int = DEFAULT_SEED,
+    pool_size: int = DEFAULT_POOL_SIZE,
+) -> List[tuple]:
+    """The distinct (document_pointer, nhs_number, asid) records of a corpus"""
+    random = Random(seed)
+    templates = islice(cycle(_templates()), min(n_records, pool_size))
+    return [
+        _record(template=template, index=index, mix=mix, random=random)
+        for index, template in enumerate(templates)
+    ]
+
+
+def corpus(n_records: int, records: List[tuple]) -> Iterator[tuple]:
+    """'n_records' records, cycling over the pool of 'records'"""
+    return islice(cycle(records), n_records)
+
+
+def pointers(records: List[tuple]) -> list:
+    return [document_pointer for document_pointer, _, _ in records]
+
+
+def prepared_pointers(records: List[tuple]) -> list:
+    # Stripped and with the aliases replaced, as parse_obj validates them
+    return list(map(DocumentPointer._prepare_obj, pointers(records)))
+
+
+def document_references(records: List[tuple]) -> list:
+    return [
+        _document_reference(
+            _document_pointer=DocumentPointer.parse_obj(document_pointer),
+            nhs_number=nhs_number,
+            asid=asid,
+        )
+        for document_pointer, nhs_number, asid in records
+    ]
+
+
+def describe(mix: Mix, seed: int, pool_size: int, generated: bool = False) -> dict:
+    return {
+        "source": "generated" if generated else "test data",
+        "mix": asdict(mix),
+        "seed": seed,
+        "pool_size": pool_size,
+    }
@@ -0,0 +1,355 @@
+"""
+Generates a deterministic stream of synthetic NRL document pointer records,
+for benchmarking and load-testing at any volume. The same seed and
+Distribution always give the same records. Records are in the form read by
+the command line (and so by any bulk path):
+
+    {"pointer": {...}, "nhs_number": "...", "asid": "..."}
+
+A share of the records can be made deliberately invalid, in which case the
+record also has a "defect" naming what is wrong with it (see DEFECTS), which
+the converters ignore.
+
+    python -m benchmarks.generator [--records 1000] [--seed 0] [--invalid 0.05] \
+        [--ssp 0.3] [--relates-to 0.3] [--long-ods 0.1] > pointers.ndjson
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from random import Random
+from string import ascii_uppercase, digits
+from typing import IO, Callable, Dict, Iterator, List, Tuple
+
+from nrlf_converter.nrl.constants import REPLACES, SSP, UPDATE_DATE_FORMAT
+
+DEFAULT_SEED = 0
+ORGANISATION_URL = "https://directory.spineservices.nhs.uk/STU3/Organization/"
+RELATES_TO_URL = "https://psis-sync.national.ncrs.nhs.uk/DocumentReference/"
+PROFILE = "https://fhir.nhs.uk/STU3/StructureDefinition/NRL-DocumentReference-1"
+STABILITY_URL = (
+    "https://fhir.nhs.uk/STU3/StructureDefinition/Extension-NRL-ContentStability-1"
+)
+STABILITY_SYSTEM = "https://fhir.nhs.uk/STU3/CodeSystem/NRL-ContentStability-1"
+RECORD_CONTACT = {
+    "system": SSP.SYSTEM,
+    "code": "urn:nhs-ic:record-contact",
+    "display": "Contact details (HTTP Unsecured)",
+}
+UNSTRUCTURED = {"system": SSP.SYSTEM, "code": SSP.CODE, "display": "Unstructured"}
+TYPES = (
+    ("736253002", "Mental health crisis plan"),
+    ("887701000000100", "Emergency Health Care Plan"),
+    ("861421000000109", "End of Life Care Coordination Summary"),
+    ("1363501000000100", "Royal College of Physicians NEWS2 chart"),
+)
+PRACTICE_SETTINGS = (
+    ("310167005", "Urology service"),
+    ("788002001", "Adult mental health service"),
+    ("892811000000109", "Ambulance service"),
+)
+STABILITIES = (("static", "Static"), ("dynamic", "Dynamic"))
+CONTENT_TYPES = ("application/pdf", "text/html")
+ODS_CHARACTERS = ascii_uppercase + digits
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Pointers are indexed over this many seconds from the EPOCH
+TIME_SPAN = 3 * 365 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    The tunable distributions of the generated records. Each share is the
+    probability of a record (or a content item, for 'extension') having
+    the feature. 'ods_code_lengths' are (length, weight) pairs; 12 character
+    (REF) codes cause the logical id to be truncated by _nrlf_id.
+    """
+
+    ods_code_lengths: Tuple[Tuple[int, float], ...] = ((3, 0.5), (5, 0.4), (12, 0.1))
+    # Number of distinct organisations for each ODS code length
+    organisations: int = 1000
+    ssp: float = 0.3
+    relates_to: float = 0.3
+    # Share of relatesTo targets given as an identifier rather than a reference
+    relates_to_identifier: float = 0.5
+    extension: float = 0.8
+    context: float = 0.8
+    context_period: float = 0.5
+    max_content_items: int = 2
+    invalid: float = 0.0
+
+
+def _missing_type(record: dict):
+    del record["pointer"]["type"]
+
+
+def _unexpected_field(record: dict):
+    record["pointer"]["custodian"]["unexpected"] = "field"
+
+
+def _bad_status(record: dict):
+    record["pointer"]["status"] = "superseded"
+
+
+def _bad_indexed(record: dict):
+    record["pointer"]["indexed"] = "yesterday"
+
+
+def _bad_custodian(record: dict):
+    record["pointer"]["custodian"]["reference"] = "https://example.org/organisation"
+
+
+def _bad_relates_to(record: dict):
+    record["pointer"]["relatesTo"] = {
+        "code": REPLACES,
+        "target": {"reference": "https://example.org/not-a-document-reference"},
+    }
+
+
+def _http_ssp(record: dict):
+    content = record["pointer"]["content"][0]
+    content["format"] = dict(UNSTRUCTURED)
+    content["attachment"]["url"] = "http://example.org/document.pdf"
+
+
+def _missing_asid(record: dict):
+    record["pointer"]["content"][0]["format"] = dict(UNSTRUCTURED)
+    record["asid"] = None
+
+
+def _missing_nhs_number(record: dict):
+    record["nhs_number"] = ""
+
+
+# Each makes a valid record invalid, in place
+DEFECTS: Dict[str, Callable[[dict], None]] = {
+    "missing_type": _missing_type,
+    "unexpected_field": _unexpected_field,
+    "bad_status": _bad_status,
+    "bad_indexed": _bad_indexed,
+    "bad_custodian": _bad_custodian,
+    "bad_relates_to": _bad_relates_to,
+    "http_ssp": _http_ssp,
+    "missing_asid": _missing_asid,
+    "missing_nhs_number": _missing_nhs_number,
+}
+
+
+class _Generator:
+    def __init__(self, distribution: Distribution, seed: int):
+        self.distribution = distribution
+        self.random = Random(seed)
+        lengths, weights = zip(*distribution.ods_code_lengths)
+        self._ods_code_lengths = lengths
+        self._ods_code_weights = list(accumulate(weights))
+        # Organisations are drawn from their own stream, so that they only
+        # depend on the seed and the number of organisations
+        organisations = Random(seed)
+        self._ods_codes = {
+            length: [
+                "".join(organisations.choices(ODS_CHARACTERS, k=length))
+                for _ in range(distribution.organisations)
+            ]
+            for length in lengths
+        }
+        self._defects = sorted(DEFECTS)
+
+    def _chance(self, share: float) -> bool:
+        return self.random.random() < share
+
+    def _hex(self, n_characters: int) -> str:
+        return f"{self.random.getrandbits(4 * n_characters):0{n_characters}x}"
+
+    def _logical_id(self) -> str:
+        # A UUID followed by the legacy suffix, as in NRL
+        uuid = "-".join(map(self._hex, (8, 4, 4, 4, 12)))
+        return f"{uuid}-{self._hex(20)}"
+
+    def _ods_code(self) -> str:
+        (length,) = self.random.choices(
+            self._ods_code_lengths, cum_weights=self._ods_code_weights
+        )
+        return self.random.choice(self._ods_codes[length])
+
+    def _datetime(self) -> datetime:
+        return EPOCH + timedelta(seconds=self.random.randrange(TIME_SPAN))
+
+    def _coding(self, codings: tuple) -> dict:
+        code, display = self.random.choice(codings)
+        return {"system": "http://snomed.info/sct", "code": code, "display": display}
+
+    def _content_item(self, is_ssp: bool, logical_id: str) -> dict:
+        content_type = self.random.choice(CONTENT_TYPES)
+        extension = "pdf" if content_type == "application/pdf" else "html"
+        content_item = {
+            "attachment": {
+                "contentType": content_type,
+                "url": f"https://spine-proxy.national.ncrs.nhs.uk/{logical_id}.{extension}",
+                "creation": self._datetime().isoformat(),
+            },
+            "format": dict(UNSTRUCTURED if is_ssp else RECORD_CONTACT),
+        }
+        if self._chance(self.distribution.extension):
+            code, display = self.random.choice(STABILITIES)
+            coding = {"system": STABILITY_SYSTEM, "code": code, "display": display}
+            content_item["extension"] = [
+                {"url": STABILITY_URL, "valueCodeableConcept": {"coding": [coding]}}
+            ]
+        return content_item
+
+    def _relates_to(self) -> dict:
+        logical_id = self._logical_id()
+        if self._chance(self.distribution.relates_to_identifier):
+            target = {
+                "identifier": {
+                    "system": "urn:ietf:rfc:3986",
+                    "value": f"urn:uuid:{logical_id}",
+                }
+            }
+        else:
+            target = {"reference": f"{RELATES_TO_URL}{logical_id}"}
+        return {"code": REPLACES, "target": target}
+
+    def _context(self) -> dict:
+        context = {
+            "practiceSetting": {
+                "practiceSettingCoding": [self._coding(PRACTICE_SETTINGS)]
+            }
+        }
+        if self._chance(self.distribution.context_period):
+            start = self._datetime()
+            context["period"] = {"start": start.isoformat()}
+            if self._chance(0.5):
+                end = start + timedelta(days=self.random.randrange(1, 365))
+                context["period"]["end"] = end.isoformat()
+        return context
+
+    def _pointer(self) -> dict:
+        distribution = self.distribution
+        logical_id = self._logical_id()
+        ods_code = self._ods_code()
+        indexed = self._datetime()
+        last_modified = indexed.strftime(UPDATE_DATE_FORMAT)
+        n_content_items = self.random.randint(1, distribution.max_content_items)
+        is_ssp = self._chance(distribution.ssp)
+        pointer = {
+            "logicalIdentifier": {"logicalId": logical_id},
+            "meta": {
+                "versionId": "1",
+                "lastUpdated": last_modified,
+                "profile": [PROFILE],
+            },
+            "status": "current",
+            "type": self._coding(TYPES),
+            "indexed": indexed.isoformat(),
+            "lastModified": last_modified,
+            "author": {"reference": f"{ORGANISATION_URL}{self._ods_code()}"},
+            "custodian": {"reference": f"{ORGANISATION_URL}{ods_code}"},
+            "content": [
+                self._content_item(is_ssp=is_ssp and index == 0, logical_id=logical_id)
+                for index in range(n_content_items)
+            ],
+        }
+        if self._chance(distribution.relates_to):
+            pointer["relatesTo"] = self._relates_to()
+        if self._chance(distribution.context):
+            pointer["context"] = self._context()
+        return pointer
+
+    def record(self) -> dict:
+        record = {
+            "pointer": self._pointer(),
+            "nhs_number": f"{self.random.randrange(10**10):010d}",
+            "asid": f"{self.random.randrange(10**12):012d}",
+        }
+        if self._chance(self.distribution.invalid):
+            defect = self.random.choice(self._defects)
+            DEFECTS[defect](record)
+            record["defect"] = defect
+        return record
+
+
+def generate(
+    n_records: int,
+    distribution: Distribution = Distribution(),
+    seed: int = DEFAULT_SEED,
+) -> Iterator[dict]:
+    """Lazily generates 'n_records' records (see module docstring)"""
+    generator = _Generator(distribution=distribution, seed=seed)
+    for _ in range(n_records):
+        yield generator.record()
+
+
+def records(
+    n_records: int,
+    distribution: Distribution = Distribution(),
+    seed: int = DEFAULT_SEED,
+) -> Iterator[tuple]:
+    """As 'generate', as (document_pointer, nhs_number, asid) records"""
+    for record in generate(n_records=n_records, distribution=distribution, seed=seed):
+        yield record["pointer"], record["nhs_number"], record["asid"]
+
+
+def write_ndjson(records: Iterator[dict], stream: IO[str]):
+    for record in records:
+        stream.write(json.dumps(record))
+        stream.write("\n")
+
+
+def ods_code_lengths(long_ods: float) -> Tuple[Tuple[int, float], ...]:
+    """A share 'long_ods' of 12 character codes, the rest split as by default"""
+    short = 1 - long_ods
+    return ((3, short * 5 / 9), (5, short * 4 / 9), (12, long_ods))
+
+
+def distribution_from_args(args) -> Distribution:
+    return Distribution(
+        ods_code_lengths=ods_code_lengths(long_ods=args.long_ods),
+        organisations=args.organisations,
+        ssp=args.ssp,
+        relates_to=args.relates_to,
+        relates_to_identifier=args.relates_to_identifier,
+        extension=args.extension,
+        context=args.context,
+        context_period=args.context_period,
+        invalid=args.invalid,
+    )
+
+
+def add_arguments(parser: ArgumentParser):
+    default = Distribution()
+    long_ods = dict(default.ods_code_lengths)[12]
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--long-ods", type=float, default=long_ods)
+    parser.add_argument("--organisations", type=int, default=default.organisations)
+    parser.add_argument("--ssp", type=float, default=default.ssp)
+    parser.add_argument("--relates-to", type=float, default=default.relates_to)
+    parser.add_argument(
+        "--relates-to-identifier", type=float, default=default.relates_to_identifier
+    )
+    parser.add_argument("--extension", type=float, default=default.extension)
+    parser.add_argument("--context", type=float, default=default.context)
+    parser.add_argument("--context-period", type=float, default=default.context_period)
+    parser.add_argument("--invalid", type=float, default=default.invalid)
+
+
+def main(argv: List[str] = None):
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, default=1000)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    write_ndjson(
+        generate(
+            n_records=args.records,
+            distribution=distribution_from_args(args),
+            seed=args.seed,
+        ),
+        stream=sys.stdout,
+    )
+
+
+if __name__ == "__main__":
+    main()
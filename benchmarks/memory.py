@@ -0,0 +1,297 @@
+"""
+Profiles the memory allocated by each stage of the conversion with
+tracemalloc, over synthetic records (see benchmarks.generator) grouped by the
+shape of the pointer: its number of content items, and whether it has SSP
+content, a relatesTo and a context.
+
+For each stage and shape it reports, per pointer, the peak memory allocated
+while the stage runs and the memory retained by its result. For each stage it
+reports the lines that allocate the most memory. Finally it converts batches
+of records with nrl_to_r4_many, discarding the results, and reports the
+memory still allocated after each batch: as caches are bounded, this should
+level off once they are warm, so any growth after the first batch is flagged
+(and the exit status is 1).
+
+Tracing memory slows the conversion several times over, so the default run
+takes a few minutes. Requires Python 3.9+.
+
+    python -m benchmarks.memory [--per-shape 50] [--top 5] [--batches 5]
+        [--batch-size 32768] [--growth-threshold 1.0] [--json memory.json]
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from collections import defaultdict
+from dataclasses import asdict
+from itertools import islice
+from pathlib import Path
+from statistics import mean
+from typing import Callable, Dict, List, NamedTuple
+
+from benchmarks.corpus import document_references, pointers, prepared_pointers
+from benchmarks.generator import DEFAULT_SEED, Distribution, records
+from nrlf_converter import nrl_to_r4, nrl_to_r4_direct, nrl_to_r4_many
+from nrlf_converter.nrl.constants import ODS_CODE_CACHE_SIZE, SSP
+from nrlf_converter.nrl.document_pointer import DocumentPointer
+from nrlf_converter.utils.utils import strip_empty_json_paths
+from nrlf_converter.utils.validation.validators import _validate_against_schema
+
+PATH_TO_PACKAGE = Path(__file__).parent.parent / "nrlf_converter"
+# Records generated to find enough pointers of each shape
+SHAPE_SEARCH_RECORDS = 20_000
+# Enough records that the first batch fills the caches, e.g. of ODS codes
+BATCH_SIZE = 2 * ODS_CODE_CACHE_SIZE
+
+
+class Stage(NamedTuple):
+    # Builds the inputs of the stage from (document_pointer, nhs_number, asid)
+    prepare: Callable[[List[tuple]], list]
+    run: Callable[[object], object]
+
+
+def _parsed_pointers(records: List[tuple]) -> list:
+    return list(map(DocumentPointer.parse_obj, pointers(records)))
+
+
+STAGES: Dict[str, Stage] = {
+    "strip_empty_json_paths": Stage(prepare=pointers, run=strip_empty_json_paths),
+    # The nested ValidatedModel construction, from a prepared pointer
+    "_validate_against_schema": Stage(
+        prepare=prepared_pointers,
+        run=lambda pointer: _validate_against_schema(
+            obj=pointer, schema=DocumentPointer
+        ),
+    ),
+    "DocumentPointer.parse_obj": Stage(prepare=pointers, run=DocumentPointer.parse_obj),
+    "asdict": Stage(prepare=_parsed_pointers, run=asdict),
+    "DocumentReference.dict": Stage(
+        prepare=document_references,
+        run=lambda document_reference: document_reference.dict(),
+    ),
+    "nrl_to_r4": Stage(prepare=list, run=lambda record: nrl_to_r4(*record)),
+    "nrl_to_r4_direct": Stage(
+        prepare=list, run=lambda record: nrl_to_r4_direct(*record)
+    ),
+}
+
+
+def shape(document_pointer: dict) -> str:
+    content = document_pointer["content"]
+    is_ssp = any(
+        item["format"].get("system") == SSP.SYSTEM
+        and item["format"]["code"] == SSP.CODE
+        for item in content
+    )
+    features = (
+        ("ssp", is_ssp),
+        ("relatesTo", "relatesTo" in document_pointer),
+        ("context", "context" in document_pointer),
+    )
+    return " ".join(
+        (f"{len(content)} content", *(feature for feature, has in features if has))
+    )
+
+
+def _records_by_shape(per_shape: int, seed: int) -> Dict[str, List[tuple]]:
+    by_shape = defaultdict(list)
+    for record in records(n_records=SHAPE_SEARCH_RECORDS, seed=seed):
+        _records = by_shape[shape(record[0])]
+        if len(_records) < per_shape:
+            _records.append(record)
+    return dict(sorted(by_shape.items()))
+
+
+def _profile(stage: Stage, inputs: list) -> dict:
+    """Peak and retained bytes per input, while tracing"""
+    results = [None] * len(inputs)
+    peaks = []
+    start, _ = tracemalloc.get_traced_memory()
+    for index, _input in enumerate(inputs):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        results[index] = stage.run(_input)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    end, _ = tracemalloc.get_traced_memory()
+    return {"peak": mean(peaks), "retained": (end - start) / len(inputs)}
+
+
+# Allocations by the harness itself, and by tracemalloc, are not reported
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    filename = Path(frame.filename)
+    if PATH_TO_PACKAGE.parent in filename.parents:
+        filename = filename.relative_to(PATH_TO_PACKAGE.parent)
+    elif filename.is_absolute():
+        # e.g. the standard library
+        filename = filename.name
+    return f"{filename}:{frame.lineno}"
+
+
+def _top_sites(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int, per: int
+) -> List[dict]:
+    differences = after.filter_traces(_FILTERS).compare_to(
+        before.filter_traces(_FILTERS), "lineno"
+    )
+    return [
+        {
+            "site": _site(difference.traceback[0]),
+            "bytes": difference.size_diff / per,
+            "blocks": difference.count_diff / per,
+        }
+        for difference in islice(differences, top)
+        if difference.size_diff
+    ]
+
+
+def _stage_sites(stage: Stage, inputs: list, top: int) -> List[dict]:
+    """The lines that allocate the most memory retained by 'stage'"""
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    results = list(map(stage.run, inputs))  # noqa: F841, retained for the snapshot
+    after = tracemalloc.take_snapshot()
+    return _top_sites(before=before, after=after, top=top, per=len(inputs))
+
+
+def _growth(batches: int, batch_size: int, top: int, seed: int) -> dict:
+    """
+    The memory allocated after each batch, with its results discarded, and the
+    lines that allocated any growth after the first batch
+    """
+    _records = records(n_records=batches * batch_size, seed=seed)
+    allocated = []
+    first = None
+    for _ in range(batches):
+        for _ in nrl_to_r4_many(islice(_records, batch_size)):
+            pass
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        allocated.append(current)
+        if first is None:
+            first = tracemalloc.take_snapshot()
+    n_records = batch_size * (batches - 1) or 1
+    return {
+        "batch_size": batch_size,
+        "allocated": allocated,
+        "per_record": (allocated[-1] - allocated[0]) / n_records,
+        "top_sites": _top_sites(
+            before=first, after=tracemalloc.take_snapshot(), top=top, per=n_records
+        ),
+    }
+
+
+def _write_sites(sites: List[dict], unit: str):
+    for site in sites:
+        sys.stdout.write(
+            f"    {site['site']:<56} {site['bytes']:>10.1f} B"
+            f" {site['blocks']:>7.2f} blocks per {unit}\n"
+        )
+
+
+def _write_stage(name: str, profiles: Dict[str, dict], sites: List[dict]):
+    width = max(map(len, profiles))
+    sys.stdout.write(f"\n{name}\n  {'shape':<{width}} {'peak':>8} {'retained':>8}\n")
+    for _shape, profile in profiles.items():
+        sys.stdout.write(
+            f"  {_shape:<{width}} {profile['peak']:>8.0f} {profile['retained']:>8.0f}\n"
+        )
+    sys.stdout.write("  top allocation sites:\n")
+    _write_sites(sites=sites, unit="pointer")
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--per-shape", type=int, default=50)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--growth-threshold",
+        type=float,
+        default=1.0,
+        help="Bytes per record of growth after the first batch that is flagged",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--json", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    records_by_shape = _records_by_shape(per_shape=args.per_shape, seed=args.seed)
+    inputs = {
+        name: {
+            _shape: stage.prepare(_records)
+            for _shape, _records in records_by_shape.items()
+        }
+        for name, stage in STAGES.items()
+    }
+    # Warm up any caches, so that they are not attributed to the first shape
+    for name, stage in STAGES.items():
+        for _inputs in inputs[name].values():
+            list(map(stage.run, _inputs))
+
+    tracemalloc.start()
+    profiles = {
+        name: {
+            _shape: _profile(stage=stage, inputs=_inputs)
+            for _shape, _inputs in inputs[name].items()
+        }
+        for name, stage in STAGES.items()
+    }
+    sites = {
+        name: _stage_sites(
+            stage=stage,
+            inputs=[_input for _inputs in inputs[name].values() for _input in _inputs],
+            top=args.top,
+        )
+        for name, stage in STAGES.items()
+    }
+    del inputs
+    gc.collect()
+    growth = _growth(
+        batches=args.batches, batch_size=args.batch_size, top=args.top, seed=args.seed
+    )
+    tracemalloc.stop()
+    growth["flagged"] = growth["per_record"] > args.growth_threshold
+
+    sys.stdout.write("bytes per pointer, by stage and shape of pointer\n")
+    for name in STAGES:
+        _write_stage(name=name, profiles=profiles[name], sites=sites[name])
+
+    sys.stdout.write(
+        f"\nallocated after each batch of {args.batch_size} records of nrl_to_r4_many\n"
+    )
+    for batch, allocated in enumerate(growth["allocated"], start=1):
+        sys.stdout.write(f"  {batch:>4} {allocated:>12}\n")
+    sys.stdout.write(
+        f"growth after the first batch: {growth['per_record']:.2f} bytes per record"
+        f"{' - FLAGGED' if growth['flagged'] else ''}\n"
+    )
+    if growth["flagged"]:
+        sys.stdout.write("  top growth sites:\n")
+        _write_sites(sites=growth["top_sites"], unit="record")
+
+    if args.json:
+        report = {
+            "distribution": asdict(Distribution()),
+            "seed": args.seed,
+            "shapes": {_shape: len(r) for _shape, r in records_by_shape.items()},
+            "profiles": profiles,
+            "top_sites": sites,
+            "growth": growth,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if growth["flagged"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Reports the memory used per instance of the NRL and R4 models: the shallow
+size of each model class (including any instance __dict__), and the memory
+retained per parsed DocumentPointer (with all of its sub-models) as measured
+by tracemalloc over many instances built from the test data. With --intern,
+the retained memory is also reported with interning enabled, along with the
+interning hit rate.
+
+    python -m benchmarks.model_memory [--instances 10000] [--intern]
+"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from collections import defaultdict
+from dataclasses import fields, is_dataclass
+from statistics import mean
+from unittest import mock
+
+from benchmarks.corpus import ASID, NHS_NUMBER, data_pointers
+from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import _convert
+from nrlf_converter.nrl.document_pointer import DocumentPointer
+from nrlf_converter.r4.document_reference import DocumentReference
+from nrlf_converter.utils.validation.interning import (
+    disable_interning,
+    enable_interning,
+)
+
+
+def _shallow_size(obj) -> int:
+    return sys.getsizeof(obj) + sys.getsizeof(getattr(obj, "__dict__", None) or {})
+
+
+def _walk(obj, sizes: dict):
+    if is_dataclass(obj):
+        sizes[type(obj)].append(_shallow_size(obj))
+        for field in fields(obj):
+            _walk(getattr(obj, field.name), sizes=sizes)
+    elif isinstance(obj, list):
+        for item in obj:
+            _walk(item, sizes=sizes)
+
+
+def _shallow_sizes(document_pointers) -> dict:
+    sizes = defaultdict(list)
+    with mock.patch.object(DocumentReference, "dict", lambda self: self):
+        for document_pointer in document_pointers:
+            _walk(DocumentPointer.parse_obj(document_pointer), sizes=sizes)
+            _walk(_convert(document_pointer, NHS_NUMBER, ASID), sizes=sizes)
+    return sizes
+
+
+def _retained_per_instance(build, inputs) -> float:
+    # The inputs are already allocated, so only the instances are measured
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    instances = [build(obj) for obj in inputs]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(instances)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--instances", type=int, default=10_000)
+    parser.add_argument("--intern", action="store_true")
+    args = parser.parse_args()
+    document_pointers = data_pointers(n_records=args.instances)
+
+    sys.stdout.write(f"{'model':<40} {'bytes/instance':>14}\n")
+    sizes = _shallow_sizes(document_pointers=document_pointers[:100])
+    for cls, _sizes in sorted(sizes.items(), key=lambda item: item[0].__module__):
+        name = f"{cls.__module__.split('.')[1]}.{cls.__name__}"
+        sys.stdout.write(f"{name:<40} {mean(_sizes):>14.0f}\n")
+
+    retained = _retained_per_instance(
+        build=DocumentPointer.parse_obj, inputs=document_pointers
+    )
+    name = "DocumentPointer (retained, with sub-models)"
+    sys.stdout.write(f"{name:<40} {retained:>14.0f}\n")
+
+    if args.intern:
+        intern_cache = enable_interning()
+        retained = _retained_per_instance(
+            build=DocumentPointer.parse_obj, inputs=document_pointers
+        )
+        stats = intern_cache.stats()
+        disable_interning()
+        name = "DocumentPointer (retained, interned)"
+        sys.stdout.write(f"{name:<40} {retained:>14.0f}\n")
+        sys.stdout.write(
+            f"interning: {stats.hits} hits, {stats.misses} misses"
+            f" ({stats.hit_rate:.1%}), {stats.currsize} cached\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
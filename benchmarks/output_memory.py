@@ -0,0 +1,52 @@
+"""
+Reports the memory retained by converted documents (with nrl_to_r4_many),
+with and without SharedOutput, over a corpus built by benchmarks.corpus, in
+which every record has its own strings (as if read from a file) and a unique
+logical id.
+
+    python -m benchmarks.output_memory [--records 100000]
+"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+
+from benchmarks.corpus import pool
+from nrlf_converter import SharedOutput, nrl_to_r4_many
+
+
+def _retained_per_document(records, shared_output: SharedOutput = None) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    documents = [
+        result.document_reference
+        for result in nrl_to_r4_many(records, shared_output=shared_output)
+    ]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(documents)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+    # A pool as large as the corpus, so that every record is distinct
+    records = pool(n_records=args.records, pool_size=args.records)
+
+    plain = _retained_per_document(records)
+    shared_output = SharedOutput()
+    shared = _retained_per_document(records, shared_output=shared_output)
+    stats = shared_output.stats()
+
+    sys.stdout.write(f"{'output':<8} {'bytes/document':>14}\n")
+    sys.stdout.write(f"{'plain':<8} {plain:>14.0f}\n")
+    sys.stdout.write(f"{'shared':<8} {shared:>14.0f} ({shared / plain - 1:+.0%})\n")
+    sys.stdout.write(
+        f"shared parts: {stats.hits} hits, {stats.misses} misses"
+        f" ({stats.hit_rate:.1%}), {stats.currsize} cached\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Reports the throughput of nrl_to_r4_parallel for each combination of worker
+count and chunk size, against the single process nrl_to_r4_many.
+
+    python -m benchmarks.parallel [--records 100000] [--workers 1 2 4]
+        [--chunk-sizes 50 500 5000] [--seed 0] [--pool-size 10000]
+
+The records are built by benchmarks.corpus, with its default mix.
+"""
+
+import os
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+
+from benchmarks.corpus import DEFAULT_POOL_SIZE, DEFAULT_SEED, corpus, pool
+from nrlf_converter import nrl_to_r4_many, nrl_to_r4_parallel
+
+DEFAULT_CHUNK_SIZES = (50, 500, 5000)
+
+
+def _default_worker_counts():
+    n_cpus = os.cpu_count() or 1
+    return sorted({n for n in (1, 2, 4) if n <= n_cpus} | {n_cpus})
+
+
+def _time(results, n_records: int) -> float:
+    start = perf_counter()
+    n_results = sum(1 for _ in results)
+    assert n_results == n_records
+    return n_records / (perf_counter() - start)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=_default_worker_counts()
+    )
+    parser.add_argument(
+        "--chunk-sizes", type=int, nargs="+", default=list(DEFAULT_CHUNK_SIZES)
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE)
+    args = parser.parse_args()
+    records = list(
+        corpus(
+            n_records=args.records,
+            records=pool(
+                n_records=args.records, seed=args.seed, pool_size=args.pool_size
+            ),
+        )
+    )
+
+    sys.stdout.write(f"{'workers':>8} {'chunk':>6} {'records/s':>10}\n")
+    throughput = _time(nrl_to_r4_many(records), n_records=args.records)
+    sys.stdout.write(f"{'serial':>8} {'-':>6} {throughput:>10.0f}\n")
+    for workers in args.workers:
+        for chunk_size in args.chunk_sizes:
+            results = nrl_to_r4_parallel(
+                records=records, workers=workers, chunk_size=chunk_size
+            )
+            throughput = _time(results, n_records=args.records)
+            sys.stdout.write(f"{workers:>8} {chunk_size:>6} {throughput:>10.0f}\n")
+
+
+if __name__ == "__main__":
+    main()
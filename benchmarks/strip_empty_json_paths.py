@@ -0,0 +1,57 @@
+"""
+Shows that the cost of strip_empty_json_paths is linear in the size of its
+input, including for deeply nested inputs with cascading empty values.
+
+    python -m benchmarks.strip_empty_json_paths
+"""
+
+import sys
+from timeit import Timer
+
+from nrlf_converter.utils.utils import strip_empty_json_paths
+
+SIZES = (1_000, 10_000, 100_000)
+DEPTH = 8
+
+
+def _cascading_empty(depth: int) -> dict:
+    # A branch that only becomes empty once its innermost value is removed
+    node = {"value": None}
+    for _ in range(depth):
+        node = {"child": node, "siblings": [[None], "", {}]}
+    return node
+
+
+def _pointer_like(n_nodes: int) -> dict:
+    branch = {
+        "code": "736253002",
+        "display": "Mental health crisis plan",
+        "empty": _cascading_empty(depth=DEPTH),
+    }
+    nodes_per_branch = _count_nodes(branch)
+    return {f"branch_{i}": branch for i in range(n_nodes // nodes_per_branch)}
+
+
+def _count_nodes(json) -> int:
+    if type(json) is dict:
+        return 1 + sum(map(_count_nodes, json.values()))
+    if type(json) is list:
+        return 1 + sum(map(_count_nodes, json))
+    return 1
+
+
+def main():
+    sys.stdout.write(f"{'nodes':>10} {'seconds':>10} {'ns/node':>10}\n")
+    for size in SIZES:
+        json = _pointer_like(n_nodes=size)
+        n_nodes = _count_nodes(json)
+        timer = Timer(lambda: strip_empty_json_paths(json))
+        n_runs, _ = timer.autorange()
+        seconds = min(timer.repeat(repeat=5, number=n_runs)) / n_runs
+        sys.stdout.write(
+            f"{n_nodes:>10} {seconds:>10.6f} {seconds / n_nodes * 1e9:>10.1f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Times each stage of the conversion on its own (strip_empty_json_paths,
+_validate_against_schema, DocumentPointer.parse_obj, DocumentReference.dict)
+and end to end (nrl_to_r4, nrl_to_r4_direct, nrl_to_r4_many and, for trusted
+input, nrl_to_r4_many_trusted, and with every record found in a MemoryCache or
+SqliteCache, nrl_to_r4_many_cached and nrl_to_r4_many_sqlite), and validation
+(validate_nrl_to_r4_many), over corpora of each of the given sizes (see
+benchmarks.corpus), built from the test data or (with --generated) from
+synthetic records. Inputs to each stage are prepared from the corpus
+beforehand, so that only the stage itself is timed.
+
+Results can be written as JSON with --json, and compared against a previous
+run (e.g. of another version) with --compare.
+
+    python -m benchmarks.suite [--records 1000 100000 1000000] [--json results.json]
+        [--compare baseline.json] [--benchmarks nrl_to_r4 ...]
+"""
+
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.corpus import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_SEED,
+    Mix,
+    corpus,
+    describe,
+    document_references,
+    generated_pool,
+    pointers,
+)
+from benchmarks.corpus import pool as test_data_pool
+from benchmarks.corpus import prepared_pointers
+from nrlf_converter import (
+    MemoryCache,
+    SqliteCache,
+    nrl_to_r4,
+    nrl_to_r4_direct,
+    nrl_to_r4_many,
+    validate_nrl_to_r4_many,
+)
+from nrlf_converter.convert_nrl_to_r4.cache import ConversionCache
+from nrlf_converter.nrl.document_pointer import DocumentPointer
+from nrlf_converter.utils.utils import strip_empty_json_paths
+from nrlf_converter.utils.validation.validators import _validate_against_schema
+
+SCALES = (1_000, 100_000, 1_000_000)
+# Smaller corpora are timed repeatedly, until this many records have been timed
+REPEAT_RECORDS = 100_000
+PATH_TO_REPO = Path(__file__).parent.parent
+
+
+class Benchmark(NamedTuple):
+    # Builds the inputs of the stage from the records of the corpus pool
+    prepare: Callable[[List[tuple]], list]
+    # Runs the stage over an iterable of inputs
+    run: Callable[[object], None]
+
+
+def _each(fn: Callable, inputs):
+    for _input in inputs:
+        fn(_input)
+
+
+def _each_record(fn: Callable, records):
+    for document_pointer, nhs_number, asid in records:
+        fn(document_pointer, nhs_number, asid)
+
+
+def _all(results):
+    for _ in results:
+        pass
+
+
+def _new_sqlite_cache() -> SqliteCache:
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return SqliteCache(path=os.path.join(directory, "cache.sqlite"))
+
+
+def _cached(new_cache: Callable[[], ConversionCache]) -> Benchmark:
+    caches = []
+
+    def prepare(records: List[tuple]) -> list:
+        # Every record of the pool is cached beforehand, so that only hits are timed
+        cache = new_cache()
+        _all(nrl_to_r4_many(records, cache=cache))
+        caches[:] = [cache]
+        return list(records)
+
+    def run(records):
+        _all(nrl_to_r4_many(records, cache=caches[0]))
+
+    return Benchmark(prepare=prepare, run=run)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "strip_empty_json_paths": Benchmark(
+        prepare=pointers, run=partial(_each, strip_empty_json_paths)
+    ),
+    "_validate_against_schema": Benchmark(
+        prepare=prepared_pointers,
+        run=partial(_each, partial(_validate_against_schema, schema=DocumentPointer)),
+    ),
+    "DocumentPointer.parse_obj": Benchmark(
+        prepare=pointers, run=partial(_each, DocumentPointer.parse_obj)
+    ),
+    "DocumentReference.dict": Benchmark(
+        prepare=document_references,
+        run=partial(_each, lambda document_reference: document_reference.dict()),
+    ),
+    "nrl_to_r4": Benchmark(prepare=list, run=partial(_each_record, nrl_to_r4)),
+    "nrl_to_r4_direct": Benchmark(
+        prepare=list, run=partial(_each_record, nrl_to_r4_direct)
+    ),
+    "nrl_to_r4_many": Benchmark(
+        prepare=list, run=lambda records: _all(nrl_to_r4_many(records))
+    ),
+    "nrl_to_r4_many_trusted": Benchmark(
+        prepare=list,
+        run=lambda records: _all(nrl_to_r4_many(records, trusted=True)),
+    ),
+    "nrl_to_r4_many_cached": _cached(new_cache=MemoryCache),
+    "nrl_to_r4_many_sqlite": _cached(new_cache=_new_sqlite_cache),
+    "validate_nrl_to_r4_many": Benchmark(
+        prepare=list, run=lambda records: _all(validate_nrl_to_r4_many(records))
+    ),
+}
+
+
+def _time(benchmark: Benchmark, inputs: list, n_records: int) -> float:
+    start = perf_counter()
+    benchmark.run(corpus(n_records=n_records, records=inputs))
+    return perf_counter() - start
+
+
+def _run(name: str, pool: List[tuple], n_records: int) -> dict:
+    benchmark = BENCHMARKS[name]
+    inputs = benchmark.prepare(pool)
+    repeats = max(1, REPEAT_RECORDS // n_records)
+    timings = [
+        _time(benchmark=benchmark, inputs=inputs, n_records=n_records) / n_records
+        for _ in range(repeats)
+    ]
+    best = min(timings)
+    return {
+        "benchmark": name,
+        "records": n_records,
+        "repeats": repeats,
+        "best_us": best * 1e6,
+        "median_us": median(timings) * 1e6,
+        "records_per_second": 1 / best,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PATH_TO_REPO,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+    }
+
+
+def _key(result: dict) -> tuple:
+    return result["benchmark"], result["records"]
+
+
+def _write_table(results: List[dict], baseline: Dict[tuple, dict]):
+    sys.stdout.write(
+        f"{'benchmark':<26} {'records':>9} {'us/record':>10} {'records/s':>10}"
+        f"{' change':>9}\n"
+    )
+    for result in results:
+        before = baseline.get(_key(result))
+        change = (
+            f"{result['best_us'] / before['best_us'] - 1:>+9.1%}"
+            if before
+            else f"{'':>9}"
+        )
+        sys.stdout.write(
+            f"{result['benchmark']:<26} {result['records']:>9} "
+            f"{result['best_us']:>10.2f} {result['records_per_second']:>10.0f}"
+            f"{change}\n"
+        )
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--ssp", type=float, default=Mix.ssp)
+    parser.add_argument("--relates-to", type=float, default=Mix.relates_to)
+    parser.add_argument("--long-ods", type=float, default=Mix.long_ods)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE)
+    parser.add_argument(
+        "--generated",
+        action="store_true",
+        help="Use synthetic records (see benchmarks.generator) not the test data",
+    )
+    parser.add_argument("--json", help="Write the results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    mix = Mix(ssp=args.ssp, relates_to=args.relates_to, long_ods=args.long_ods)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {_key(result): result for result in json.load(f)["results"]}
+
+    corpus_pool = generated_pool if args.generated else test_data_pool
+    results = []
+    for n_records in args.records:
+        pool = corpus_pool(
+            n_records=n_records, mix=mix, seed=args.seed, pool_size=args.pool_size
+        )
+        for name in args.benchmarks:
+            results.append(_run(name=name, pool=pool, n_records=n_records))
+    _write_table(results=results, baseline=baseline)
+
+    if args.json:
+        report = {
+            "environment": _environment(),
+            "corpus": describe(
+                mix=mix,
+                seed=args.seed,
+                pool_size=args.pool_size,
+                generated=args.generated,
+            ),
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import json
+from io import StringIO
+
+import pytest
+
+from benchmarks.generator import DEFECTS, Distribution, generate, main, records
+from nrlf_converter import nrl_to_r4, nrl_to_r4_direct, nrl_to_r4_many
+
+N_RECORDS = 500
+
+
+def test_generate_is_deterministic():
+    assert list(generate(n_records=50, seed=1)) == list(generate(n_records=50, seed=1))
+    assert list(generate(n_records=50, seed=1)) != list(generate(n_records=50, seed=2))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_generated_records_are_valid(seed: int):
+    for document_pointer, nhs_number, asid in records(n_records=N_RECORDS, seed=seed):
+        document_reference = nrl_to_r4(
+            document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+        )
+        assert document_reference == nrl_to_r4_direct(
+            document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+        )
+
+
+def test_generated_distribution():
+    distribution = Distribution(
+        ods_code_lengths=((12, 1),), ssp=1, relates_to=1, context=0, extension=0
+    )
+    for document_pointer, nhs_number, asid in records(
+        n_records=50, distribution=distribution
+    ):
+        document_reference = nrl_to_r4(
+            document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+        )
+        ods_code, logical_id = document_reference["id"].split("-", 1)
+        assert len(ods_code) == 12
+        assert len(logical_id) == 36
+        assert document_reference["content"][0]["attachment"]["url"].startswith(
+            "ssp://"
+        )
+        assert document_reference["relatesTo"][0]["code"] == "replaces"
+        assert "context" not in document_reference
+        assert "extension" not in document_reference["content"][0]
+
+
+def test_generated_defects_fail():
+    distribution = Distribution(invalid=0.5)
+    _records = list(generate(n_records=N_RECORDS, distribution=distribution))
+    defects = [record.get("defect") for record in _records]
+    assert set(defects) == {None, *DEFECTS}
+
+    results = nrl_to_r4_many(
+        (record["pointer"], record["nhs_number"], record["asid"]) for record in _records
+    )
+    assert [result.ok for result in results] == [defect is None for defect in defects]
+
+
+def test_main(monkeypatch):
+    stdout = StringIO()
+    monkeypatch.setattr("sys.stdout", stdout)
+    main(["--records", "10", "--seed", "3"])
+    assert list(map(json.loads, stdout.getvalue().splitlines())) == list(
+        generate(n_records=10, seed=3)
+    )
@@ -0,0 +1,70 @@
+"""
+Fixtures shared by the tests, built from the NRL document pointers in
+nrlf_converter/nrl/tests/data. Every fixture returns new copies of the
+pointers, which tests are free to modify. The constant fixtures are session
+scoped, so that they can also be used by hypothesis tests.
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pytest
+
+PATH_TO_DATA = Path(__file__).parent / "nrlf_converter" / "nrl" / "tests" / "data"
+PATHS_TO_TEST_DATA = sorted(PATH_TO_DATA.iterdir())
+
+NHS_NUMBER = "3964056618"
+ASID = "230811201350"
+
+
+def _load(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def nhs_number() -> str:
+    return NHS_NUMBER
+
+
+@pytest.fixture(scope="session")
+def asid() -> str:
+    return ASID
+
+
+@pytest.fixture(scope="session")
+def paths_to_test_data() -> List[Path]:
+    return PATHS_TO_TEST_DATA
+
+
+@pytest.fixture(params=PATHS_TO_TEST_DATA, ids=lambda path: path.stem)
+def path_to_data(request) -> Path:
+    """Each of the test pointers in turn"""
+    return request.param
+
+
+@pytest.fixture
+def load_document_pointer() -> Callable[[Optional[str]], dict]:
+    """Loads a new copy of the test pointer with this file name (else the first)"""
+
+    def load(name: Optional[str] = None) -> dict:
+        return _load(PATH_TO_DATA / name if name else PATHS_TO_TEST_DATA[0])
+
+    return load
+
+
+@pytest.fixture
+def document_pointer(load_document_pointer) -> dict:
+    return load_document_pointer()
+
+
+@pytest.fixture
+def document_pointers() -> List[dict]:
+    return [_load(path) for path in PATHS_TO_TEST_DATA]
+
+
+@pytest.fixture
+def records(document_pointers: List[dict], nhs_number: str, asid: str) -> List[tuple]:
+    """A (document_pointer, nhs_number, asid) record of each test pointer"""
+    return [(pointer, nhs_number, asid) for pointer in document_pointers]
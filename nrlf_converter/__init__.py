@@ -1,3 +1,15 @@
-from .convert_nrl_to_r4.nrl_to_r4 import nrl_to_r4
+from .convert_nrl_to_r4.aio import nrl_to_r4_async
+from .convert_nrl_to_r4.bulk import ConversionResult, nrl_to_r4_many
+from .convert_nrl_to_r4.cache import MemoryCache, SqliteCache
+from .convert_nrl_to_r4.direct import nrl_to_r4_direct
+from .convert_nrl_to_r4.nrl_to_r4 import nrl_to_r4, nrl_to_r4_parsed
+from .convert_nrl_to_r4.parallel import nrl_to_r4_parallel
+from .convert_nrl_to_r4.serialized import NdjsonWriter, nrl_to_r4_bytes
+from .convert_nrl_to_r4.shared import SharedOutput
+from .convert_nrl_to_r4.validate import (
+    ValidationResult,
+    validate_nrl_to_r4,
+    validate_nrl_to_r4_many,
+)
 from .nrl.errors import AuthorError, BadRelatesTo, CustodianError
 from .utils.validation.errors import ValidationError
@@ -0,0 +1,5 @@
+import sys
+
+from nrlf_converter.cli import main
+
+sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Streams newline-delimited JSON records of the form
+
+    {"pointer": {...}, "nhs_number": "...", "asid": "..."}
+
+through nrl_to_r4_many, writing one R4 DocumentReference per line to the
+(binary) output with an NdjsonWriter and one error record per failed input
+line to the error stream. With --validate-only, the records are only
+validated (see convert_nrl_to_r4.validate) and nothing is output. With
+--cache, converted documents are cached in an SQLite database, so that the
+unchanged records of a re-run are not converted again.
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from collections import deque
+from contextlib import ExitStack
+from typing import IO, BinaryIO, Deque, Iterable, List, Optional, Union
+
+from nrlf_converter.convert_nrl_to_r4.bulk import nrl_to_r4_many
+from nrlf_converter.convert_nrl_to_r4.cache import ConversionCache, SqliteCache
+from nrlf_converter.convert_nrl_to_r4.parallel import (
+    DEFAULT_CHUNK_SIZE,
+    nrl_to_r4_parallel,
+)
+from nrlf_converter.convert_nrl_to_r4.serialized import NdjsonWriter
+from nrlf_converter.convert_nrl_to_r4.validate import validate_nrl_to_r4_many
+from nrlf_converter.utils.encoders import (
+    DEFAULT_ENCODER,
+    ENCODER_LOADERS,
+    Encoder,
+    get_encoder,
+)
+
+BUFFER_SIZE = 1 << 16
+STDIO = "-"
+
+
+def _write_error(errors: IO[str], line_number: int, error: str, message: str):
+    errors.write(
+        json.dumps({"line": line_number, "error": error, "message": message.strip()})
+        + "\n"
+    )
+
+
+def _read_records(
+    lines: Iterable[str],
+    errors: IO[str],
+    line_numbers: Deque[int],
+    read_failures: List[int],
+):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            document_pointer = record["pointer"]
+            nhs_number = record["nhs_number"]
+            asid = record.get("asid")
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            _write_error(
+                errors=errors,
+                line_number=line_number,
+                error=type(exc).__name__,
+                message=f"Could not read record: {exc}",
+            )
+            read_failures.append(line_number)
+            continue
+        line_numbers.append(line_number)
+        yield document_pointer, nhs_number, asid
+
+
+def convert(
+    lines: Iterable[str],
+    output: BinaryIO,
+    errors: IO[str],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoder: Union[str, Encoder] = None,
+    validate_only: bool = False,
+    trusted: bool = False,
+    cache: ConversionCache = None,
+) -> int:
+    """Returns the number of input lines that could not be converted"""
+    n_failures = 0
+    line_numbers = deque()
+    read_failures = []
+    records = _read_records(
+        lines=lines,
+        errors=errors,
+        line_numbers=line_numbers,
+        read_failures=read_failures,
+    )
+    if validate_only:
+        results = validate_nrl_to_r4_many(records)
+    elif workers > 1:
+        results = nrl_to_r4_parallel(
+            records=records, workers=workers, chunk_size=chunk_size, trusted=trusted
+        )
+    else:
+        results = nrl_to_r4_many(records, trusted=trusted, cache=cache)
+    with NdjsonWriter(
+        stream=output, encoder=encoder, buffer_size=BUFFER_SIZE
+    ) as writer:
+        for result in results:
+            line_number = line_numbers.popleft()
+            if result.ok:
+                if not validate_only:
+                    writer.write(result.document_reference)
+            else:
+                n_failures += 1
+                _write_error(
+                    errors=errors,
+                    line_number=line_number,
+                    error=type(result.error).__name__,
+                    message=str(result.error),
+                )
+    return n_failures + len(read_failures)
+
+
+def _open(
+    path: str, mode: str, stdio: IO, stack: ExitStack, buffering: int = BUFFER_SIZE
+) -> IO:
+    if path == STDIO:
+        return stdio
+    return stack.enter_context(open(path, mode, buffering=buffering))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(
+        prog="nrlf-convert",
+        description="Convert NDJSON NRL document pointer records to R4 DocumentReferences",
+    )
+    parser.add_argument(
+        "input", nargs="?", default=STDIO, help="NDJSON input file (default: stdin)"
+    )
+    parser.add_argument(
+        "-o", "--output", default=STDIO, help="NDJSON output file (default: stdout)"
+    )
+    parser.add_argument(
+        "-e", "--errors", default=STDIO, help="NDJSON error file (default: stderr)"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes to convert with (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Records per chunk sent to each worker (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=sorted(ENCODER_LOADERS),
+        default=DEFAULT_ENCODER,
+        help=f"JSON encoder for the output, if installed (default: {DEFAULT_ENCODER})",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Only validate the records, writing errors but no output",
+    )
+    parser.add_argument(
+        "--trusted",
+        action="store_true",
+        help="Do not validate the pointers again, as they passed validation before",
+    )
+    parser.add_argument(
+        "--cache",
+        help="SQLite database of converted documents, reused between runs",
+    )
+    args = parser.parse_args(argv)
+    if args.validate_only and args.workers > 1:
+        parser.error("--validate-only cannot be used with --workers")
+    if args.validate_only and args.trusted:
+        parser.error("--validate-only cannot be used with --trusted")
+    if args.cache and (args.validate_only or args.workers > 1):
+        parser.error("--cache cannot be used with --validate-only or --workers")
+    try:
+        encoder = get_encoder(args.encoder)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    with ExitStack() as stack:
+        cache = (
+            stack.enter_context(SqliteCache(path=args.cache)) if args.cache else None
+        )
+        n_failures = convert(
+            lines=_open(path=args.input, mode="r", stdio=sys.stdin, stack=stack),
+            # Unbuffered, as the NdjsonWriter already buffers the output
+            output=_open(
+                path=args.output,
+                mode="wb",
+                stdio=sys.stdout.buffer,
+                stack=stack,
+                buffering=0,
+            ),
+            errors=_open(path=args.errors, mode="w", stdio=sys.stderr, stack=stack),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            encoder=encoder,
+            validate_only=args.validate_only,
+            trusted=args.trusted,
+            cache=cache,
+        )
+    return 1 if n_failures else 0
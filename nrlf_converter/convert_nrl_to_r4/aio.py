@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Deque, List, Optional, Union
+
+from nrlf_converter.convert_nrl_to_r4.bulk import ConversionResult, Record
+from nrlf_converter.convert_nrl_to_r4.parallel import _convert_chunk
+
+DEFAULT_ASYNC_CHUNK_SIZE = 100
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class _End:
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+async def _read(records: AsyncIterable[Record], queue: asyncio.Queue):
+    try:
+        async for record in records:
+            await queue.put(record)
+    except Exception as exc:
+        await queue.put(_End(error=exc))
+    else:
+        await queue.put(_End())
+
+
+async def _next_chunk(
+    queue: asyncio.Queue, chunk_size: int
+) -> Union[List[Record], _End]:
+    """
+    Waits for at least one record, then takes whatever else is already queued
+    (up to chunk_size) so that a slow source is not held up filling a chunk.
+    Once the source has ended, returns its _End instead.
+    """
+    chunk = []
+    while len(chunk) < chunk_size:
+        if chunk:
+            try:
+                record = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        else:
+            record = await queue.get()
+        if type(record) is _End:
+            queue.put_nowait(record)
+            break
+        chunk.append(record)
+
+    if not chunk:
+        return queue.get_nowait()
+    return chunk
+
+
+async def nrl_to_r4_async(
+    records: AsyncIterable[Record],
+    chunk_size: int = DEFAULT_ASYNC_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    executor: Executor = None,
+    trusted: bool = False,
+) -> AsyncIterator[ConversionResult]:
+    """
+    Converts an async iterable of (document_pointer, nhs_number, asid)
+    records, yielding ConversionResults in input order.
+
+    Records are converted off the event loop in chunks of up to 'chunk_size'
+    on 'executor' (default: the loop's default executor; pass a
+    ProcessPoolExecutor to use more than one CPU). At most 'max_concurrency'
+    chunks are in flight. Records are read ahead no further than that, so
+    the source is only consumed as fast as results can be produced. If the
+    source raises, its error is raised once the results of every record that
+    it yielded before have been yielded.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=chunk_size * max_concurrency)
+    reader = asyncio.ensure_future(_read(records=records, queue=queue))
+    pending: Deque[asyncio.Future] = deque()
+    next_chunk: Optional[asyncio.Future] = None
+    end: Optional[_End] = None
+    start = 0
+    try:
+        while pending or end is None:
+            if pending and pending[0].done():
+                for result in pending.popleft().result():
+                    yield result
+                continue
+
+            if end is not None or len(pending) >= max_concurrency:
+                await asyncio.wait({pending[0]})
+                continue
+
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(
+                    _next_chunk(queue=queue, chunk_size=chunk_size)
+                )
+            await asyncio.wait(
+                {next_chunk, *list(pending)[:1]},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if next_chunk.done():
+                chunk = next_chunk.result()
+                next_chunk = None
+                if type(chunk) is _End:
+                    end = chunk
+                    continue
+                pending.append(
+                    loop.run_in_executor(
+                        executor, _convert_chunk, start, chunk, trusted
+                    )
+                )
+                start += len(chunk)
+        if end.error is not None:
+            raise end.error
+    finally:
+        reader.cancel()
+        if next_chunk is not None:
+            next_chunk.cancel()
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Generator, Iterable, Optional, Tuple
+
+from nrlf_converter.convert_nrl_to_r4.cache import ConversionCache, cache_key
+from nrlf_converter.convert_nrl_to_r4.direct import _convert_direct
+from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import _is_empty, _normalise
+from nrlf_converter.convert_nrl_to_r4.shared import SharedOutput
+from nrlf_converter.nrl.errors import AuthorError, BadRelatesTo, CustodianError
+from nrlf_converter.utils.constants import EMPTY_VALUES
+from nrlf_converter.utils.instrumentation import CACHE, NORMALISE, instrumented, lap
+from nrlf_converter.utils.validation.errors import ValidationError
+
+CONVERSION_ERRORS = (ValidationError, CustodianError, AuthorError, BadRelatesTo)
+# Raised by records that are not shaped as document pointers at all, e.g. a
+# 'document_pointer' that is not a dict, or a malformed 'trusted' record
+MALFORMED_RECORD_ERRORS = (TypeError, AttributeError)
+RECORD_ERRORS = (*CONVERSION_ERRORS, *MALFORMED_RECORD_ERRORS)
+
+Record = Tuple[dict, str, Optional[str]]
+
+
+@dataclass
+class ConversionResult:
+    index: int
+    document_reference: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _convert_uncached(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: Optional[str],
+    shared_output: Optional[SharedOutput],
+    trusted: bool = False,
+) -> dict:
+    # Stripped once, for both the empty check and the conversion
+    _document_pointer = _normalise(document_pointer)
+    if _document_pointer in EMPTY_VALUES or _is_empty(nhs_number):
+        raise ValidationError(
+            message="One or more empty or null values passed to nrl_to_r4"
+        )
+    lap(NORMALISE)
+    return _convert_direct(
+        document_pointer=_document_pointer,
+        nhs_number=nhs_number,
+        asid=asid,
+        stripped=True,
+        shared_output=shared_output,
+        trusted=trusted,
+    )
+
+
+def _convert_cached(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: Optional[str],
+    shared_output: Optional[SharedOutput],
+    trusted: bool,
+    cache: ConversionCache,
+) -> dict:
+    key = cache_key(document_pointer, nhs_number, asid)
+    if key is None:
+        return _convert_uncached(
+            document_pointer, nhs_number, asid, shared_output, trusted
+        )
+    document_reference = cache.get(key)
+    lap(CACHE)
+    if document_reference is not None:
+        if shared_output is not None:
+            document_reference = shared_output.share(document_reference)
+        return document_reference
+    document_reference = _convert_uncached(
+        document_pointer, nhs_number, asid, shared_output, trusted
+    )
+    # The output for a trusted pointer is only defined if it is valid, so it
+    # is not cached for later conversions that might not be trusted
+    if not trusted:
+        cache.set(key, document_reference)
+    return document_reference
+
+
+# Instrumented around the cache, so that a record read from the cache is
+# counted as a conversion like any other
+@instrumented(name="nrl_to_r4_many")
+def _convert_record(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: Optional[str],
+    shared_output: Optional[SharedOutput],
+    trusted: bool,
+    cache: Optional[ConversionCache],
+) -> dict:
+    if cache is None:
+        return _convert_uncached(
+            document_pointer, nhs_number, asid, shared_output, trusted
+        )
+    return _convert_cached(
+        document_pointer, nhs_number, asid, shared_output, trusted, cache
+    )
+
+
+def nrl_to_r4_many(
+    records: Iterable[Record],
+    shared_output: SharedOutput = None,
+    trusted: bool = False,
+    cache: ConversionCache = None,
+) -> Generator[ConversionResult, None, None]:
+    """
+    Lazily converts (document_pointer, nhs_number, asid) records, yielding
+    one ConversionResult per record in input order. Errors are captured on
+    the result rather than raised, so one bad record does not stop the
+    batch: these are the conversion errors (CONVERSION_ERRORS) and the
+    TypeError or AttributeError raised by a malformed record, e.g. a
+    'document_pointer' that is not a dict (MALFORMED_RECORD_ERRORS). Any other
+    exception is raised. Records are converted with 'nrl_to_r4_direct', sharing
+    the repeated parts of the documents if 'shared_output' is given, and
+    without validating document pointers that are 'trusted' (see nrl_to_r4).
+    Records that are found in the 'cache', if given, are not converted again.
+    """
+    for index, (document_pointer, nhs_number, asid) in enumerate(records):
+        try:
+            document_reference = _convert_record(
+                document_pointer, nhs_number, asid, shared_output, trusted, cache
+            )
+        except RECORD_ERRORS as exc:
+            yield ConversionResult(index=index, error=exc)
+        else:
+            yield ConversionResult(index=index, document_reference=document_reference)
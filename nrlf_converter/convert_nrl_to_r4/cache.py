@@ -0,0 +1,184 @@
+"""
+Caches of converted documents for re-runs of a conversion, in which most
+records are unchanged. Each record is keyed by a stable hash of its
+(document_pointer, nhs_number, asid), see 'cache_key', so that a record that
+was converted before is not parsed or transformed again: the cached
+DocumentReference is decoded in its place. Documents are held encoded, in
+memory (MemoryCache) or on disk in an SQLite database (SqliteCache), and
+every lookup returns a new dict that is owned by the caller.
+
+Only successful conversions are cached. Keys include CACHE_VERSION, which
+must be incremented whenever the output of the conversion changes, so that
+documents cached by an earlier version are not returned.
+
+Records are hashed, and documents are held, as encoded by marshal (version
+2, which is fixed and has no references between objects, so depends only on
+the content of the object). This is several times faster than encoding them
+as JSON, but keys then depend on the order of the keys in each dict: records
+that differ only in key order are merely cached separately. As with pickle,
+only use a database that was written by this package.
+"""
+
+import marshal
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Optional
+
+from nrlf_converter.utils.stats import CacheStats
+
+CACHE_VERSION = 2
+MARSHAL_VERSION = 2
+DEFAULT_CACHE_SIZE = 65536
+# Writes to an SqliteCache are committed in batches of this many documents
+SQLITE_COMMIT_SIZE = 1000
+
+
+def cache_key(document_pointer, nhs_number, asid) -> Optional[str]:
+    """
+    A hash of the record that is stable across processes and runs, or None
+    if the record cannot be hashed (i.e. contains objects that marshal cannot
+    encode)
+    """
+    try:
+        data = marshal.dumps(
+            (CACHE_VERSION, document_pointer, nhs_number, asid), MARSHAL_VERSION
+        )
+    except ValueError:
+        return None
+    return sha256(data).hexdigest()
+
+
+class ConversionCache(ABC):
+    """
+    Abstract base class of the thread-safe caches of converted documents, which
+    implement '_get' and '_set' on the marshalled document
+    """
+
+    maxsize: Optional[int] = None
+
+    def __init__(self):
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, document: bytes):
+        ...
+
+    @abstractmethod
+    def _size(self) -> int:
+        ...
+
+    def get(self, key: str) -> Optional[dict]:
+        """The document cached under 'key', if any"""
+        with self._lock:
+            document = self._get(key)
+            if document is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return marshal.loads(document)
+
+    def set(self, key: str, document_reference: dict):
+        document = marshal.dumps(document_reference, MARSHAL_VERSION)
+        with self._lock:
+            self._set(key, document)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=self._size(),
+            )
+
+
+class MemoryCache(ConversionCache):
+    """A bounded (LRU) in-memory cache of converted documents"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        super().__init__()
+        self.maxsize = maxsize
+        self._documents = OrderedDict()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+        return document
+
+    def _set(self, key: str, document: bytes):
+        self._documents[key] = document
+        self._documents.move_to_end(key)
+        if len(self._documents) > self.maxsize:
+            self._documents.popitem(last=False)
+
+    def _size(self) -> int:
+        return len(self._documents)
+
+
+class SqliteCache(ConversionCache):
+    """
+    An unbounded cache of converted documents in an SQLite database at
+    'path', which persists between runs. Use as a context manager, or call
+    'close', so that the last writes are committed.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # A crash can lose the last writes, but cannot corrupt the database
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents "
+            "(key TEXT PRIMARY KEY, document BLOB NOT NULL)"
+        )
+        self._connection.commit()
+        self._pending = 0
+
+    def _get(self, key: str) -> Optional[bytes]:
+        row = self._connection.execute(
+            "SELECT document FROM documents WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _set(self, key: str, document: bytes):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO documents (key, document) VALUES (?, ?)",
+            (key, document),
+        )
+        self._pending += 1
+        if self._pending >= SQLITE_COMMIT_SIZE:
+            self._commit()
+
+    def _commit(self):
+        self._connection.commit()
+        self._pending = 0
+
+    def _size(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def commit(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+    def __enter__(self) -> "SqliteCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,192 @@
+"""
+Converts a raw NRL document pointer dict straight into an R4 DocumentReference
+dict, without building the intermediate NRL and R4 dataclasses. The output is
+identical to that of 'nrl_to_r4', which remains the reference implementation.
+"""
+
+from dataclasses import fields
+from typing import List
+
+from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import (
+    _https_to_ssp,
+    _nrlf_id,
+    reject_empty_args,
+)
+from nrlf_converter.convert_nrl_to_r4.shared import SharedOutput
+from nrlf_converter.nrl.constants import (
+    ASID_SYSTEM_URL,
+    DEFAULT_SYSTEM,
+    NHS_NUMBER_SYSTEM_URL,
+    ODS_SYSTEM,
+    REPLACES,
+    SSP,
+)
+from nrlf_converter.nrl.document_pointer import (
+    DocumentPointer,
+    RelatesTo,
+    parse_ods_code,
+)
+from nrlf_converter.nrl.errors import AuthorError, CustodianError
+from nrlf_converter.r4.constants import (
+    CONTENT_STABILITY_SYSTEM,
+    CONTENT_STABILITY_URL,
+    DOCUMENT_REFERENCE,
+    FORMAT_SYSTEM,
+)
+from nrlf_converter.r4.document_reference import Attachment
+from nrlf_converter.utils.instrumentation import BUILD, CONTENT, IDS, instrumented, lap
+from nrlf_converter.utils.validation.errors import ValidationError
+
+ATTACHMENT_FIELDS = tuple(field.name for field in fields(Attachment))
+
+
+def _is_ssp(format: dict) -> bool:
+    return (format.get("system", DEFAULT_SYSTEM) == SSP.SYSTEM) and (
+        format["code"] == SSP.CODE
+    )
+
+
+def _identifier(value: str, system: str) -> dict:
+    return {"identifier": {"value": value, "system": system}}
+
+
+def _relates_to(relates_to: dict, ods_code: str) -> dict:
+    if relates_to.get("code") != REPLACES:
+        return relates_to
+    logical_id = RelatesTo(**relates_to).logical_id
+    # As in nrl_to_r4, which passes a relatesTo with an empty logical id through
+    if not logical_id:
+        return relates_to
+    return {
+        "code": relates_to["code"],
+        "target": {
+            "identifier": {"value": _nrlf_id(ods_code=ods_code, logical_id=logical_id)}
+        },
+    }
+
+
+def _content_item(content: dict) -> dict:
+    attachment = content["attachment"]
+    format = content["format"]
+    _attachment = {
+        field: attachment[field] for field in ATTACHMENT_FIELDS if field in attachment
+    }
+    if _is_ssp(format):
+        _attachment["url"] = _https_to_ssp(attachment["url"])
+
+    _content = {
+        "attachment": _attachment,
+        "format": {
+            "code": format["code"],
+            "display": format["display"],
+            "system": FORMAT_SYSTEM,
+        },
+    }
+    extensions: List[dict] = content.get("extension")
+    if extensions:
+        # The validated extensions are owned by this conversion, so can be updated
+        extensions[0]["valueCodeableConcept"]["coding"][0][
+            "system"
+        ] = CONTENT_STABILITY_SYSTEM
+        extensions[0]["url"] = CONTENT_STABILITY_URL
+        _content["extension"] = extensions
+    return _content
+
+
+def _convert_direct(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: str = None,
+    stripped: bool = False,
+    shared_output: SharedOutput = None,
+    trusted: bool = False,
+) -> dict:
+    pointer = DocumentPointer.parse_dict(
+        document_pointer, trusted=trusted, _owned=stripped
+    )
+    content: List[dict] = pointer["content"]
+    if not asid and any(_is_ssp(item["format"]) for item in content):
+        raise ValidationError(
+            message="ASID must be provided for DocumentPointers with SSP content"
+        )
+
+    ods_code = parse_ods_code(
+        reference=pointer["custodian"].get("reference"), error=CustodianError
+    )
+    author_ods_code = parse_ods_code(
+        reference=pointer["author"].get("reference"), error=AuthorError
+    )
+
+    document_reference = {
+        "id": _nrlf_id(
+            ods_code=ods_code, logical_id=pointer["logicalIdentifier"]["logicalId"]
+        ),
+        "status": pointer["status"],
+        "type": {"coding": [pointer["type"]]},
+    }
+    if "class_" in pointer:
+        document_reference["category"] = [pointer["class_"]]
+    document_reference["subject"] = _identifier(
+        value=nhs_number, system=NHS_NUMBER_SYSTEM_URL
+    )
+    document_reference["date"] = pointer["indexed"]
+    document_reference["author"] = [
+        _identifier(value=author_ods_code, system=ODS_SYSTEM)
+    ]
+    document_reference["custodian"] = _identifier(value=ods_code, system=ODS_SYSTEM)
+
+    relates_to = pointer.get("relatesTo")
+    if relates_to is not None:
+        relates_to = _relates_to(relates_to=relates_to, ods_code=ods_code)
+
+    lap(IDS)
+
+    document_reference["content"] = list(map(_content_item, content))
+    lap(CONTENT)
+
+    context = pointer.get("context")
+    if context is not None:
+        _context = {}
+        if "period" in context:
+            _context["period"] = context["period"]
+        _context["practiceSetting"] = {
+            "coding": context["practiceSetting"]["practiceSettingCoding"]
+        }
+        if asid:
+            _context["related"] = [_identifier(value=asid, system=ASID_SYSTEM_URL)]
+        document_reference["context"] = _context
+
+    if "masterIdentifier" in pointer:
+        document_reference["masterIdentifier"] = pointer["masterIdentifier"]
+    document_reference["resourceType"] = DOCUMENT_REFERENCE
+    if relates_to is not None:
+        document_reference["relatesTo"] = [relates_to]
+    if shared_output is not None:
+        document_reference = shared_output.share(document_reference)
+    lap(BUILD)
+    return document_reference
+
+
+@instrumented
+@reject_empty_args(exemptions=("asid", "shared_output", "trusted"), normalise=True)
+def nrl_to_r4_direct(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: str = None,
+    shared_output: SharedOutput = None,
+    trusted: bool = False,
+) -> dict:
+    """
+    With 'shared_output', the parts of the document that repeat between
+    documents are shared (see SharedOutput) and must be treated as read-only.
+    With 'trusted', document_pointer is not validated again (see nrl_to_r4).
+    """
+    # document_pointer has already been stripped by reject_empty_args
+    return _convert_direct(
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid,
+        stripped=True,
+        shared_output=shared_output,
+        trusted=trusted,
+    )
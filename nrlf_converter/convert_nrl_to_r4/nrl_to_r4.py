@@ -15,7 +15,12 @@ from nrlf_converter.nrl.document_pointer import (
     DocumentPointer,
     RelatesTo,
 )
-from nrlf_converter.r4.constants import ID_SEPARATOR
+from nrlf_converter.r4.constants import (
+    CONTENT_STABILITY_SYSTEM,
+    CONTENT_STABILITY_URL,
+    FORMAT_SYSTEM,
+    ID_SEPARATOR,
+)
 from nrlf_converter.r4.document_reference import (
     Attachment,
     CodeableConcept,
@@ -28,6 +33,15 @@ from nrlf_converter.r4.document_reference import (
     Reference,
 )
 from nrlf_converter.utils.constants import EMPTY_VALUES, JSON_TYPES
+from nrlf_converter.utils.instrumentation import (
+    BUILD,
+    CONTENT,
+    IDS,
+    NORMALISE,
+    SERIALIZE,
+    instrumented,
+    lap,
+)
 from nrlf_converter.utils.utils import strip_empty_json_paths
 from nrlf_converter.utils.validation.errors import ValidationError
 
@@ -71,19 +85,15 @@ def _content_items(
         format = Coding(
             code=content.format.code,
             display=content.format.display,
-            system="https://fhir.nhs.uk/England/CodeSystem/England-NRLFormatCode",
+            system=FORMAT_SYSTEM,
         )
-        extensions = []
-        if content.extension:
-            content.extension[0].valueCodeableConcept.coding[
-                0
-            ].system = (
-                "https://fhir.nhs.uk/England/CodeSystem/England-NRLContentStability"
-            )
-            content.extension[
-                0
-            ].url = "https://fhir.nhs.uk/England/StructureDefinition/Extension-England-ContentStability"
-            extensions = [asdict(extension) for extension in content.extension]
+        # The extensions are copied by asdict, so the content item is unchanged
+        extensions = [asdict(extension) for extension in content.extension or ()]
+        if extensions:
+            extensions[0]["valueCodeableConcept"]["coding"][0][
+                "system"
+            ] = CONTENT_STABILITY_SYSTEM
+            extensions[0]["url"] = CONTENT_STABILITY_URL
         if content.format.is_ssp():
             attachment["url"] = _https_to_ssp(content.attachment.url)
 
@@ -94,27 +104,43 @@ def _content_items(
         )
 
 
-def _is_empty(obj):
+def _normalise(obj):
+    """Strips empty values from JSON objects, returning a new object"""
     if type(obj) in JSON_TYPES:
-        obj = strip_empty_json_paths(obj)
-    return obj in EMPTY_VALUES
+        return strip_empty_json_paths(obj)
+    return obj
+
 
+def _is_empty(obj):
+    return _normalise(obj) in EMPTY_VALUES
 
-def reject_empty_args(exemptions: list = None):
+
+def reject_empty_args(exemptions: list = None, normalise: bool = False):
+    """
+    With normalise=True, the wrapped function is called with the normalised
+    (stripped) arguments that were checked, rather than the originals, so that
+    the input only needs to be stripped once
+    """
     if not exemptions:
         exemptions = []
 
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            all_args = chain(
-                args, (v for k, v in kwargs.items() if k not in exemptions)
+            _args = tuple(map(_normalise, args))
+            _kwargs = {
+                k: v if k in exemptions else _normalise(v) for k, v in kwargs.items()
+            }
+            checked_args = chain(
+                _args, (v for k, v in _kwargs.items() if k not in exemptions)
             )
-            if any(map(_is_empty, all_args)):
+            if any(arg in EMPTY_VALUES for arg in checked_args):
                 raise ValidationError(
                     message=f"One or more empty or null values passed to {fn.__name__}"
                 )
-
+            lap(NORMALISE)
+            if normalise:
+                return fn(*_args, **_kwargs)
             return fn(*args, **kwargs)
 
         return wrapper
@@ -122,32 +148,70 @@ def reject_empty_args(exemptions: list = None):
     return decorator
 
 
-@reject_empty_args(exemptions=("asid",))
-def nrl_to_r4(document_pointer: dict, nhs_number: str, asid: str = None) -> dict:
-    _document_pointer = DocumentPointer.parse_obj(document_pointer)
-    if _document_pointer.is_ssp() and not asid:
-        raise ValidationError(
-            message="ASID must be provided for DocumentPointers with SSP content"
-        )
-    asid_author: list[Reference] = (
+def _asid_author(asid: str) -> List[Reference]:
+    return (
         [Reference(identifier=Identifier(system=ASID_SYSTEM_URL, value=asid))]
         if asid
         else []
     )
 
-    pointer_author: list[Reference] = [
-        Reference(
-            identifier=Identifier(
-                system=ODS_SYSTEM, value=_document_pointer.author_ods_code
-            )
+
+def _convert(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: str = None,
+    stripped: bool = False,
+    trusted: bool = False,
+) -> dict:
+    return _convert_parsed(
+        _document_pointer=DocumentPointer.parse_obj(
+            document_pointer, trusted=trusted, _owned=stripped
+        ),
+        nhs_number=nhs_number,
+        asid=asid,
+    )
+
+
+def _convert_parsed(
+    _document_pointer: DocumentPointer, nhs_number: str, asid: str = None
+) -> dict:
+    document_reference = _document_reference(
+        _document_pointer=_document_pointer, nhs_number=nhs_number, asid=asid
+    ).dict()
+    lap(SERIALIZE)
+    return document_reference
+
+
+def _document_reference(
+    _document_pointer: DocumentPointer, nhs_number: str, asid: str = None
+) -> DocumentReference:
+    # Only reads from _document_pointer, which may be frozen and shared
+    if _document_pointer.is_ssp() and not asid:
+        raise ValidationError(
+            message="ASID must be provided for DocumentPointers with SSP content"
         )
+    asid_author = _asid_author(asid=asid)
+    ods_code = _document_pointer.ods_code
+    author_ods_code = _document_pointer.author_ods_code
+
+    pointer_author: list[Reference] = [
+        Reference(identifier=Identifier(system=ODS_SYSTEM, value=author_ods_code))
     ]
+    nrlf_id = _nrlf_id(
+        ods_code=ods_code, logical_id=_document_pointer.logicalIdentifier.logicalId
+    )
+    relates_to = _relates_to(relatesTo=_document_pointer.relatesTo, ods_code=ods_code)
+    lap(IDS)
+
+    content = (
+        list(_content_items(content_items=_document_pointer.content))
+        if _document_pointer.content
+        else []
+    )
+    lap(CONTENT)
 
     document_reference = DocumentReference(
-        id=_nrlf_id(
-            ods_code=_document_pointer.ods_code,
-            logical_id=_document_pointer.logicalIdentifier.logicalId,
-        ),
+        id=nrlf_id,
         masterIdentifier=_document_pointer.masterIdentifier,
         status=_document_pointer.status,
         type=CodeableConcept(coding=[_document_pointer.type]),
@@ -157,20 +221,9 @@ def nrl_to_r4(document_pointer: dict, nhs_number: str, asid: str = None) -> dict
         ),
         date=_document_pointer.indexed,
         author=pointer_author,
-        custodian=Reference(
-            identifier=Identifier(system=ODS_SYSTEM, value=_document_pointer.ods_code)
-        ),
-        relatesTo=[
-            _relates_to(
-                relatesTo=_document_pointer.relatesTo,
-                ods_code=_document_pointer.ods_code,
-            )
-        ],
-        content=(
-            list(_content_items(content_items=_document_pointer.content))
-            if _document_pointer.content
-            else []
-        ),
+        custodian=Reference(identifier=Identifier(system=ODS_SYSTEM, value=ods_code)),
+        relatesTo=[relates_to],
+        content=content,
         context=(
             DocumentReferenceContext(
                 period=_document_pointer.context.period,
@@ -183,4 +236,45 @@ def nrl_to_r4(document_pointer: dict, nhs_number: str, asid: str = None) -> dict
             else None
         ),
     )
-    return document_reference.dict()
+    lap(BUILD)
+    return document_reference
+
+
+@instrumented
+@reject_empty_args(exemptions=("asid", "trusted"), normalise=True)
+def nrl_to_r4(
+    document_pointer: dict, nhs_number: str, asid: str = None, trusted: bool = False
+) -> dict:
+    """
+    With 'trusted', document_pointer is known to be valid (e.g. it was
+    converted in an earlier run), so the field validators are not run. The
+    arguments are still checked for empty values and document_pointer for its
+    required top-level fields, and the errors of the transformation itself
+    are still raised: CustodianError and AuthorError if an ODS code cannot be
+    extracted, BadRelatesTo if a 'replaces' relatesTo cannot be parsed, and
+    ValidationError if SSP content has no ASID or no 'https://' URL. The
+    output for a document_pointer that is not valid is undefined.
+    """
+    # document_pointer has already been stripped by reject_empty_args
+    return _convert(
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid,
+        stripped=True,
+        trusted=trusted,
+    )
+
+
+@instrumented
+@reject_empty_args(exemptions=("asid",))
+def nrl_to_r4_parsed(
+    document_pointer: DocumentPointer, nhs_number: str, asid: str = None
+) -> dict:
+    """
+    As nrl_to_r4, but for an already parsed DocumentPointer, which is not
+    modified. Frozen pointers (DocumentPointer.parse_frozen) can be cached
+    and converted any number of times, including concurrently.
+    """
+    return _convert_parsed(
+        _document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
@@ -0,0 +1,65 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Generator, Iterable, List
+
+from nrlf_converter.convert_nrl_to_r4.bulk import (
+    ConversionResult,
+    Record,
+    nrl_to_r4_many,
+)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _chunks(records: Iterable[Record], chunk_size: int):
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _convert_chunk(
+    start: int, chunk: List[Record], trusted: bool = False
+) -> List[ConversionResult]:
+    results = list(nrl_to_r4_many(chunk, trusted=trusted))
+    for result in results:
+        result.index += start
+    return results
+
+
+def nrl_to_r4_parallel(
+    records: Iterable[Record],
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending_chunks: int = None,
+    trusted: bool = False,
+) -> Generator[ConversionResult, None, None]:
+    """
+    As nrl_to_r4_many, but records are converted in chunks of 'chunk_size'
+    across a pool of 'workers' processes (default: one per CPU).
+
+    Results are yielded in input order. At most 'max_pending_chunks' chunks
+    (default: two per worker) are submitted or awaiting collection at any time.
+    This bounds both the read-ahead on 'records' and the reorder buffer of
+    completed chunks that are waiting on an earlier, slower chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending_chunks = max_pending_chunks or 2 * workers
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            start = 0
+            for chunk in _chunks(records=records, chunk_size=chunk_size):
+                if len(pending) >= max_pending_chunks:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(_convert_chunk, start, chunk, trusted))
+                start += len(chunk)
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
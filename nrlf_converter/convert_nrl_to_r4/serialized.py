@@ -0,0 +1,104 @@
+"""
+Conversion straight to serialized JSON bytes, and a newline-delimited JSON
+writer that encodes R4 DocumentReference dicts into one reusable buffer
+rather than building a string per document. See utils.encoders for the
+choice of encoder.
+"""
+
+from typing import BinaryIO, Iterable, Union
+
+from nrlf_converter.convert_nrl_to_r4.direct import _convert_direct
+from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import reject_empty_args
+from nrlf_converter.utils.encoders import Encoder, get_encoder
+
+DEFAULT_NDJSON_BUFFER_SIZE = 1 << 16
+NEWLINE = ord("\n")
+
+
+@reject_empty_args(exemptions=("asid", "encoder"), normalise=True)
+def nrl_to_r4_bytes(
+    document_pointer: dict,
+    nhs_number: str,
+    asid: str = None,
+    encoder: Union[str, Encoder] = None,
+) -> bytes:
+    """
+    As 'nrl_to_r4_direct', but returns the R4 DocumentReference as compact
+    JSON bytes with sorted keys, encoded with 'encoder' (see get_encoder)
+    """
+    # document_pointer has already been stripped by reject_empty_args
+    document_reference = _convert_direct(
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid,
+        stripped=True,
+    )
+    return get_encoder(encoder)(document_reference)
+
+
+class NdjsonWriter:
+    """
+    Writes documents to a binary stream as newline-delimited JSON. Documents
+    are encoded into a fixed buffer of 'buffer_size' bytes, which is written
+    to the stream whenever it is full, on 'flush' and on leaving the context.
+    Documents larger than the buffer are written to the stream directly. As
+    the writer buffers its output, the stream can be unbuffered (raw).
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        encoder: Union[str, Encoder] = None,
+        buffer_size: int = DEFAULT_NDJSON_BUFFER_SIZE,
+    ):
+        self.stream = stream
+        self.encode = get_encoder(encoder)
+        self.buffer_size = buffer_size
+        self.n_documents = 0
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._position = 0
+
+    def write(self, document: dict):
+        self.write_encoded(self.encode(document))
+
+    def write_many(self, documents: Iterable[dict]):
+        encode, write_encoded = self.encode, self.write_encoded
+        for document in documents:
+            write_encoded(encode(document))
+
+    def write_encoded(self, data: bytes):
+        """Writes one already-encoded document"""
+        start = self._position
+        end = start + len(data)
+        if end >= self.buffer_size:
+            self.flush()
+            if len(data) >= self.buffer_size:
+                self._write(data)
+                self._write(b"\n")
+                self.n_documents += 1
+                return
+            start, end = 0, len(data)
+        # Same-length slice assignment: the buffer is never resized
+        self._buffer[start:end] = data
+        self._buffer[end] = NEWLINE
+        self._position = end + 1
+        self.n_documents += 1
+
+    def _write(self, data):
+        n_written = self.stream.write(data)
+        # An unbuffered (raw) stream can write only part of the data
+        while n_written is not None and n_written < len(data):
+            data = data[n_written:]
+            n_written = self.stream.write(data)
+
+    def flush(self):
+        if self._position:
+            self._write(self._view[: self._position])
+            self._position = 0
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
@@ -0,0 +1,109 @@
+"""
+An output mode for the direct conversion in which documents share their
+repeated parts: sub-dicts that recur across documents (e.g. the custodian
+identifier of each ODS code, or the 'type' coding) are replaced by a single
+shared instance, and the strings within them (and other repeated strings
+such as 'status') are interned. This reduces the memory used when many
+converted documents are held at once, but the shared parts of the documents
+must then be treated as read-only.
+"""
+
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable
+
+from nrlf_converter.utils.stats import CacheStats
+
+DEFAULT_SHARED_OUTPUT_SIZE = 4096
+
+# Parts of the DocumentReference that are shared
+SHARED_KEYS = ("type", "custodian")
+SHARED_ITEMS = ("category", "author")
+SHARED_CONTENT_KEYS = ("format", "extension")
+INTERNED_ATTACHMENT_KEYS = ("contentType", "language")
+
+
+def _key(value) -> Hashable:
+    # Keyed in order (so the shared value serializes identically) and by type
+    _type = type(value)
+    if _type is dict:
+        return (dict, tuple((key, _key(item)) for key, item in value.items()))
+    if _type is list:
+        return (list, tuple(map(_key, value)))
+    return (_type, value)
+
+
+def _intern_strings(value):
+    _type = type(value)
+    if _type is str:
+        return sys.intern(value)
+    if _type is dict:
+        for key, item in value.items():
+            value[key] = _intern_strings(item)
+    elif _type is list:
+        value[:] = map(_intern_strings, value)
+    return value
+
+
+class SharedOutput:
+    """
+    A thread-safe, bounded (LRU) cache of the parts of R4 DocumentReference
+    dicts that are shared between documents, see 'share'
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_SHARED_OUTPUT_SIZE):
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _shared(self, value):
+        key = _key(value)
+        with self._lock:
+            shared = self._values.get(key)
+            if shared is not None:
+                self._values.move_to_end(key)
+                self._hits += 1
+                return shared
+            self._misses += 1
+            self._values[key] = _intern_strings(value)
+            if len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def share(self, document_reference: dict) -> dict:
+        """
+        Replaces the shareable parts of 'document_reference' (which must be
+        owned by the caller, as returned by the direct conversion) in place
+        """
+        document_reference["status"] = sys.intern(document_reference["status"])
+        for key in SHARED_KEYS:
+            document_reference[key] = self._shared(document_reference[key])
+        for key in SHARED_ITEMS:
+            if key in document_reference:
+                document_reference[key] = list(
+                    map(self._shared, document_reference[key])
+                )
+        for content in document_reference["content"]:
+            for key in SHARED_CONTENT_KEYS:
+                if key in content:
+                    content[key] = self._shared(content[key])
+            attachment = content["attachment"]
+            for key in INTERNED_ATTACHMENT_KEYS:
+                if key in attachment:
+                    attachment[key] = sys.intern(attachment[key])
+        context = document_reference.get("context")
+        if context is not None:
+            context["practiceSetting"] = self._shared(context["practiceSetting"])
+        return document_reference
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=len(self._values),
+            )
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from nrlf_converter import nrl_to_r4_async, nrl_to_r4_many
+
+
+@pytest.fixture
+def mixed_records(records):
+    mixed_records = []
+    for document_pointer, nhs_number, asid in records:
+        mixed_records.append((document_pointer, nhs_number, asid))
+        mixed_records.append(({"status": "current"}, nhs_number, asid))
+    return mixed_records
+
+
+async def _async_records(records, delay=0.0):
+    for record in records:
+        await asyncio.sleep(delay)
+        yield record
+
+
+async def _collect(results):
+    return [result async for result in results]
+
+
+@pytest.mark.parametrize(
+    ["chunk_size", "max_concurrency", "delay"], [(1, 1, 0), (3, 2, 0), (100, 4, 0.001)]
+)
+def test_nrl_to_r4_async_equals_nrl_to_r4_many(
+    chunk_size, max_concurrency, delay, mixed_records
+):
+    records = mixed_records
+    expected = list(nrl_to_r4_many(records))
+
+    results = asyncio.run(
+        _collect(
+            nrl_to_r4_async(
+                records=_async_records(records, delay=delay),
+                chunk_size=chunk_size,
+                max_concurrency=max_concurrency,
+            )
+        )
+    )
+
+    assert [result.index for result in results] == list(range(len(records)))
+    assert [r.document_reference for r in results] == [
+        r.document_reference for r in expected
+    ]
+    assert [type(r.error) for r in results] == [type(r.error) for r in expected]
+
+
+def test_nrl_to_r4_async_applies_back_pressure(mixed_records):
+    n_read = 0
+
+    async def records():
+        nonlocal n_read
+        for record in mixed_records * 10:
+            n_read += 1
+            yield record
+
+    async def first_result():
+        results = nrl_to_r4_async(records=records(), chunk_size=2, max_concurrency=2)
+        result = await results.__anext__()
+        await asyncio.sleep(0.01)
+        await results.aclose()
+        return result
+
+    assert asyncio.run(first_result()).index == 0
+    assert n_read < len(mixed_records) * 10
+
+
+def test_nrl_to_r4_async_raises_source_errors(mixed_records):
+    n_records = 10
+    indexes = []
+
+    async def records():
+        for record in (mixed_records * n_records)[:n_records]:
+            yield record
+        raise RuntimeError("source failed")
+
+    async def collect():
+        results = nrl_to_r4_async(records=records(), chunk_size=2, max_concurrency=4)
+        async for result in results:
+            indexes.append(result.index)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect())
+    # Every record read before the error is converted first
+    assert indexes == list(range(n_records))
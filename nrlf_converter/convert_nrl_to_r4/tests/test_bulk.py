@@ -0,0 +1,81 @@
+import pytest
+
+from nrlf_converter import CustodianError, ValidationError, nrl_to_r4, nrl_to_r4_many
+from nrlf_converter.convert_nrl_to_r4 import bulk
+from nrlf_converter.utils.constants import EMPTY_VALUES
+
+
+def test_nrl_to_r4_many_equals_nrl_to_r4(records):
+    records = records * 2
+
+    results = list(nrl_to_r4_many(iter(records)))
+
+    assert [result.index for result in results] == list(range(len(results)))
+    assert all(result.ok for result in results)
+    assert [result.document_reference for result in results] == [
+        nrl_to_r4(document_pointer=pointer, nhs_number=nhs_number, asid=asid)
+        for pointer, nhs_number, asid in records
+    ]
+
+
+@pytest.mark.parametrize("empty_value", EMPTY_VALUES)
+def test_nrl_to_r4_many_captures_errors(
+    empty_value, load_document_pointer, nhs_number, asid
+):
+    good_pointer = load_document_pointer()
+    bad_custodian = load_document_pointer()
+    bad_custodian["custodian"]["reference"] = "not a custodian"
+    records = [
+        (good_pointer, nhs_number, asid),
+        (empty_value, nhs_number, asid),
+        (good_pointer, empty_value, asid),
+        (bad_custodian, nhs_number, asid),
+        (good_pointer, nhs_number, asid),
+    ]
+
+    results = list(nrl_to_r4_many(records))
+
+    assert [result.ok for result in results] == [True, False, False, False, True]
+    assert type(results[1].error) is ValidationError
+    assert type(results[2].error) is ValidationError
+    assert type(results[3].error) is CustodianError
+    assert results[0].document_reference == results[4].document_reference
+
+
+def test_nrl_to_r4_many_is_lazy(records):
+    def _records():
+        yield records[0]
+        raise RuntimeError("Only the first record should have been consumed")
+
+    results = nrl_to_r4_many(_records())
+    assert next(results).ok
+
+
+def test_nrl_to_r4_many_trusted(load_document_pointer, nhs_number, asid):
+    good_pointer = load_document_pointer()
+    bad_custodian = load_document_pointer()
+    bad_custodian["custodian"]["reference"] = "not a custodian"
+    records = [(good_pointer, nhs_number, asid), (bad_custodian, nhs_number, asid)]
+
+    results = list(nrl_to_r4_many(records, trusted=True))
+
+    assert results[0].document_reference == nrl_to_r4(good_pointer, nhs_number, asid)
+    assert type(results[1].error) is CustodianError
+
+
+def test_nrl_to_r4_many_captures_malformed_records(records):
+    records = [(5, *records[0][1:]), records[0]]
+
+    results = list(nrl_to_r4_many(records))
+
+    assert type(results[0].error) is TypeError
+    assert results[1].ok
+
+
+def test_nrl_to_r4_many_raises_other_errors(monkeypatch, records):
+    def _convert_direct(**kwargs):
+        raise KeyError("a bug, not a bad record")
+
+    monkeypatch.setattr(bulk, "_convert_direct", _convert_direct)
+    with pytest.raises(KeyError):
+        list(nrl_to_r4_many(records))
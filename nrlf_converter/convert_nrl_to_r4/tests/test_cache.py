@@ -0,0 +1,125 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from nrlf_converter import MemoryCache, SharedOutput, SqliteCache, nrl_to_r4_many
+from nrlf_converter.convert_nrl_to_r4.cache import ConversionCache, cache_key
+
+
+def _documents(results) -> str:
+    return json.dumps([(result.document_reference, result.error) for result in results])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path: Path):
+    if request.param == "memory":
+        yield MemoryCache()
+    else:
+        with SqliteCache(path=str(tmp_path / "cache.sqlite")) as cache:
+            yield cache
+
+
+def test_cache_key(nhs_number, asid):
+    document_pointer = {"a": 1, "b": ["c"]}
+    key = cache_key(document_pointer, nhs_number, asid)
+    # Stable for equal records, however they were built
+    assert key == cache_key(json.loads(json.dumps(document_pointer)), nhs_number, asid)
+    assert key == cache_key({"a": 1, "b": [sys.intern("c")]}, nhs_number, asid)
+    assert key == "abf2ef447d54bed2ae8df563ee78357bdff0cee2148ea1040d85bd7d8b2b9539"
+    assert key != cache_key({"a": True, "b": ["c"]}, nhs_number, asid)
+    assert key != cache_key(document_pointer, nhs_number, None)
+    assert key != cache_key(document_pointer, "9999999999", asid)
+    assert cache_key({"a": object()}, nhs_number, asid) is None
+
+
+def test_nrl_to_r4_many_cache(cache, records):
+    expected = _documents(nrl_to_r4_many(records))
+    n_records = len(records)
+
+    assert _documents(nrl_to_r4_many(records, cache=cache)) == expected
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.currsize) == (0, n_records, n_records)
+
+    assert _documents(nrl_to_r4_many(records, cache=cache)) == expected
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (n_records, n_records)
+    assert stats.hit_rate == 0.5
+
+
+def test_nrl_to_r4_many_cache_hits_are_owned(cache, records):
+    records = records[:1]
+    (first,) = nrl_to_r4_many(records, cache=cache)
+    first.document_reference["status"] = "modified"
+    (second,) = nrl_to_r4_many(records, cache=cache)
+    (third,) = nrl_to_r4_many(records, cache=cache)
+    assert cache.stats().hits == 2
+    assert second.document_reference["status"] != "modified"
+    assert second.document_reference is not third.document_reference
+
+
+def test_nrl_to_r4_many_cache_shared_output(cache, records):
+    expected = _documents(nrl_to_r4_many(records))
+    shared_output = SharedOutput()
+    for _ in range(2):
+        results = list(
+            nrl_to_r4_many(records, shared_output=shared_output, cache=cache)
+        )
+        assert _documents(results) == expected
+    # Cache hits are shared like conversions
+    document_reference = results[0].document_reference
+    assert (
+        document_reference["custodian"]
+        is shared_output.share(dict(document_reference))["custodian"]
+    )
+
+
+def test_nrl_to_r4_many_cache_skips_failures_and_trusted(
+    cache, records, load_document_pointer, nhs_number, asid
+):
+    bad_custodian = load_document_pointer()
+    bad_custodian["custodian"]["reference"] = "not a custodian"
+    bad_records = [
+        (bad_custodian, nhs_number, asid),
+        ({"a": object()}, nhs_number, asid),
+    ]
+    for _ in range(2):
+        assert [result.ok for result in nrl_to_r4_many(bad_records, cache=cache)] == [
+            False,
+            False,
+        ]
+    assert cache.stats().currsize == 0
+
+    list(nrl_to_r4_many(records, trusted=True, cache=cache))
+    assert cache.stats().currsize == 0
+
+
+def test_conversion_cache_is_abstract():
+    with pytest.raises(TypeError):
+        ConversionCache()
+
+
+def test_memory_cache_is_bounded():
+    cache = MemoryCache(maxsize=2)
+    for key in "abc":
+        cache.set(key, {"id": key})
+    assert cache.get("a") is None
+    assert cache.get("b") == {"id": "b"}
+    cache.set("d", {"id": "d"})
+    assert cache.get("c") is None
+    assert cache.get("b") == {"id": "b"}
+    stats = cache.stats()
+    assert (stats.maxsize, stats.currsize) == (2, 2)
+
+
+def test_sqlite_cache_persists(tmp_path: Path, records):
+    path = str(tmp_path / "cache.sqlite")
+    expected = _documents(nrl_to_r4_many(records))
+    with SqliteCache(path=path) as cache:
+        list(nrl_to_r4_many(records, cache=cache))
+    with SqliteCache(path=path) as cache:
+        assert _documents(nrl_to_r4_many(records, cache=cache)) == expected
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (len(records), 0)
+        assert stats.maxsize is None
@@ -0,0 +1,246 @@
+import json
+from copy import deepcopy
+from dataclasses import asdict
+from typing import List
+
+import hypothesis
+import pytest
+from hypothesis.strategies import data, sampled_from
+
+from nrlf_converter import ValidationError, nrl_to_r4, nrl_to_r4_direct
+from nrlf_converter.nrl.document_pointer import ContentItem, DocumentPointer
+from nrlf_converter.nrl.tests.test_document_pointer import (
+    ssp_content_items,
+    valid_document_pointer,
+)
+from nrlf_converter.utils.constants import EMPTY_VALUES
+
+
+def _convert_both(document_pointer: dict, nhs_number: str, asid: str):
+    """Returns the outcome of each conversion as (exception type, output bytes)"""
+    outcomes = []
+    for convert in (nrl_to_r4, nrl_to_r4_direct):
+        try:
+            document_reference = convert(
+                document_pointer=deepcopy(document_pointer),
+                nhs_number=nhs_number,
+                asid=asid,
+            )
+        except Exception as exc:
+            outcomes.append((type(exc), str(exc)))
+        else:
+            outcomes.append((None, json.dumps(document_reference)))
+    return outcomes
+
+
+def _as_raw_pointer(document_pointer: DocumentPointer) -> dict:
+    _document_pointer = asdict(document_pointer)
+    _document_pointer["class"] = _document_pointer.pop("class_")
+    return _document_pointer
+
+
+@pytest.mark.parametrize("has_asid", [True, False])
+def test_nrl_to_r4_direct_is_byte_identical(path_to_data, has_asid, nhs_number, asid):
+    with open(path_to_data) as f:
+        document_pointer = json.load(f)
+    reference, direct = _convert_both(
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid if has_asid else None,
+    )
+    assert direct == reference
+
+
+@hypothesis.given(document_pointer=valid_document_pointer, data=data())
+def test_nrl_to_r4_direct_is_byte_identical_for_any_pointer(
+    document_pointer: DocumentPointer, data, nhs_number, asid
+):
+    reference, direct = _convert_both(
+        document_pointer=_as_raw_pointer(document_pointer),
+        nhs_number=nhs_number,
+        asid=data.draw(sampled_from([asid, *EMPTY_VALUES])),
+    )
+    assert direct == reference
+
+
+@hypothesis.given(
+    document_pointer=valid_document_pointer, ssp_content_items=ssp_content_items
+)
+def test_nrl_to_r4_direct_is_byte_identical_for_ssp(
+    document_pointer: DocumentPointer,
+    ssp_content_items: List[ContentItem],
+    nhs_number,
+    asid,
+):
+    document_pointer.content = ssp_content_items
+    reference, direct = _convert_both(
+        document_pointer=_as_raw_pointer(document_pointer),
+        nhs_number=nhs_number,
+        asid=asid,
+    )
+    assert direct == reference
+
+
+def test_nrl_to_r4_direct_is_byte_identical_for_empty_relates_to_logical_id(
+    load_document_pointer, nhs_number, asid
+):
+    document_pointer = load_document_pointer("NRLF-590-attachment_with_title.json")
+    document_pointer["relatesTo"] = {
+        "code": "replaces",
+        "target": {"reference": "https://x/DocumentReference/"},
+    }
+    reference, direct = _convert_both(
+        document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
+    assert reference[0] is None
+    assert direct == reference
+
+
+@pytest.mark.parametrize(
+    "path_to_field",
+    [
+        ("status",),
+        ("type", "code"),
+        ("content", 0, "attachment", "contentType"),
+        ("content", 0, "format"),
+        ("context", "practiceSetting", "practiceSettingCoding", 0, "display"),
+        ("custodian", "reference"),
+    ],
+)
+@pytest.mark.parametrize("bad_value", [123, ["a list"], {"unexpected": "dict"}])
+def test_nrl_to_r4_direct_raises_the_same_errors(
+    path_to_field, bad_value, load_document_pointer, nhs_number, asid
+):
+    document_pointer = load_document_pointer("NRLF-590-attachment_with_title.json")
+    *path, field = path_to_field
+    obj = document_pointer
+    for key in path:
+        obj = obj[key]
+    obj[field] = bad_value
+
+    reference, direct = _convert_both(
+        document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
+    assert reference[0] is not None
+    assert direct == reference
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_unexpected_fields_raise_the_same_validation_error(
+    trusted, load_document_pointer, nhs_number, asid
+):
+    document_pointer = load_document_pointer("NRLF-590-attachment_with_title.json")
+    document_pointer["unexpected"] = "value"
+
+    outcomes = []
+    for convert in (nrl_to_r4, nrl_to_r4_direct):
+        with pytest.raises(ValidationError) as error:
+            convert(
+                document_pointer=deepcopy(document_pointer),
+                nhs_number=nhs_number,
+                asid=asid,
+                trusted=trusted,
+            )
+        outcomes.append(str(error.value))
+    assert outcomes[0] == outcomes[1]
+    assert "'DocumentPointer.unexpected'" in outcomes[0]
+
+
+def _convert_trusted_and_untrusted(
+    convert, document_pointer: dict, nhs_number: str, asid: str
+):
+    outcomes = []
+    for trusted in (False, True):
+        _document_pointer = deepcopy(document_pointer)
+        try:
+            document_reference = convert(
+                document_pointer=_document_pointer,
+                nhs_number=nhs_number,
+                asid=asid,
+                trusted=trusted,
+            )
+        except Exception as exc:
+            outcomes.append((type(exc), str(exc)))
+        else:
+            outcomes.append((None, json.dumps(document_reference)))
+        assert _document_pointer == document_pointer
+    return outcomes
+
+
+@pytest.mark.parametrize("convert", [nrl_to_r4, nrl_to_r4_direct])
+@pytest.mark.parametrize("has_asid", [True, False])
+def test_trusted_conversion_is_byte_identical(
+    convert, path_to_data, has_asid, nhs_number, asid
+):
+    with open(path_to_data) as f:
+        document_pointer = json.load(f)
+    untrusted, trusted = _convert_trusted_and_untrusted(
+        convert=convert,
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid if has_asid else None,
+    )
+    assert trusted == untrusted
+
+
+@pytest.mark.parametrize("convert", [nrl_to_r4, nrl_to_r4_direct])
+@hypothesis.given(document_pointer=valid_document_pointer)
+def test_trusted_conversion_is_byte_identical_for_any_pointer(
+    convert, document_pointer: DocumentPointer, nhs_number, asid
+):
+    untrusted, trusted = _convert_trusted_and_untrusted(
+        convert=convert,
+        document_pointer=_as_raw_pointer(document_pointer),
+        nhs_number=nhs_number,
+        asid=asid,
+    )
+    assert trusted == untrusted
+
+
+@pytest.mark.parametrize("convert", [nrl_to_r4, nrl_to_r4_direct])
+@pytest.mark.parametrize(
+    "path_to_field, bad_value",
+    [
+        (("custodian", "reference"), "not a custodian"),
+        (("author", "reference"), "not an author"),
+        (("relatesTo", "target", "reference"), "not a pointer"),
+        (("content", 0, "attachment", "url"), "http://example.com"),
+    ],
+)
+def test_trusted_conversion_raises_the_errors_of_the_transformation(
+    convert, path_to_field, bad_value, load_document_pointer, nhs_number, asid
+):
+    document_pointer = load_document_pointer(
+        "NRLF-626-clinicals_in_replaces_reference.json"
+    )
+    *path, field = path_to_field
+    obj = document_pointer
+    for key in path:
+        obj = obj[key]
+    obj[field] = bad_value
+
+    untrusted, trusted = _convert_trusted_and_untrusted(
+        convert=convert,
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid,
+    )
+    assert trusted[0] is not None
+    assert trusted == untrusted
+
+
+@pytest.mark.parametrize("convert", [nrl_to_r4, nrl_to_r4_direct])
+def test_trusted_conversion_does_not_run_the_field_validators(
+    convert, load_document_pointer, nhs_number, asid
+):
+    document_pointer = load_document_pointer("NRLF-590-attachment_with_title.json")
+    document_pointer["status"] = "superseded"
+
+    untrusted, trusted = _convert_trusted_and_untrusted(
+        convert=convert,
+        document_pointer=document_pointer,
+        nhs_number=nhs_number,
+        asid=asid,
+    )
+    assert untrusted[0] is ValidationError
+    assert json.loads(trusted[1])["status"] == "superseded"
@@ -1,4 +1,6 @@
+import copy
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 from datetime import datetime
 from typing import List
@@ -17,12 +19,14 @@ from hypothesis.strategies import (
 from pydantic import ConfigDict
 from pydantic.dataclasses import dataclass
 
+from nrlf_converter.convert_nrl_to_r4.direct import nrl_to_r4_direct
 from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import (
     _content_items,
     _https_to_ssp,
     _nrlf_id,
     _relates_to,
     nrl_to_r4,
+    nrl_to_r4_parsed,
     reject_empty_args,
 )
 from nrlf_converter.nrl.constants import CUSTODIAN_ODS_REGEX
@@ -33,6 +37,7 @@ from nrlf_converter.nrl.tests.test_document_pointer import (
     ssp_content_items,
     valid_document_pointer,
 )
+from nrlf_converter.r4.constants import CONTENT_STABILITY_SYSTEM, CONTENT_STABILITY_URL
 from nrlf_converter.r4.document_reference import DocumentReference as _DocumentReference
 from nrlf_converter.utils.constants import EMPTY_VALUES
 from nrlf_converter.utils.utils import strip_empty_json_paths
@@ -204,6 +209,32 @@ def test_reject_empty_args_fail_with_exemptions(a, b, c, d):
         my_other_func(a, b=b, c=c, d=d)
 
 
+@reject_empty_args(exemptions=["b"], normalise=True)
+def my_normalising_func(a, b):
+    return a, b
+
+
+def test_reject_empty_args_normalise():
+    a = {"keep": "value", "drop": {"empty": [None, ""]}}
+    b = {"exempt": None}
+    _a, _b = my_normalising_func(a, b=b)
+    assert _a == {"keep": "value"}
+    assert _b is b
+    assert a == {"keep": "value", "drop": {"empty": [None, ""]}}
+
+    with pytest.raises(ValidationError):
+        my_normalising_func({"drop": {"empty": [None, ""]}}, b=b)
+
+
+@pytest.mark.parametrize("convert", [nrl_to_r4, nrl_to_r4_direct])
+def test_nrl_to_r4_does_not_modify_input(convert, document_pointer, nhs_number, asid):
+    document_pointer["meta"] = {"empty": ""}
+    original = copy.deepcopy(document_pointer)
+    first = convert(document_pointer, nhs_number, asid)
+    assert document_pointer == original
+    assert convert(document_pointer, nhs_number, asid) == first
+
+
 @pytest.mark.parametrize(
     "protocol",
     [
@@ -256,6 +287,10 @@ def test__content_items(
         )
         assert asdict(item.format) == asdict(_item.format)
         assert len((_item.extension)) > 0
+        item.extension[0].url = CONTENT_STABILITY_URL
+        item.extension[0].valueCodeableConcept.coding[
+            0
+        ].system = CONTENT_STABILITY_SYSTEM
         assert asdict(item.extension[0]) == asdict(_item.extension[0])
         assert (
             _item.attachment.size == 1000
@@ -276,3 +311,52 @@ def test__content_items(
         assert asdict(item.attachment) != asdict(_item.attachment)
         item.attachment.url = "ssp://foo.bar"
         assert asdict(item.attachment) == asdict(_item.attachment)
+
+
+@hypothesis.given(
+    non_ssp_content_items=non_ssp_content_items, ssp_content_items=ssp_content_items
+)
+def test__content_items_does_not_modify_content_items(
+    non_ssp_content_items: List[ContentItem],
+    ssp_content_items: List[ContentItem],
+):
+    content_items = non_ssp_content_items + ssp_content_items
+    before = [asdict(item) for item in content_items]
+    list(_content_items(content_items=content_items))
+    assert [asdict(item) for item in content_items] == before
+
+
+@hypothesis.given(document_pointer=valid_document_pointer)
+def test_nrl_to_r4_parsed(document_pointer: DocumentPointer, nhs_number, asid):
+    _document_pointer = asdict(document_pointer)
+    _document_pointer["class"] = _document_pointer.pop("class_")
+    expected = nrl_to_r4(
+        document_pointer=_document_pointer, nhs_number=nhs_number, asid=asid
+    )
+
+    parsed = DocumentPointer.parse_obj(_document_pointer)
+    frozen = DocumentPointer.parse_frozen(_document_pointer)
+    for pointer in (parsed, frozen, parsed, frozen):
+        document_reference = nrl_to_r4_parsed(
+            document_pointer=pointer, nhs_number=nhs_number, asid=asid
+        )
+        assert json.dumps(document_reference) == json.dumps(expected)
+    assert parsed == DocumentPointer.parse_obj(_document_pointer)
+
+
+def test_nrl_to_r4_parsed_concurrently(document_pointers, nhs_number, asid):
+    frozen = [DocumentPointer.parse_frozen(pointer) for pointer in document_pointers]
+    expected = [
+        nrl_to_r4(document_pointer=pointer, nhs_number=nhs_number, asid=asid)
+        for pointer in document_pointers
+    ]
+
+    def _convert_all(_):
+        return [
+            nrl_to_r4_parsed(document_pointer=pointer, nhs_number=nhs_number, asid=asid)
+            for pointer in frozen
+        ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for document_references in executor.map(_convert_all, range(32)):
+            assert document_references == expected
@@ -0,0 +1,47 @@
+import pytest
+
+from nrlf_converter import nrl_to_r4_many, nrl_to_r4_parallel
+
+
+@pytest.fixture
+def mixed_records(records):
+    mixed_records = []
+    for document_pointer, nhs_number, asid in records:
+        mixed_records.append((document_pointer, nhs_number, asid))
+        mixed_records.append((document_pointer, nhs_number, None))
+        mixed_records.append(({"status": "current"}, nhs_number, asid))
+    return mixed_records
+
+
+@pytest.mark.parametrize(
+    ["workers", "chunk_size", "max_pending_chunks"], [(2, 1, None), (2, 7, 1)]
+)
+def test_nrl_to_r4_parallel_equals_nrl_to_r4_many(
+    workers, chunk_size, max_pending_chunks, mixed_records
+):
+    records = mixed_records
+    expected = list(nrl_to_r4_many(records))
+
+    results = list(
+        nrl_to_r4_parallel(
+            records=iter(records),
+            workers=workers,
+            chunk_size=chunk_size,
+            max_pending_chunks=max_pending_chunks,
+        )
+    )
+
+    assert [result.index for result in results] == list(range(len(records)))
+    assert [r.document_reference for r in results] == [
+        r.document_reference for r in expected
+    ]
+    assert [(type(r.error), str(r.error)) for r in results] == [
+        (type(r.error), str(r.error)) for r in expected
+    ]
+    assert any(not result.ok for result in results)
+
+
+def test_nrl_to_r4_parallel_can_be_closed_early(mixed_records):
+    results = nrl_to_r4_parallel(records=mixed_records, workers=2, chunk_size=1)
+    assert next(results).index == 0
+    results.close()
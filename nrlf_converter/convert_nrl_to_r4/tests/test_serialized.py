@@ -0,0 +1,74 @@
+import json
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from nrlf_converter import NdjsonWriter, nrl_to_r4, nrl_to_r4_bytes
+from nrlf_converter.utils.validation.errors import ValidationError
+
+
+def _documents(records):
+    return [
+        nrl_to_r4(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+        for document_pointer, nhs_number, asid in records
+    ]
+
+
+def test_nrl_to_r4_bytes(path_to_data: Path, nhs_number, asid):
+    document_pointer = json.loads(path_to_data.read_text())
+    expected = nrl_to_r4(
+        document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
+    data = nrl_to_r4_bytes(
+        document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
+    assert type(data) is bytes
+    assert json.loads(data) == expected
+    assert data == json.dumps(
+        expected, separators=(",", ":"), sort_keys=True, ensure_ascii=False
+    ).encode("utf-8")
+
+
+def test_nrl_to_r4_bytes_rejects_empty_args(nhs_number, asid):
+    with pytest.raises(ValidationError):
+        nrl_to_r4_bytes(document_pointer={}, nhs_number=nhs_number, asid=asid)
+
+
+@pytest.mark.parametrize("buffer_size", [1, 100, 2000, 1 << 16])
+def test_ndjson_writer(buffer_size: int, records):
+    documents = _documents(records)
+    stream = BytesIO()
+    with NdjsonWriter(stream=stream, buffer_size=buffer_size) as writer:
+        writer.write(documents[0])
+        writer.write_many(documents[1:])
+
+    assert writer.n_documents == len(documents)
+    assert stream.getvalue().endswith(b"\n")
+    assert list(map(json.loads, stream.getvalue().splitlines())) == documents
+
+
+def test_ndjson_writer_buffers_until_flush():
+    stream = BytesIO()
+    writer = NdjsonWriter(stream=stream, encoder=lambda obj: b"{}")
+    writer.write({})
+    assert stream.getvalue() == b""
+    writer.flush()
+    assert stream.getvalue() == b"{}\n"
+
+
+class _PartialStream(BytesIO):
+    """As a raw stream, which can write only part of the data at once"""
+
+    def write(self, data) -> int:
+        return super().write(bytes(data[:3]))
+
+
+@pytest.mark.parametrize("buffer_size", [4, 1 << 16])
+def test_ndjson_writer_completes_partial_writes(buffer_size: int, records):
+    documents = _documents(records)
+    stream = _PartialStream()
+    with NdjsonWriter(stream=stream, buffer_size=buffer_size) as writer:
+        writer.write_many(documents)
+
+    assert list(map(json.loads, stream.getvalue().splitlines())) == documents
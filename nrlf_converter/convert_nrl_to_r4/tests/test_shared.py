@@ -0,0 +1,64 @@
+import json
+import sys
+
+import pytest
+
+from nrlf_converter import SharedOutput, nrl_to_r4_direct, nrl_to_r4_many
+from nrlf_converter.convert_nrl_to_r4.shared import _key
+
+
+@pytest.fixture
+def repeated_records(records):
+    # Each record has its own strings, as if read from a file
+    return records + [
+        (json.loads(json.dumps(document_pointer)), nhs_number, asid)
+        for document_pointer, nhs_number, asid in records
+    ]
+
+
+def test__key():
+    assert _key({"a": 1, "b": "c"}) != _key({"b": "c", "a": 1})
+    assert _key({"a": 1}) != _key({"a": True})
+    assert _key({"a": [{}]}) != _key({"a": [[]]})
+    assert _key({"a": ["b"]}) == _key({"a": ["b"]})
+
+
+def test_shared_output_is_identical(repeated_records):
+    expected = [
+        result.document_reference for result in nrl_to_r4_many(repeated_records)
+    ]
+    shared_output = SharedOutput()
+    documents = [
+        result.document_reference
+        for result in nrl_to_r4_many(repeated_records, shared_output=shared_output)
+    ]
+    assert json.dumps(documents) == json.dumps(expected)
+
+    stats = shared_output.stats()
+    assert stats.hits > stats.misses > 0
+
+
+def test_shared_output_shares_repeated_parts(records, repeated_records):
+    shared_output = SharedOutput()
+    first, second = (
+        nrl_to_r4_direct(pointer, nhs_number, asid, shared_output=shared_output)
+        for pointer, nhs_number, asid in repeated_records[:: len(records)]
+    )
+    assert first is not second
+    assert first["custodian"] is second["custodian"]
+    assert first["author"][0] is second["author"][0]
+    assert first["type"] is second["type"]
+    assert first["content"][0]["format"] is second["content"][0]["format"]
+    assert first["content"][0] is not second["content"][0]
+    assert first["id"] == second["id"]
+
+    code = first["type"]["coding"][0]["code"]
+    assert code is sys.intern(code)
+    assert first["status"] is second["status"]
+
+
+def test_shared_output_is_bounded(repeated_records):
+    shared_output = SharedOutput(maxsize=3)
+    for _ in nrl_to_r4_many(repeated_records, shared_output=shared_output):
+        pass
+    assert shared_output.stats().currsize == 3
@@ -0,0 +1,170 @@
+import json
+from copy import deepcopy
+
+import pytest
+
+from nrlf_converter import (
+    ValidationError,
+    nrl_to_r4_direct,
+    validate_nrl_to_r4,
+    validate_nrl_to_r4_many,
+)
+from nrlf_converter.convert_nrl_to_r4 import validate
+from nrlf_converter.nrl.constants import REPLACES
+from nrlf_converter.utils.constants import EMPTY_VALUES
+from nrlf_converter.utils.validation.errors import FieldNotFound, InvalidValue
+
+
+def _bad_status(document_pointer: dict):
+    document_pointer["status"] = "superseded"
+
+
+def _missing_type(document_pointer: dict):
+    del document_pointer["type"]
+
+
+def _unexpected_field(document_pointer: dict):
+    document_pointer["custodian"]["unexpected"] = "value"
+
+
+def _bad_custodian(document_pointer: dict):
+    document_pointer["custodian"]["reference"] = "not a custodian"
+
+
+def _bad_author(document_pointer: dict):
+    document_pointer["author"]["reference"] = "not an author"
+
+
+def _bad_relates_to(document_pointer: dict):
+    document_pointer["relatesTo"] = {
+        "code": REPLACES,
+        "target": {"reference": "not a pointer"},
+    }
+
+
+def _http_url(document_pointer: dict):
+    for content in document_pointer["content"]:
+        content["attachment"]["url"] = "http://example.com"
+
+
+def _empty_values(document_pointer: dict):
+    # All stripped before validation, so the pointer is still valid
+    document_pointer["custodian"]["display"] = ""
+    document_pointer["unexpected"] = [{}, None]
+    document_pointer["content"].append({"attachment": {"url": ""}})
+    document_pointer["content"][0]["format"]["system"] = None
+
+
+def _empty_required_field(document_pointer: dict):
+    document_pointer["logicalIdentifier"] = {"logicalId": ""}
+
+
+DEFECTS = [
+    None,
+    _bad_status,
+    _missing_type,
+    _unexpected_field,
+    _bad_custodian,
+    _bad_author,
+    _bad_relates_to,
+    _http_url,
+    _empty_values,
+    _empty_required_field,
+]
+
+
+def _outcome(fn, document_pointer, nhs_number, asid):
+    try:
+        fn(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+    except Exception as exc:
+        return type(exc), str(exc)
+    return None
+
+
+@pytest.mark.parametrize("defect", DEFECTS)
+@pytest.mark.parametrize("has_asid", [True, False])
+def test_validate_nrl_to_r4_equals_nrl_to_r4_direct(
+    path_to_data, defect, has_asid, nhs_number, asid
+):
+    document_pointer = json.loads(path_to_data.read_text())
+    if defect is not None:
+        defect(document_pointer)
+    original = deepcopy(document_pointer)
+    asid = asid if has_asid else None
+
+    outcome = _outcome(validate_nrl_to_r4, document_pointer, nhs_number, asid)
+
+    assert document_pointer == original
+    assert outcome == _outcome(nrl_to_r4_direct, document_pointer, nhs_number, asid)
+
+
+@pytest.mark.parametrize("defect", DEFECTS)
+@pytest.mark.parametrize("has_asid", [True, False])
+def test_validate_nrl_to_r4_many_equals_nrl_to_r4_direct(
+    path_to_data, defect, has_asid, nhs_number, asid
+):
+    document_pointer = json.loads(path_to_data.read_text())
+    if defect is not None:
+        defect(document_pointer)
+    original = deepcopy(document_pointer)
+    asid = asid if has_asid else None
+
+    (result,) = validate_nrl_to_r4_many([(document_pointer, nhs_number, asid)])
+
+    assert document_pointer == original
+    outcome = None if result.ok else (type(result.error), str(result.error))
+    assert outcome == _outcome(nrl_to_r4_direct, document_pointer, nhs_number, asid)
+
+
+@pytest.mark.parametrize("empty_value", EMPTY_VALUES)
+def test_validate_nrl_to_r4_rejects_empty_args(
+    empty_value, document_pointer, nhs_number, asid
+):
+    with pytest.raises(ValidationError):
+        validate_nrl_to_r4(empty_value, nhs_number, asid)
+    with pytest.raises(ValidationError):
+        validate_nrl_to_r4(document_pointer, empty_value, asid)
+
+
+def test_validate_nrl_to_r4_many(load_document_pointer, nhs_number, asid):
+    good_pointer = load_document_pointer()
+    bad_pointer = load_document_pointer()
+    _bad_status(bad_pointer)
+    _missing_type(bad_pointer)
+    bad_custodian = load_document_pointer()
+    _bad_custodian(bad_custodian)
+    records = [
+        (good_pointer, nhs_number, asid),
+        (None, nhs_number, asid),
+        (bad_pointer, nhs_number, asid),
+        (bad_custodian, nhs_number, asid),
+    ]
+
+    results = list(validate_nrl_to_r4_many(records))
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.ok for result in results] == [True, False, False, False]
+    assert [_outcome(validate_nrl_to_r4, *record) for record in records[2:]] == [
+        (type(result.error), str(result.error)) for result in results[2:]
+    ]
+    assert all(result.field_errors is None for result in results)
+
+    results = list(validate_nrl_to_r4_many(records, collect_field_errors=True))
+    assert results[0].field_errors is None
+    assert [(error.path, error.error) for error in results[2].field_errors] == [
+        ("DocumentPointer.status", InvalidValue),
+        ("DocumentPointer.type", FieldNotFound),
+    ]
+    # The pointer is valid, but its custodian cannot be converted
+    assert results[3].field_errors == []
+
+
+def test_validate_nrl_to_r4_many_raises_other_errors(monkeypatch, records):
+    def _check(**kwargs):
+        raise KeyError("a bug, not a bad record")
+
+    monkeypatch.setattr(validate, "_check", _check)
+    assert type(next(validate_nrl_to_r4_many([(5, *records[0][1:])])).error) is (
+        TypeError
+    )
+    with pytest.raises(KeyError):
+        list(validate_nrl_to_r4_many(records))
@@ -0,0 +1,121 @@
+"""
+Validates NRL document pointers without converting them, e.g. to count the
+records that a migration would reject. A record passes exactly when
+'nrl_to_r4_direct' would convert it, and otherwise fails with the error that
+the conversion would raise, but no R4 DocumentReference is built: validation
+stops after parsing the DocumentPointer and checking the ODS codes, the
+relatesTo and the SSP content (including that an ASID is given for it).
+The document pointer is parsed by DocumentPointer.parse_dict, as by the
+conversion, so that there is one set of validation rules.
+"""
+
+from dataclasses import dataclass
+from typing import Generator, Iterable, List, Optional
+
+from nrlf_converter.convert_nrl_to_r4.bulk import RECORD_ERRORS, Record
+from nrlf_converter.convert_nrl_to_r4.direct import _is_ssp
+from nrlf_converter.convert_nrl_to_r4.nrl_to_r4 import (
+    _https_to_ssp,
+    _is_empty,
+    _normalise,
+    reject_empty_args,
+)
+from nrlf_converter.nrl.constants import REPLACES
+from nrlf_converter.nrl.document_pointer import (
+    DocumentPointer,
+    RelatesTo,
+    parse_ods_code,
+)
+from nrlf_converter.nrl.errors import AuthorError, CustodianError
+from nrlf_converter.utils.constants import EMPTY_VALUES
+from nrlf_converter.utils.validation.errors import FieldError, ValidationError
+
+
+@dataclass
+class ValidationResult:
+    index: int
+    error: Optional[Exception] = None
+    # Every problem with the document pointer, if requested and it failed
+    field_errors: Optional[List[FieldError]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _check(pointer: dict, asid: str = None):
+    # The checks of _convert_direct after parsing, in the same order
+    content: List[dict] = pointer["content"]
+    ssp_content = [item for item in content if _is_ssp(item["format"])]
+    if ssp_content and not asid:
+        raise ValidationError(
+            message="ASID must be provided for DocumentPointers with SSP content"
+        )
+    parse_ods_code(
+        reference=pointer["custodian"].get("reference"), error=CustodianError
+    )
+    parse_ods_code(reference=pointer["author"].get("reference"), error=AuthorError)
+    relates_to = pointer.get("relatesTo")
+    if relates_to is not None and relates_to.get("code") == REPLACES:
+        RelatesTo(**relates_to).logical_id
+    for item in ssp_content:
+        _https_to_ssp(item["attachment"]["url"])
+
+
+def _validate(document_pointer: dict, asid: str = None, stripped: bool = False):
+    _check(
+        pointer=DocumentPointer.parse_dict(document_pointer, _owned=stripped),
+        asid=asid,
+    )
+
+
+def _validate_record(document_pointer, nhs_number, asid: Optional[str]):
+    if _is_empty(nhs_number):
+        raise ValidationError(
+            message="One or more empty or null values passed to nrl_to_r4"
+        )
+    _document_pointer = _normalise(document_pointer)
+    if _document_pointer in EMPTY_VALUES:
+        raise ValidationError(
+            message="One or more empty or null values passed to nrl_to_r4"
+        )
+    _validate(document_pointer=_document_pointer, asid=asid, stripped=True)
+
+
+@reject_empty_args(exemptions=("asid",), normalise=True)
+def validate_nrl_to_r4(document_pointer: dict, nhs_number: str, asid: str = None):
+    """
+    Raises the error that 'nrl_to_r4_direct' would raise for these arguments,
+    if any, without converting them. The input is not modified.
+    """
+    # document_pointer has already been stripped by reject_empty_args
+    _validate(document_pointer=document_pointer, asid=asid, stripped=True)
+
+
+def validate_nrl_to_r4_many(
+    records: Iterable[Record], collect_field_errors: bool = False
+) -> Generator[ValidationResult, None, None]:
+    """
+    Lazily validates (document_pointer, nhs_number, asid) records as
+    'validate_nrl_to_r4', yielding one ValidationResult per record in input
+    order. As with nrl_to_r4_many, the errors raised by a bad record
+    (RECORD_ERRORS) are captured on its result, and any other exception is
+    raised. With 'collect_field_errors', each failed record also reports
+    every problem with its document pointer (see
+    ValidatedModel.collect_errors).
+    """
+    for index, (document_pointer, nhs_number, asid) in enumerate(records):
+        try:
+            _validate_record(document_pointer, nhs_number, asid)
+        except RECORD_ERRORS as exc:
+            yield ValidationResult(
+                index=index,
+                error=exc,
+                field_errors=(
+                    DocumentPointer.collect_errors(document_pointer)
+                    if collect_field_errors
+                    else None
+                ),
+            )
+        else:
+            yield ValidationResult(index=index)
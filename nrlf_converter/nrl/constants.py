@@ -10,6 +10,7 @@ ODS_SYSTEM = "https://fhir.nhs.uk/Id/ods-organization-code"
 CUSTODIAN_ODS_REGEX = re.compile(
     "^https://directory.spineservices.nhs.uk/STU3/Organization/(?P<ods_code>[a-zA-Z0-9-_]+)$"
 )
+ODS_CODE_CACHE_SIZE = 16384
 RELATES_TO_REPLACES_REFERENCE_REGEXES = [
     re.compile("^https://([^/]+)/DocumentReference/(?P<logical_id>.*)$")
 ]
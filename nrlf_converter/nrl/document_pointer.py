@@ -3,11 +3,13 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Literal, Optional
+from functools import lru_cache
+from typing import Literal, Optional, Type
 
 from nrlf_converter.nrl.constants import (
     CUSTODIAN_ODS_REGEX,
     DEFAULT_SYSTEM,
+    ODS_CODE_CACHE_SIZE,
     RELATES_TO_REPLACES_IDENTIFIER_REGEXES,
     RELATES_TO_REPLACES_REFERENCE_REGEXES,
     REPLACES,
@@ -15,6 +17,7 @@ from nrlf_converter.nrl.constants import (
     UPDATE_DATE_FORMAT,
 )
 from nrlf_converter.nrl.errors import AuthorError, BadRelatesTo, CustodianError
+from nrlf_converter.utils.slots import slotted
 from nrlf_converter.utils.validation.model import ValidatedModel
 from nrlf_converter.utils.validation.validators import (
     validate_against_schema,
@@ -23,6 +26,7 @@ from nrlf_converter.utils.validation.validators import (
 )
 
 
+@slotted
 @dataclass
 class Attachment(ValidatedModel):
     url: str = validate_against_schema(schema=str)
@@ -35,6 +39,7 @@ class Attachment(ValidatedModel):
     title: Optional[str] = validate_against_schema(schema=str, optional=True)
 
 
+@slotted
 @dataclass
 class Coding(ValidatedModel):
     code: str = validate_against_schema(schema=str)
@@ -50,6 +55,7 @@ class Coding(ValidatedModel):
         return (self.system == SSP.SYSTEM) and (self.code == SSP.CODE)
 
 
+@slotted
 @dataclass
 class Metadata(ValidatedModel):
     versionId: str = validate_against_schema(schema=str)
@@ -57,18 +63,21 @@ class Metadata(ValidatedModel):
     lastUpdated: datetime = validate_datetime(date_format=UPDATE_DATE_FORMAT)
 
 
+@slotted
 @dataclass
 class CodeableConcept(ValidatedModel):
     coding: list[Coding] = validate_against_schema(schema=Coding, is_list=True)
     text: Optional[str] = validate_against_schema(schema=str, optional=True)
 
 
+@slotted
 @dataclass
 class Period(ValidatedModel):
     start: Optional[datetime] = validate_datetime(optional=True)
     end: Optional[datetime] = validate_datetime(optional=True)
 
 
+@slotted
 @dataclass
 class Identifier(ValidatedModel):
     system: str = validate_against_schema(schema=str)
@@ -82,6 +91,7 @@ class Identifier(ValidatedModel):
     assigner: Optional[Reference] = validate_against_schema(schema=dict, optional=True)
 
 
+@slotted
 @dataclass
 class PracticeSetting(ValidatedModel):
     practiceSettingCoding: list[Coding] = validate_against_schema(
@@ -92,6 +102,7 @@ class PracticeSetting(ValidatedModel):
     )
 
 
+@slotted
 @dataclass
 class Related(ValidatedModel):
     reference: Optional[str] = validate_against_schema(schema=str, optional=True)
@@ -100,20 +111,25 @@ class Related(ValidatedModel):
     )
 
 
+@slotted
 @dataclass
 class Context(ValidatedModel):
     period: Optional[Period] = validate_against_schema(schema=Period, optional=True)
-    practiceSetting: PracticeSetting = validate_against_schema(schema=PracticeSetting)
+    practiceSetting: PracticeSetting = validate_against_schema(
+        schema=PracticeSetting, intern=True
+    )
     related: Optional[list[Related]] = validate_against_schema(
         schema=Related, optional=True, is_list=True
     )
 
 
+@slotted
 @dataclass
 class ValueCodeableConcept(ValidatedModel):
     coding: list[Coding] = validate_against_schema(schema=Coding, is_list=True)
 
 
+@slotted
 @dataclass
 class Extension(ValidatedModel):
     valueCodeableConcept: ValueCodeableConcept = validate_against_schema(
@@ -122,20 +138,23 @@ class Extension(ValidatedModel):
     url: str = validate_against_schema(schema=str)
 
 
+@slotted
 @dataclass
 class ContentItem(ValidatedModel):
     attachment: Attachment = validate_against_schema(schema=Attachment)
-    format: Coding = validate_against_schema(schema=Coding)
+    format: Coding = validate_against_schema(schema=Coding, intern=True)
     extension: Optional[list[Extension]] = validate_against_schema(
-        schema=Extension, is_list=True, optional=True
+        schema=Extension, is_list=True, optional=True, intern=True
     )
 
 
+@slotted
 @dataclass
 class LogicalIdentifier(ValidatedModel):
     logicalId: str = validate_against_schema(schema=str)
 
 
+@slotted
 @dataclass
 class Reference(ValidatedModel):
     reference: Optional[str] = validate_against_schema(schema=str, optional=True)
@@ -154,6 +173,7 @@ def _get_relates_to_target(value: str, regexes: list[re.Pattern]):
     return result
 
 
+@slotted
 @dataclass
 class RelatesTo(ValidatedModel):
     code: Optional[str] = validate_against_schema(schema=str, optional=True)
@@ -203,12 +223,30 @@ class RelatesTo(ValidatedModel):
         return result.groupdict()["logical_id"]
 
 
+@lru_cache(maxsize=ODS_CODE_CACHE_SIZE)
+def _match_ods_code(reference: str) -> Optional[str]:
+    # Shared by all pointers, since there are relatively few organisation URLs
+    result: re.Match = CUSTODIAN_ODS_REGEX.match(reference)
+    return None if result is None else result.groupdict()["ods_code"]
+
+
+def parse_ods_code(reference: str, error: Type[Exception]) -> str:
+    ods_code = _match_ods_code(reference)
+    if ods_code is None:
+        raise error(
+            f"Could not parse an ODS code from '{reference}'"
+            f" using pattern '{CUSTODIAN_ODS_REGEX.pattern}'"
+        )
+    return ods_code
+
+
+@slotted(extra=("_ods_code", "_author_ods_code"))
 @dataclass
 class DocumentPointer(ValidatedModel):
     status: Literal["current"] = validate_literal(value="current")
-    type: Coding = validate_against_schema(schema=Coding)
+    type: Coding = validate_against_schema(schema=Coding, intern=True)
     class_: Optional[CodeableConcept] = validate_against_schema(
-        schema=CodeableConcept, optional=True
+        schema=CodeableConcept, optional=True, intern=True
     )
     indexed: datetime = validate_datetime()
     author: Reference = validate_against_schema(schema=Reference)
@@ -241,25 +279,28 @@ class DocumentPointer(ValidatedModel):
     )
     removed: Optional[bool] = validate_against_schema(schema=bool, optional=True)
 
+    def _memoized_ods_code(self, name: str, reference: str, error: Type[Exception]):
+        # Memoized against the reference, so that the value follows any change
+        # to it. Also memoized on frozen pointers, for which the memo is only
+        # ever replaced by an identical value.
+        memo = getattr(self, name, None)
+        if memo is not None and memo[0] is reference:
+            return memo[1]
+        ods_code = parse_ods_code(reference=reference, error=error)
+        object.__setattr__(self, name, (reference, ods_code))
+        return ods_code
+
     @property
     def ods_code(self):
-        result: re.Match = CUSTODIAN_ODS_REGEX.match(self.custodian.reference)
-        if result is None:
-            raise CustodianError(
-                f"Could not parse an ODS code from '{self.custodian.reference}'"
-                f" using pattern '{CUSTODIAN_ODS_REGEX.pattern}'"
-            )
-        return result.groupdict()["ods_code"]
+        return self._memoized_ods_code(
+            name="_ods_code", reference=self.custodian.reference, error=CustodianError
+        )
 
     @property
     def author_ods_code(self):
-        result: re.Match = CUSTODIAN_ODS_REGEX.match(self.author.reference)
-        if result is None:
-            raise AuthorError(
-                f"Could not parse an ODS code from '{self.author.reference}'"
-                f" using pattern '{CUSTODIAN_ODS_REGEX.pattern}'"
-            )
-        return result.groupdict()["ods_code"]
+        return self._memoized_ods_code(
+            name="_author_ods_code", reference=self.author.reference, error=AuthorError
+        )
 
     def is_ssp(self):
         return any(content_item.format.is_ssp() for content_item in self.content)
@@ -1,6 +1,7 @@
 import json
 from datetime import datetime
 from pathlib import Path
+from unittest import mock
 
 import hypothesis
 import pytest
@@ -16,7 +17,7 @@ from hypothesis.strategies import (
     text,
 )
 
-from nrlf_converter import BadRelatesTo, CustodianError, ValidationError
+from nrlf_converter import AuthorError, BadRelatesTo, CustodianError, ValidationError
 from nrlf_converter.nrl.constants import CUSTODIAN_ODS_REGEX, SSP, UPDATE_DATE_FORMAT
 from nrlf_converter.nrl.document_pointer import (
     Attachment,
@@ -34,6 +35,14 @@ from nrlf_converter.nrl.document_pointer import (
     Reference,
     RelatesTo,
     ValueCodeableConcept,
+    _match_ods_code,
+    parse_ods_code,
+)
+from nrlf_converter.utils.validation.errors import (
+    FieldNotFound,
+    InvalidValue,
+    TypeMismatch,
+    UnexpectedField,
 )
 
 PATH_TO_HERE = Path(__file__).parent
@@ -151,6 +160,33 @@ def test_document_pointer(path_to_data):
     with open(path_to_data) as f:
         data: dict = json.load(f)
     DocumentPointer.parse_obj(data)
+    assert DocumentPointer.collect_errors(data) == []
+
+
+def test_collect_errors_reports_every_problem():
+    with open(PATH_TO_DATA / "NRLF-626-relatesTo_with_identifier.json") as f:
+        data: dict = json.load(f)
+    data["status"] = "superseded"
+    data["class"] = {"coding": [{"code": 1}]}
+    data["custodian"]["unexpected"] = "value"
+    data["content"][0]["attachment"]["url"] = None
+    data["content"].append("not a content item")
+    del data["indexed"]
+
+    errors = DocumentPointer.collect_errors(data)
+    assert [(error.path, error.error) for error in errors] == [
+        ("DocumentPointer.status", InvalidValue),
+        ("DocumentPointer.class.coding[0].code", TypeMismatch),
+        ("DocumentPointer.class.coding[0].display", FieldNotFound),
+        ("DocumentPointer.indexed", FieldNotFound),
+        ("DocumentPointer.custodian.unexpected", UnexpectedField),
+        ("DocumentPointer.content[0].attachment.url", FieldNotFound),
+        (f"DocumentPointer.content[{len(data['content']) - 1}]", TypeMismatch),
+    ]
+    # The input is not modified
+    assert data["class"] == {"coding": [{"code": 1}]}
+    with pytest.raises(ValidationError):
+        DocumentPointer.parse_obj(data)
 
 
 @hypothesis.given(data=data())
@@ -259,3 +295,33 @@ def coding_is_ssp(coding: Coding):
 @hypothesis.given(coding=builds(Coding, system=text(), code=text()))
 def coding_is_not_ssp(coding: Coding):
     assert not coding.is_ssp()
+
+
+@hypothesis.given(document_pointer=valid_document_pointer)
+def test_ods_code_is_memoized_until_custodian_changes(
+    document_pointer: DocumentPointer,
+):
+    with mock.patch(
+        "nrlf_converter.nrl.document_pointer.parse_ods_code",
+        wraps=parse_ods_code,
+    ) as _parse_ods_code:
+        assert document_pointer.ods_code == "THE_ODS_CODE"
+        assert document_pointer.ods_code == "THE_ODS_CODE"
+        assert document_pointer.author_ods_code
+        assert document_pointer.author_ods_code
+        assert _parse_ods_code.call_count == 2
+
+        document_pointer.custodian.reference = "blah"
+        with pytest.raises(CustodianError):
+            document_pointer.ods_code
+
+
+def test_parse_ods_code_is_cached_across_pointers():
+    _match_ods_code.cache_clear()
+    reference = "https://directory.spineservices.nhs.uk/STU3/Organization/RAE"
+    for _ in range(3):
+        assert parse_ods_code(reference=reference, error=CustodianError) == "RAE"
+    with pytest.raises(AuthorError):
+        parse_ods_code(reference="blah", error=AuthorError)
+    cache_info = _match_ods_code.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (2, 2)
@@ -1 +1,9 @@
 ID_SEPARATOR = "-"
+FORMAT_SYSTEM = "https://fhir.nhs.uk/England/CodeSystem/England-NRLFormatCode"
+CONTENT_STABILITY_SYSTEM = (
+    "https://fhir.nhs.uk/England/CodeSystem/England-NRLContentStability"
+)
+CONTENT_STABILITY_URL = (
+    "https://fhir.nhs.uk/England/StructureDefinition/Extension-England-ContentStability"
+)
+DOCUMENT_REFERENCE = "DocumentReference"
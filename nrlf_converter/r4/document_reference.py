@@ -1,8 +1,8 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Literal, Optional
 
-from nrlf_converter.utils.utils import strip_empty_json_paths
+from nrlf_converter.utils.serializers import register_serializer, to_json
 
 
 @dataclass
@@ -101,5 +101,20 @@ class DocumentReference:
     relatesTo: Optional[List[DocumentReferenceRelatesTo]] = None
 
     def dict(self) -> dict:
-        _dict = asdict(self)
-        return strip_empty_json_paths(_dict)
+        return to_json(self)
+
+
+for _dataclass in (
+    Coding,
+    CodeableConcept,
+    Period,
+    Identifier,
+    Reference,
+    DocumentReferenceRelatesTo,
+    Attachment,
+    Extension,
+    DocumentReferenceContent,
+    DocumentReferenceContext,
+    DocumentReference,
+):
+    register_serializer(_dataclass)
@@ -0,0 +1,177 @@
+import json
+import subprocess
+import sys
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import pytest
+
+from nrlf_converter import SqliteCache, nrl_to_r4
+from nrlf_converter.cli import convert, main
+
+
+@pytest.fixture
+def record(nhs_number, asid):
+    def record(document_pointer, nhs_number=nhs_number, asid=asid) -> str:
+        return json.dumps(
+            {"pointer": document_pointer, "nhs_number": nhs_number, "asid": asid}
+        )
+
+    return record
+
+
+def test_convert(record, document_pointer, nhs_number, asid):
+    bad_custodian = json.loads(json.dumps(document_pointer))
+    bad_custodian["custodian"]["reference"] = "not a custodian"
+    lines = [
+        record(document_pointer),
+        "not json",
+        "",
+        record(document_pointer, nhs_number=None),
+        json.dumps({"pointer": document_pointer}),
+        record(bad_custodian),
+        record(document_pointer),
+    ]
+    output, errors = BytesIO(), StringIO()
+
+    n_failures = convert(lines=lines, output=output, errors=errors)
+
+    expected = nrl_to_r4(
+        document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
+    assert n_failures == 4
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+        expected,
+        expected,
+    ]
+    _errors = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert [(error["line"], error["error"]) for error in _errors] == [
+        (2, "JSONDecodeError"),
+        (4, "ValidationError"),
+        (5, "KeyError"),
+        (6, "CustodianError"),
+    ]
+
+
+def test_convert_validate_only(record, document_pointer):
+    bad_custodian = json.loads(json.dumps(document_pointer))
+    bad_custodian["custodian"]["reference"] = "not a custodian"
+    lines = [record(document_pointer), "not json", record(bad_custodian)]
+    output, errors = BytesIO(), StringIO()
+
+    n_failures = convert(lines=lines, output=output, errors=errors, validate_only=True)
+
+    assert n_failures == 2
+    assert output.getvalue() == b""
+    _errors = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert [(error["line"], error["error"]) for error in _errors] == [
+        (2, "JSONDecodeError"),
+        (3, "CustodianError"),
+    ]
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_convert_malformed_records(trusted: bool, record, document_pointer):
+    bad_indexed = json.loads(json.dumps(document_pointer))
+    bad_indexed["indexed"] = 5
+    bad_custodian = json.loads(json.dumps(document_pointer))
+    bad_custodian["custodian"] = "x"
+    bad_content = json.loads(json.dumps(document_pointer))
+    bad_content["content"] = ["x"]
+    lines = [
+        record(bad_indexed),
+        record(5),
+        record(bad_custodian),
+        record(bad_content),
+        record(document_pointer),
+    ]
+    output, errors = BytesIO(), StringIO()
+
+    n_failures = convert(lines=lines, output=output, errors=errors, trusted=trusted)
+
+    # A trusted 'indexed' is not validated, and so is converted (as undefined)
+    failed_lines = [2, 3, 4] if trusted else [1, 2, 3, 4]
+    assert n_failures == len(failed_lines)
+    assert len(output.getvalue().splitlines()) == len(lines) - len(failed_lines)
+    _errors = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert [error["line"] for error in _errors] == failed_lines
+
+
+def test_main_counts_unreadable_lines(tmp_path: Path):
+    input_path = tmp_path / "input.ndjson"
+    errors_path = tmp_path / "errors.ndjson"
+    input_path.write_text('not json\n{"nhs_number": "1"}\n')
+
+    exit_code = main([str(input_path), "-e", str(errors_path)])
+
+    assert exit_code == 1
+    assert len(errors_path.read_text().splitlines()) == 2
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+@pytest.mark.parametrize("trusted", [[], ["--trusted"]])
+def test_main(tmp_path: Path, workers: str, trusted: list, record, document_pointers):
+    input_path = tmp_path / "input.ndjson"
+    output_path = tmp_path / "output.ndjson"
+    errors_path = tmp_path / "errors.ndjson"
+    input_path.write_text(
+        "\n".join(map(record, document_pointers)) + "\n" + record({}) + "\n"
+    )
+
+    exit_code = main(
+        [
+            str(input_path),
+            *("-o", str(output_path)),
+            *("-e", str(errors_path)),
+            *("--workers", workers, "--chunk-size", "2"),
+            *trusted,
+        ]
+    )
+
+    assert exit_code == 1
+    assert len(output_path.read_text().splitlines()) == len(document_pointers)
+    (error,) = map(json.loads, errors_path.read_text().splitlines())
+    assert error["line"] == len(document_pointers) + 1
+
+
+def test_main_encoder(tmp_path: Path, record, document_pointers):
+    pytest.importorskip("orjson")
+    input_path = tmp_path / "input.ndjson"
+    input_path.write_text("\n".join(map(record, document_pointers)) + "\n")
+    outputs = []
+    for encoder in ("json", "orjson"):
+        output_path = tmp_path / f"{encoder}.ndjson"
+        exit_code = main(
+            [str(input_path), "-o", str(output_path), "--encoder", encoder]
+        )
+        assert exit_code == 0
+        outputs.append(output_path.read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+def test_main_cache(tmp_path: Path, record, document_pointers):
+    input_path = tmp_path / "input.ndjson"
+    cache_path = tmp_path / "cache.sqlite"
+    input_path.write_text("\n".join(map(record, document_pointers)) + "\n")
+    outputs = []
+    for cache in ([], ["--cache", str(cache_path)], ["--cache", str(cache_path)]):
+        output_path = tmp_path / "output.ndjson"
+        exit_code = main([str(input_path), "-o", str(output_path), *cache])
+        assert exit_code == 0
+        outputs.append(output_path.read_bytes())
+    assert outputs[0] == outputs[1] == outputs[2]
+    with SqliteCache(path=str(cache_path)) as cache:
+        assert cache.stats().currsize == len(document_pointers)
+
+
+def test_module_entry_point(record, document_pointer):
+    result = subprocess.run(
+        [sys.executable, "-m", "nrlf_converter"],
+        input=record(document_pointer),
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent.parent.parent,
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)["resourceType"] == "DocumentReference"
+    assert result.stderr == ""
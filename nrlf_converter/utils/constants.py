@@ -1,2 +1,3 @@
 JSON_TYPES = {dict, list}
 EMPTY_VALUES = ("", None, [], {})
+EMPTY_TYPES = {str, dict, list}
@@ -0,0 +1,92 @@
+"""
+Encoders that serialize a JSON-compatible object straight to UTF-8 bytes.
+Every encoder writes compact JSON with its keys sorted, so that the output
+is byte-for-byte identical whichever encoder is used. The stdlib 'json'
+encoder is the default; faster encoders are available by name when they are
+installed, and any callable from object to bytes can be used in their place.
+"""
+
+import json
+from typing import Callable, Dict, Union
+
+Encoder = Callable[[object], bytes]
+
+DEFAULT_ENCODER = "json"
+
+_json_encoder = json.JSONEncoder(
+    separators=(",", ":"), sort_keys=True, ensure_ascii=False
+)
+
+
+def _json_encode(obj) -> bytes:
+    return _json_encoder.encode(obj).encode("utf-8")
+
+
+def _orjson() -> Encoder:
+    import orjson
+
+    option = orjson.OPT_SORT_KEYS
+
+    def _orjson_encode(obj) -> bytes:
+        return orjson.dumps(obj, option=option)
+
+    return _orjson_encode
+
+
+def _ujson() -> Encoder:
+    import ujson
+
+    def _ujson_encode(obj) -> bytes:
+        return ujson.dumps(
+            obj, sort_keys=True, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8")
+
+    return _ujson_encode
+
+
+# Loaded on first use, so that optional encoders are only imported if asked for
+ENCODER_LOADERS: Dict[str, Callable[[], Encoder]] = {
+    "json": lambda: _json_encode,
+    "orjson": _orjson,
+    "ujson": _ujson,
+}
+
+ENCODERS: Dict[str, Encoder] = {}
+
+
+def available_encoders() -> list:
+    """The names of the encoders that can be loaded in this environment"""
+    names = []
+    for name in ENCODER_LOADERS:
+        try:
+            get_encoder(name)
+        except ValueError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_encoder(encoder: Union[str, Encoder, None] = None) -> Encoder:
+    """
+    Returns the encoder with the given name (default: stdlib 'json'), or
+    'encoder' itself if it is already a callable
+    """
+    if encoder is None:
+        encoder = DEFAULT_ENCODER
+    if callable(encoder):
+        return encoder
+    _encoder = ENCODERS.get(encoder)
+    if _encoder is not None:
+        return _encoder
+    try:
+        loader = ENCODER_LOADERS[encoder]
+    except KeyError:
+        raise ValueError(
+            f"Unknown encoder {encoder!r}, expected one of {sorted(ENCODER_LOADERS)}"
+        ) from None
+    try:
+        _encoder = loader()
+    except ImportError:
+        raise ValueError(f"Encoder {encoder!r} is not installed") from None
+    ENCODERS[encoder] = _encoder
+    return _encoder
@@ -0,0 +1,146 @@
+"""
+Opt-in timing of the stages of each conversion. When enabled, every call to
+an instrumented entry point (nrl_to_r4, nrl_to_r4_parsed, nrl_to_r4_direct,
+and each record of nrl_to_r4_many) reports a ConversionTiming to
+'on_conversion', and to 'on_slow_record' if it took at least
+'slow_threshold' seconds.
+
+Instrumentation is off by default, in which case an instrumented entry point
+only checks that it is off, and each stage boundary ('lap') only checks that
+there is no timer for the current conversion. Enable it with
+enable_instrumentation.
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial, wraps
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+# Stages, in the order that they occur
+CACHE = "cache"  # Looking up the conversion cache, for nrl_to_r4_many
+NORMALISE = "normalise"  # Stripping and checking for empty arguments
+PARSE = "parse"  # Replacing aliases and checking for required fields
+VALIDATE = "validate"  # Running the field validators
+IDS = "ids"  # Extracting ODS codes and logical ids
+CONTENT = "content"  # Transforming the content items
+BUILD = "build"  # Building the R4 DocumentReference
+SERIALIZE = "serialize"  # Serializing the DocumentReference to a dict
+
+DEFAULT_SLOW_THRESHOLD = 0.01
+
+
+@dataclass(frozen=True)
+class ConversionTiming:
+    function: str
+    # Seconds spent in each stage
+    stages: Dict[str, float]
+    total: float
+    document_pointer: object
+    error: Optional[Exception] = None
+
+
+class StageTimer:
+    __slots__ = ("start", "stages", "_last")
+
+    def __init__(self):
+        self.start = self._last = perf_counter()
+        self.stages = {}
+
+    def lap(self, stage: str):
+        """Attributes the time since the previous lap to 'stage'"""
+        now = perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+class Instrumentation:
+    def __init__(
+        self,
+        on_conversion: Callable[[ConversionTiming], None] = None,
+        on_slow_record: Callable[[ConversionTiming], None] = None,
+        slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+    ):
+        self.on_conversion = on_conversion
+        self.on_slow_record = on_slow_record
+        self.slow_threshold = slow_threshold
+
+    def report(self, timing: ConversionTiming):
+        if self.on_conversion is not None:
+            self.on_conversion(timing)
+        if self.on_slow_record is not None and timing.total >= self.slow_threshold:
+            self.on_slow_record(timing)
+
+
+INSTRUMENTATION: Optional[Instrumentation] = None
+
+# The timer of the conversion in progress, per thread and per task
+_TIMER: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+
+
+def lap(stage: str):
+    """Marks the end of 'stage' of the conversion in progress, if timed"""
+    timer = _TIMER.get()
+    if timer is not None:
+        timer.lap(stage)
+
+
+def instrumented(fn: Callable = None, *, name: str = None):
+    """
+    Times each call to conversion 'fn', if instrumentation is enabled,
+    reporting it under 'name' (default: the name of 'fn')
+    """
+    if fn is None:
+        return partial(instrumented, name=name)
+    if name is None:
+        name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        instrumentation = INSTRUMENTATION
+        if instrumentation is None:
+            return fn(*args, **kwargs)
+
+        timer = StageTimer()
+        token = _TIMER.set(timer)
+        error = None
+        try:
+            return fn(*args, **kwargs)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            total = perf_counter() - timer.start
+            _TIMER.reset(token)
+            instrumentation.report(
+                ConversionTiming(
+                    function=name,
+                    stages=timer.stages,
+                    total=total,
+                    document_pointer=(
+                        args[0] if args else kwargs.get("document_pointer")
+                    ),
+                    error=error,
+                )
+            )
+
+    return wrapper
+
+
+def enable_instrumentation(
+    on_conversion: Callable[[ConversionTiming], None] = None,
+    on_slow_record: Callable[[ConversionTiming], None] = None,
+    slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+) -> Instrumentation:
+    global INSTRUMENTATION
+    INSTRUMENTATION = Instrumentation(
+        on_conversion=on_conversion,
+        on_slow_record=on_slow_record,
+        slow_threshold=slow_threshold,
+    )
+    return INSTRUMENTATION
+
+
+def disable_instrumentation():
+    global INSTRUMENTATION
+    INSTRUMENTATION = None
@@ -0,0 +1,227 @@
+"""
+An in-process registry of conversion metrics, rendered in the Prometheus
+text exposition format (version 0.0.4) without any external dependency.
+
+The registry is fed by instrumentation (see utils.instrumentation), so it
+costs nothing until enabled with enable_metrics. It counts conversions per
+entry point, successes, failures by exception class, and successful
+conversions of SSP and non-SSP pointers, and records histograms of the
+duration of each conversion and of each of its stages. Metrics are counted
+in the process that converts: records converted by nrl_to_r4_parallel are
+counted in (and lost with) its worker processes.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List, Tuple
+
+from nrlf_converter.nrl.constants import SSP
+from nrlf_converter.utils.instrumentation import (
+    DEFAULT_SLOW_THRESHOLD,
+    ConversionTiming,
+    enable_instrumentation,
+)
+
+PREFIX = "nrlf_converter"
+# Seconds
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    1.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _is_ssp(document_pointer) -> bool:
+    is_ssp = getattr(document_pointer, "is_ssp", None)
+    if is_ssp is not None:
+        return is_ssp()
+    return any(
+        type(content) is dict
+        and type(content.get("format")) is dict
+        and content["format"].get("system") == SSP.SYSTEM
+        and content["format"].get("code") == SSP.CODE
+        for content in document_pointer.get("content") or ()
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if type(value) is float else str(value)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Non-cumulative, with a final bucket for values above the largest
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: Labels) -> List[str]:
+        samples = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            bucket_labels = _labels((*labels, ("le", _number(bound))))
+            samples.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        samples.append(f"{name}_sum{_labels(labels)} {_number(self.sum)}")
+        samples.append(f"{name}_count{_labels(labels)} {self.count}")
+        return samples
+
+
+class MetricsRegistry:
+    """A thread-safe registry of conversion metrics, see 'observe' and 'render'"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._conversions: Dict[str, int] = defaultdict(int)
+            self._successes: Dict[str, int] = defaultdict(int)
+            self._failures: Dict[Tuple[str, str], int] = defaultdict(int)
+            self._content: Dict[str, int] = defaultdict(int)
+            self._durations: Dict[str, Histogram] = {}
+            self._stage_durations: Dict[str, Histogram] = {}
+
+    def _histogram(self, histograms: Dict[str, Histogram], key: str) -> Histogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets=self.buckets)
+        return histogram
+
+    def observe(self, timing: ConversionTiming):
+        """Records one conversion, as reported by instrumentation"""
+        function = timing.function
+        content = None
+        if timing.error is None:
+            content = "ssp" if _is_ssp(timing.document_pointer) else "non_ssp"
+        with self._lock:
+            self._conversions[function] += 1
+            if timing.error is None:
+                self._successes[function] += 1
+                self._content[content] += 1
+            else:
+                self._failures[(function, type(timing.error).__name__)] += 1
+            self._histogram(self._durations, function).observe(timing.total)
+            for stage, duration in timing.stages.items():
+                self._histogram(self._stage_durations, stage).observe(duration)
+
+    def _counter(
+        self, name: str, description: str, values: Dict[Labels, int]
+    ) -> List[str]:
+        lines = [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return lines
+
+    def _histograms(
+        self, name: str, description: str, label: str, histograms: Dict[str, Histogram]
+    ) -> List[str]:
+        lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        for key, histogram in sorted(histograms.items()):
+            lines += histogram.samples(name=name, labels=((label, key),))
+        return lines
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                *self._counter(
+                    name=f"{PREFIX}_conversions_total",
+                    description="Conversions attempted",
+                    values={
+                        (("function", function),): value
+                        for function, value in self._conversions.items()
+                    },
+                ),
+                *self._counter(
+                    name=f"{PREFIX}_conversion_successes_total",
+                    description="Conversions that succeeded",
+                    values={
+                        (("function", function),): value
+                        for function, value in self._successes.items()
+                    },
+                ),
+                *self._counter(
+                    name=f"{PREFIX}_conversion_failures_total",
+                    description="Conversions that failed, by exception class",
+                    values={
+                        (("function", function), ("error", error)): value
+                        for (function, error), value in self._failures.items()
+                    },
+                ),
+                *self._counter(
+                    name=f"{PREFIX}_conversions_by_content_total",
+                    description="Conversions that succeeded, by SSP or non-SSP content",
+                    values={
+                        (("content", content),): value
+                        for content, value in self._content.items()
+                    },
+                ),
+                *self._histograms(
+                    name=f"{PREFIX}_conversion_duration_seconds",
+                    description="Duration of each conversion",
+                    label="function",
+                    histograms=self._durations,
+                ),
+                *self._histograms(
+                    name=f"{PREFIX}_conversion_stage_duration_seconds",
+                    description="Duration of each stage of each conversion",
+                    label="stage",
+                    histograms=self._stage_durations,
+                ),
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def enable_metrics(
+    registry: MetricsRegistry = None,
+    on_slow_record=None,
+    slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+) -> MetricsRegistry:
+    """
+    Enables instrumentation, recording every conversion in 'registry' (by
+    default a new MetricsRegistry), which is returned. Disable it with
+    utils.instrumentation.disable_instrumentation.
+    """
+    if registry is None:
+        registry = MetricsRegistry()
+    enable_instrumentation(
+        on_conversion=registry.observe,
+        on_slow_record=on_slow_record,
+        slow_threshold=slow_threshold,
+    )
+    return registry
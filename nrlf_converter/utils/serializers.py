@@ -0,0 +1,77 @@
+"""
+Serializers equivalent to strip_empty_json_paths(asdict(obj)), generated once
+per dataclass so that None and empty values are skipped as they are found
+rather than being deep-copied by asdict and stripped afterwards. Tuples and
+read-only mappings (as held by frozen models) are serialized as lists and dicts.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields, is_dataclass
+from types import MappingProxyType
+from typing import Callable, Dict
+
+from .constants import EMPTY_TYPES
+
+SCALAR_TYPES = {str, int, float, bool}
+
+SERIALIZERS: Dict[type, Callable[[object], dict]] = {}
+
+
+def _is_kept(value) -> bool:
+    return value is not None and (value or type(value) not in EMPTY_TYPES)
+
+
+def to_json(obj):
+    _type = type(obj)
+    serializer = SERIALIZERS.get(_type)
+    if serializer is not None:
+        return serializer(obj)
+    if _type is list or _type is tuple:
+        items = []
+        for item in obj:
+            if type(item) not in SCALAR_TYPES:
+                item = to_json(item)
+            if _is_kept(item):
+                items.append(item)
+        return items
+    if _type is dict or _type is MappingProxyType:
+        _dict = {}
+        for key, value in obj.items():
+            if type(value) not in SCALAR_TYPES:
+                value = to_json(value)
+            if _is_kept(value):
+                _dict[key] = value
+        return _dict
+    if is_dataclass(obj):
+        return register_serializer(_type)(obj)
+    return obj
+
+
+def _serializer_source(cls: type) -> str:
+    lines = ["def to_dict(obj):", "    _dict = {}"]
+    for field in fields(cls):
+        lines += [
+            f"    value = obj.{field.name}",
+            "    if value is not None:",
+            "        if type(value) not in SCALAR_TYPES:",
+            "            value = to_json(value)",
+            "        if value or type(value) not in EMPTY_TYPES:",
+            f"            _dict[{field.name!r}] = value",
+        ]
+    lines.append("    return _dict")
+    return "\n".join(lines)
+
+
+def register_serializer(cls: type) -> Callable[[object], dict]:
+    """Generates, registers and returns the serializer for dataclass 'cls'"""
+    namespace = {
+        "SCALAR_TYPES": SCALAR_TYPES,
+        "EMPTY_TYPES": EMPTY_TYPES,
+        "to_json": to_json,
+    }
+    exec(_serializer_source(cls), namespace)
+    serializer = namespace["to_dict"]
+    serializer.__qualname__ = f"{cls.__name__}.to_dict"
+    SERIALIZERS[cls] = serializer
+    return serializer
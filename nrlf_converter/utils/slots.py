@@ -0,0 +1,25 @@
+from dataclasses import fields
+from typing import Tuple
+
+
+def slotted(cls: type = None, *, extra: Tuple[str, ...] = ()):
+    """
+    Recreates a dataclass with __slots__ for each of its fields (plus any
+    'extra' attribute names), so that instances have no per-instance __dict__.
+    Equivalent to @dataclass(slots=True), which requires Python 3.10.
+    Base classes must also define __slots__ for this to have any effect.
+    """
+
+    def wrap(cls: type) -> type:
+        cls_dict = dict(cls.__dict__)
+        field_names = tuple(field.name for field in fields(cls))
+        for name in field_names:
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        cls_dict["__slots__"] = field_names + tuple(extra)
+        slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        slotted_cls.__qualname__ = cls.__qualname__
+        return slotted_cls
+
+    return wrap if cls is None else wrap(cls)
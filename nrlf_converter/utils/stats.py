@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """The statistics of a bounded (or unbounded) cache, as of when it was asked"""
+
+    hits: int
+    misses: int
+    # None if unbounded
+    maxsize: Optional[int]
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from nrlf_converter.utils.encoders import available_encoders, get_encoder
+
+DOCUMENT = {
+    "b": [1, 2.5, None, True],
+    "a": {"z": 'ü/é   "quoted"\n', "y": {}},
+    "c": "https://example.org/a?b=c",
+}
+
+
+def test_get_encoder_default():
+    encode = get_encoder()
+    assert encode is get_encoder("json")
+    assert encode(DOCUMENT) == json.dumps(
+        DOCUMENT, separators=(",", ":"), sort_keys=True, ensure_ascii=False
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize("name", ["orjson", "ujson"])
+def test_encoders_are_identical(name: str):
+    pytest.importorskip(name)
+    assert name in available_encoders()
+    assert get_encoder(name)(DOCUMENT) == get_encoder("json")(DOCUMENT)
+
+
+def test_get_encoder_callable():
+    def encode(obj) -> bytes:
+        return b"{}"
+
+    assert get_encoder(encode) is encode
+
+
+def test_get_encoder_unknown():
+    with pytest.raises(ValueError, match="Unknown encoder 'yaml'"):
+        get_encoder("yaml")
@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nrlf_converter import (
+    MemoryCache,
+    ValidationError,
+    nrl_to_r4,
+    nrl_to_r4_direct,
+    nrl_to_r4_many,
+    nrl_to_r4_parsed,
+)
+from nrlf_converter.nrl.document_pointer import DocumentPointer
+from nrlf_converter.utils import instrumentation
+from nrlf_converter.utils.instrumentation import (
+    BUILD,
+    CACHE,
+    CONTENT,
+    IDS,
+    NORMALISE,
+    PARSE,
+    SERIALIZE,
+    VALIDATE,
+    disable_instrumentation,
+    enable_instrumentation,
+)
+
+
+@pytest.fixture
+def timings():
+    _timings = []
+    enable_instrumentation(on_conversion=_timings.append)
+    yield _timings
+    disable_instrumentation()
+
+
+def test_nrl_to_r4_stages(timings: list, document_pointer, nhs_number, asid):
+    nrl_to_r4(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+
+    (timing,) = timings
+    assert timing.function == "nrl_to_r4"
+    assert list(timing.stages) == [
+        NORMALISE,
+        PARSE,
+        VALIDATE,
+        IDS,
+        CONTENT,
+        BUILD,
+        SERIALIZE,
+    ]
+    assert all(duration >= 0 for duration in timing.stages.values())
+    assert sum(timing.stages.values()) <= timing.total
+    assert timing.document_pointer is document_pointer
+    assert timing.error is None
+
+
+def test_nrl_to_r4_direct_stages(timings: list, document_pointer, nhs_number, asid):
+    nrl_to_r4_direct(
+        document_pointer=document_pointer, nhs_number=nhs_number, asid=asid
+    )
+    (timing,) = timings
+    assert timing.function == "nrl_to_r4_direct"
+    assert list(timing.stages) == [NORMALISE, PARSE, VALIDATE, IDS, CONTENT, BUILD]
+
+
+def test_nrl_to_r4_parsed_stages(timings: list, document_pointer, nhs_number, asid):
+    pointer = DocumentPointer.parse_frozen(document_pointer)
+    nrl_to_r4_parsed(document_pointer=pointer, nhs_number=nhs_number, asid=asid)
+    (timing,) = timings
+    assert list(timing.stages) == [NORMALISE, IDS, CONTENT, BUILD, SERIALIZE]
+
+
+def test_failed_conversion_is_reported(
+    timings: list, document_pointer, nhs_number, asid
+):
+    del document_pointer["type"]
+    with pytest.raises(ValidationError) as error:
+        nrl_to_r4(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+
+    (timing,) = timings
+    assert timing.error is error.value
+    assert list(timing.stages) == [NORMALISE]
+
+
+@pytest.mark.parametrize("slow_threshold, n_slow", [(0, 1), (60, 0)])
+def test_slow_record_hook(
+    slow_threshold: float, n_slow: int, document_pointer, nhs_number, asid
+):
+    slow = []
+    enable_instrumentation(on_slow_record=slow.append, slow_threshold=slow_threshold)
+    try:
+        nrl_to_r4(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+    finally:
+        disable_instrumentation()
+    assert len(slow) == n_slow
+
+
+def test_instrumentation_is_disabled_by_default():
+    assert instrumentation.INSTRUMENTATION is None
+    assert instrumentation._TIMER.get() is None
+
+
+def test_nrl_to_r4_many_stages(timings: list, document_pointer, nhs_number, asid):
+    records = [(document_pointer, nhs_number, asid), ({}, nhs_number, asid)]
+    results = list(nrl_to_r4_many(records))
+    assert [result.ok for result in results] == [True, False]
+
+    ok, failed = timings
+    assert ok.function == "nrl_to_r4_many"
+    assert list(ok.stages) == [NORMALISE, PARSE, VALIDATE, IDS, CONTENT, BUILD]
+    assert ok.document_pointer is document_pointer
+    assert failed.error is results[1].error
+
+
+def test_nrl_to_r4_many_cached_stages(
+    timings: list, document_pointer, nhs_number, asid
+):
+    records = [(document_pointer, nhs_number, asid)] * 2
+    assert all(result.ok for result in nrl_to_r4_many(records, cache=MemoryCache()))
+
+    miss, hit = timings
+    assert list(miss.stages) == [CACHE, NORMALISE, PARSE, VALIDATE, IDS, CONTENT, BUILD]
+    assert list(hit.stages) == [CACHE]
+
+
+def test_concurrent_conversions_are_timed_separately(
+    timings: list, document_pointers, nhs_number, asid
+):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                lambda document_pointer: nrl_to_r4(
+                    document_pointer=document_pointer,
+                    nhs_number=nhs_number,
+                    asid=asid,
+                ),
+                document_pointers * 5,
+            )
+        )
+    assert len(timings) == len(document_pointers) * 5
+    for timing in timings:
+        assert len(timing.stages) == 7
+        assert sum(timing.stages.values()) <= timing.total
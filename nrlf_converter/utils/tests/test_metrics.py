@@ -0,0 +1,150 @@
+import pytest
+
+from nrlf_converter import MemoryCache, nrl_to_r4, nrl_to_r4_many
+from nrlf_converter.utils.instrumentation import (
+    ConversionTiming,
+    disable_instrumentation,
+)
+from nrlf_converter.utils.metrics import Histogram, MetricsRegistry, enable_metrics
+
+PREFIX = "nrlf_converter"
+
+
+@pytest.fixture
+def registry():
+    registry = enable_metrics()
+    yield registry
+    disable_instrumentation()
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.samples(name="h", labels=(("stage", "parse"),)) == [
+        'h_bucket{stage="parse",le="0.1"} 2',
+        'h_bucket{stage="parse",le="1.0"} 3',
+        'h_bucket{stage="parse",le="+Inf"} 4',
+        'h_sum{stage="parse"} 2.65',
+        'h_count{stage="parse"} 4',
+    ]
+
+
+def test_metrics_counts(
+    registry: MetricsRegistry, load_document_pointer, nhs_number, asid
+):
+    ssp_pointer = load_document_pointer()
+    non_ssp_pointer = load_document_pointer("NRLF-642-no_ssp.json")
+    bad_custodian = load_document_pointer()
+    bad_custodian["custodian"]["reference"] = "not a custodian"
+    missing_type = load_document_pointer()
+    del missing_type["type"]
+
+    nrl_to_r4(document_pointer=ssp_pointer, nhs_number=nhs_number, asid=asid)
+    records = [
+        (ssp_pointer, nhs_number, asid),
+        (non_ssp_pointer, nhs_number, asid),
+        (bad_custodian, nhs_number, asid),
+        (missing_type, nhs_number, asid),
+    ]
+    assert [result.ok for result in nrl_to_r4_many(records)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+    samples = _samples(registry.render())
+    assert samples[f'{PREFIX}_conversions_total{{function="nrl_to_r4"}}'] == 1
+    assert samples[f'{PREFIX}_conversions_total{{function="nrl_to_r4_many"}}'] == 4
+    assert (
+        samples[f'{PREFIX}_conversion_successes_total{{function="nrl_to_r4_many"}}']
+        == 2
+    )
+    for error in ("CustodianError", "ValidationError"):
+        name = f'{PREFIX}_conversion_failures_total{{function="nrl_to_r4_many",error="{error}"}}'
+        assert samples[name] == 1
+    assert samples[f'{PREFIX}_conversions_by_content_total{{content="ssp"}}'] == 2
+    assert samples[f'{PREFIX}_conversions_by_content_total{{content="non_ssp"}}'] == 1
+    assert (
+        samples[
+            f'{PREFIX}_conversion_duration_seconds_count{{function="nrl_to_r4_many"}}'
+        ]
+        == 4
+    )
+    assert (
+        samples[
+            f'{PREFIX}_conversion_duration_seconds_bucket{{function="nrl_to_r4_many",le="+Inf"}}'
+        ]
+        == 4
+    )
+    assert (
+        samples[
+            f'{PREFIX}_conversion_stage_duration_seconds_count{{stage="serialize"}}'
+        ]
+        == 1
+    )
+
+
+def test_metrics_count_cache_hits(registry: MetricsRegistry, records):
+    cache = MemoryCache()
+    for _ in range(2):
+        assert all(result.ok for result in nrl_to_r4_many(records, cache=cache))
+    assert cache.stats().hits == len(records)
+
+    samples = _samples(registry.render())
+    for name in ("conversions_total", "conversion_successes_total"):
+        assert samples[f'{PREFIX}_{name}{{function="nrl_to_r4_many"}}'] == 2 * len(
+            records
+        )
+    assert sum(
+        value
+        for name, value in samples.items()
+        if name.startswith(f"{PREFIX}_conversions_by_content_total")
+    ) == 2 * len(records)
+
+
+def test_render_format(registry: MetricsRegistry, document_pointer, nhs_number, asid):
+    nrl_to_r4(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+    text = registry.render()
+    assert text.endswith("\n")
+    types = [
+        line.split()[-1] for line in text.splitlines() if line.startswith("# TYPE")
+    ]
+    assert types == ["counter"] * 4 + ["histogram"] * 2
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            float(line.rsplit(" ", 1)[1])
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.observe(
+        ConversionTiming(
+            function='a"b\\c\nd',
+            stages={},
+            total=0.1,
+            document_pointer={},
+            error=None,
+        )
+    )
+    assert f'{PREFIX}_conversions_total{{function="a\\"b\\\\c\\nd"}} 1' in (
+        registry.render().splitlines()
+    )
+
+
+def test_reset(registry: MetricsRegistry, document_pointer, nhs_number, asid):
+    nrl_to_r4(document_pointer=document_pointer, nhs_number=nhs_number, asid=asid)
+    registry.reset()
+    assert not [
+        line for line in registry.render().splitlines() if not line.startswith("#")
+    ]
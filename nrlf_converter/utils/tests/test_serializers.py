@@ -0,0 +1,61 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import hypothesis
+import pytest
+
+from nrlf_converter.nrl.document_pointer import DocumentPointer
+from nrlf_converter.nrl.tests.test_document_pointer import valid_document_pointer
+from nrlf_converter.r4.document_reference import (
+    CodeableConcept,
+    Coding,
+    DocumentReference,
+    Identifier,
+    Reference,
+)
+from nrlf_converter.utils.serializers import SERIALIZERS, to_json
+from nrlf_converter.utils.utils import strip_empty_json_paths
+
+
+@dataclass
+class Unregistered:
+    value: Optional[str] = None
+    flag: Optional[bool] = None
+    items: Optional[List[Coding]] = None
+    extra: Optional[dict] = None
+
+
+def _as_json(obj):
+    return json.dumps(strip_empty_json_paths(asdict(obj)))
+
+
+def test_r4_serializers_are_registered_at_import():
+    for _dataclass in (Coding, CodeableConcept, Identifier, DocumentReference):
+        assert _dataclass in SERIALIZERS
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        Coding(code="code", system="system", display="", userSelected=False),
+        CodeableConcept(coding=[Coding(code="", system="")]),
+        Reference(identifier=Identifier(value="value", assigner={"a": [None, {}]})),
+        Unregistered(
+            value="",
+            flag=False,
+            items=[Coding(code="code", system=None), None],
+            extra={"b": [0, "", {"c": None}], "d": ("e",)},
+        ),
+        Unregistered(),
+    ],
+)
+def test_to_json_equals_stripped_asdict(obj):
+    assert json.dumps(to_json(obj)) == _as_json(obj)
+
+
+@hypothesis.given(document_pointer=valid_document_pointer)
+def test_to_json_equals_stripped_asdict_for_nrl_models(
+    document_pointer: DocumentPointer,
+):
+    assert json.dumps(to_json(document_pointer)) == _as_json(document_pointer)
@@ -0,0 +1,78 @@
+import json
+import pickle
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from nrlf_converter.nrl import document_pointer as nrl
+from nrlf_converter.r4 import document_reference as r4
+from nrlf_converter.utils.slots import slotted
+from nrlf_converter.utils.validation.errors import ValidationError
+from nrlf_converter.utils.validation.model import ValidatedModel
+from nrlf_converter.utils.validation.validators import validate_against_schema
+
+
+@slotted(extra=("cache",))
+@dataclass
+class SlottedModel(ValidatedModel):
+    value: str = validate_against_schema(schema=str)
+    other: Optional[str] = validate_against_schema(schema=str, optional=True)
+
+
+def _dataclasses(module):
+    return [
+        obj
+        for obj in vars(module).values()
+        if isinstance(obj, type)
+        and obj.__module__ == module.__name__
+        and "__dataclass_fields__" in vars(obj)
+    ]
+
+
+@pytest.mark.parametrize("cls", _dataclasses(nrl))
+def test_models_are_slotted(cls):
+    assert cls.__slots__[: len(fields(cls))] == tuple(f.name for f in fields(cls))
+    assert "__dict__" not in vars(cls)
+
+
+@pytest.mark.parametrize("cls", _dataclasses(r4))
+def test_output_models_are_not_slotted(cls):
+    # Short-lived, and validated by pydantic (v1) dataclasses in the tests,
+    # which cannot subclass slotted dataclasses
+    assert "__slots__" not in vars(cls)
+
+
+def test_slotted_model_has_no_instance_dict():
+    model = SlottedModel(value="foo")
+    assert not hasattr(model, "__dict__")
+    assert model == SlottedModel(value="foo", other=None)
+    assert repr(model) == "SlottedModel(value='foo', other=None)"
+
+    model.cache = "bar"
+    assert model.cache == "bar"
+    with pytest.raises(AttributeError):
+        model.not_a_slot = "bar"
+
+
+def test_slotted_model_is_validated():
+    with pytest.raises(ValidationError):
+        SlottedModel(value={"not": "a str"})
+
+    with pytest.raises(ValidationError, match="'SlottedModel.unexpected'"):
+        SlottedModel.parse_obj({"value": "foo", "unexpected": "bar"})
+
+
+def test_slotted_model_can_be_pickled():
+    model = SlottedModel.parse_obj({"value": "foo"})
+    assert pickle.loads(pickle.dumps(model)) == model
+
+
+def test_slotted_document_pointer_parse_obj(path_to_data: Path):
+    document_pointer = nrl.DocumentPointer.parse_obj(
+        json.loads(path_to_data.read_text())
+    )
+    assert not hasattr(document_pointer, "__dict__")
+    assert document_pointer.ods_code == document_pointer.ods_code
+    assert asdict(document_pointer)["status"] == "current"
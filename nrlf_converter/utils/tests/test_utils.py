@@ -1,4 +1,5 @@
 import json
+from copy import deepcopy
 
 import pytest
 
@@ -33,3 +34,23 @@ def test_strip_empty_json_paths(bad_json):
     assert not any(
         nullish_field in stripped_bad_json_str for nullish_field in NULLISH_VALUES
     )
+
+
+@pytest.mark.parametrize(
+    ["json", "expected"],
+    (
+        ({"foo": [{"bar": [{}, [None, ""]]}], "oof": "rab"}, {"oof": "rab"}),
+        ({"foo": [0, False, "", None, "bar"]}, {"foo": [0, False, "bar"]}),
+        ([{"foo": {}}, {"foo": [[], {"bar": None}]}], []),
+        ("not json", "not json"),
+    ),
+)
+@pytest.mark.parametrize("in_place", (True, False))
+def test_strip_empty_json_paths_cascading(json, expected, in_place):
+    original = deepcopy(json)
+    stripped = strip_empty_json_paths(json, in_place=in_place)
+    assert stripped == expected
+    if in_place:
+        assert stripped is json
+    else:
+        assert json == original
@@ -2,29 +2,71 @@ from __future__ import annotations
 
 from typing import Union
 
-from .constants import EMPTY_VALUES, JSON_TYPES
-
-
-def strip_empty_json_paths(json: Union[list[dict], dict]) -> Union[list[dict], dict]:
-    stripped_json = json
-    modified = False
-    if type(json) is list:
-        stripped_json = []
-        for item in json:
-            if type(item) in JSON_TYPES:
-                item = strip_empty_json_paths(item)
-            if item in EMPTY_VALUES:
-                modified = True
-            else:
-                stripped_json.append(item)
-    elif type(json) is dict:
+from .constants import EMPTY_TYPES, JSON_TYPES
+
+
+def _is_empty_value(value) -> bool:
+    # Equivalent to 'value in EMPTY_VALUES' for JSON values, without
+    # the equality comparisons against each of the empty values
+    return value is None or (not value and type(value) in EMPTY_TYPES)
+
+
+def _strip_copy(json: Union[list, dict]) -> Union[list, dict]:
+    if type(json) is dict:
         stripped_json = {}
         for key, value in json.items():
             if type(value) in JSON_TYPES:
-                value = strip_empty_json_paths(value)
-            if value in EMPTY_VALUES:
-                modified = True
-            else:
+                value = _strip_copy(value)
+            if not _is_empty_value(value):
                 stripped_json[key] = value
+        return stripped_json
+
+    stripped_json = []
+    for item in json:
+        if type(item) in JSON_TYPES:
+            item = _strip_copy(item)
+        if not _is_empty_value(item):
+            stripped_json.append(item)
+    return stripped_json
+
+
+def _strip_in_place(json: Union[list, dict]) -> Union[list, dict]:
+    if type(json) is dict:
+        empty_keys = []
+        for key, value in json.items():
+            if type(value) in JSON_TYPES:
+                _strip_in_place(value)
+            if _is_empty_value(value):
+                empty_keys.append(key)
+        for key in empty_keys:
+            del json[key]
+        return json
+
+    stripped_items = []
+    for item in json:
+        if type(item) in JSON_TYPES:
+            _strip_in_place(item)
+        if not _is_empty_value(item):
+            stripped_items.append(item)
+    if len(stripped_items) != len(json):
+        json[:] = stripped_items
+    return json
+
+
+def strip_empty_json_paths(
+    json: Union[list[dict], dict], in_place: bool = False
+) -> Union[list[dict], dict]:
+    """
+    Removes null, empty string, empty list and empty dict values from the
+    JSON object in a single post-order pass, such that a container that is
+    only empty once its own children are removed is itself removed.
 
-    return strip_empty_json_paths(stripped_json) if modified else stripped_json
+    By default a new object is returned and 'json' is left untouched. With
+    in_place=True, 'json' is modified and returned, which avoids the copy if
+    the caller owns the object.
+    """
+    if type(json) not in JSON_TYPES:
+        return json
+    if in_place:
+        return _strip_in_place(json)
+    return _strip_copy(json)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Type
 
 
 class FieldNotFound(Exception):
@@ -37,6 +39,22 @@ class ValidationError(Exception):
         return "\n".join(("", self.message, *reversed(_tab_items(self.notes))))
 
 
+@dataclass(frozen=True)
+class FieldError:
+    """
+    A problem found by ValidatedModel.collect_errors: the class of the error
+    that validation would have raised, and the path of the field in the
+    object, such as 'DocumentPointer.content[0].attachment.url'
+    """
+
+    path: str
+    error: Type[Exception]
+    message: str
+
+    def __str__(self):
+        return f"'{self.error.__name__}' encountered on '{self.path}': {self.message}"
+
+
 VALIDATION_ERRORS = (
     FieldNotFound,
     TypeMismatch,
@@ -46,17 +64,23 @@ VALIDATION_ERRORS = (
 )
 
 
+def wrap_validation_error(exc: Exception, model_name: str, field: str):
+    if isinstance(exc, VALIDATION_ERRORS):
+        return ValidationError(
+            message=f"'{type(exc).__name__}' encountered on '{model_name}.{field}': {str(exc)}"
+        )
+    message = exc.message
+    exc.message = f"Error validating property '{model_name}.{field}':"
+    exc.notes = _tab_items(exc.notes)
+    exc.notes.append(message)
+    return exc
+
+
 @contextmanager
 def handle_validation_errors(obj, field):
     try:
         yield
-    except VALIDATION_ERRORS as exc:
-        raise ValidationError(
-            message=f"'{type(exc).__name__}' encountered on '{type(obj).__name__}.{field}': {str(exc)}"
+    except (*VALIDATION_ERRORS, ValidationError) as exc:
+        raise wrap_validation_error(
+            exc=exc, model_name=type(obj).__name__, field=field
         ) from None
-    except ValidationError as exc:
-        message = exc.message
-        exc.message = f"Error validating property '{type(obj).__name__}.{field}':"
-        exc.notes = _tab_items(exc.notes)
-        exc.notes.append(message)
-        raise exc from None
@@ -0,0 +1,100 @@
+"""
+A bounded cache of frozen validated models, keyed by the structure of the
+dict that each was validated from. Sub-objects that repeat across many
+pointers (e.g. the 'type' Coding) are then validated and allocated once, and
+the same immutable instance is shared by every pointer that contains it.
+
+Interning is off by default, and only applies to fields declared with
+validate_against_schema(..., intern=True). Enable it with enable_interning.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, Optional
+
+from nrlf_converter.utils.stats import CacheStats
+
+DEFAULT_INTERN_CACHE_SIZE = 4096
+
+
+def _structure(obj) -> Hashable:
+    # Scalars are keyed with their type, so that e.g. 1 and True are distinct
+    _type = type(obj)
+    if _type is dict:
+        return frozenset((key, _structure(value)) for key, value in obj.items())
+    if _type is list:
+        return tuple(map(_structure, obj))
+    return (_type, obj)
+
+
+class InternCache:
+    """A thread-safe LRU cache of frozen models, see 'intern'"""
+
+    def __init__(self, maxsize: int = DEFAULT_INTERN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._models = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def intern(self, schema: type, obj: dict, validate: Callable[[], object]):
+        """
+        Returns the frozen model previously validated from a dict that is
+        structurally identical to 'obj', otherwise the frozen result of
+        'validate()', which is cached. Validation errors are not cached.
+        """
+        try:
+            key = (schema, _structure(obj))
+            with self._lock:
+                model = self._models.get(key)
+                if model is not None:
+                    self._models.move_to_end(key)
+                    self._hits += 1
+                    return model
+                self._misses += 1
+        except TypeError:  # unhashable (non-JSON) values are not interned
+            return validate()
+
+        # Validated outside of the lock, since sub-objects may also be interned
+        model = validate().frozen()
+        with self._lock:
+            self._models[key] = model
+            if len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+        return model
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=len(self._models),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+INTERN_CACHE: Optional[InternCache] = None
+
+
+def enable_interning(maxsize: int = DEFAULT_INTERN_CACHE_SIZE) -> InternCache:
+    """Enables interning with a new, empty cache, which is returned"""
+    global INTERN_CACHE
+    INTERN_CACHE = InternCache(maxsize=maxsize)
+    return INTERN_CACHE
+
+
+def disable_interning():
+    global INTERN_CACHE
+    INTERN_CACHE = None
+
+
+def intern_stats() -> Optional[CacheStats]:
+    """The statistics of the current cache, or None if interning is disabled"""
+    cache = INTERN_CACHE
+    return None if cache is None else cache.stats()
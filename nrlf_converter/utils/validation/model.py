@@ -1,15 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import Field, dataclass, fields
-from types import FunctionType
-from typing import Any, Optional, Type, TypeVar
+from dataclasses import MISSING, Field, FrozenInstanceError, dataclass, fields
+from functools import partial
+from types import FunctionType, MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type, TypeVar
 
+from nrlf_converter.utils.instrumentation import PARSE, VALIDATE, lap
 from nrlf_converter.utils.utils import strip_empty_json_paths
 
-from .errors import ValidationError, handle_validation_errors
+from .errors import (
+    VALIDATION_ERRORS,
+    FieldError,
+    FieldNotFound,
+    InconsistentOptionalField,
+    TypeMismatch,
+    UnexpectedField,
+    ValidationError,
+    handle_validation_errors,
+    wrap_validation_error,
+)
 
 ModelType = TypeVar("ModelType")
 
+VALIDATION_PLAN = "__validation_plan__"
+
 
 class DefaultNotSet:
     pass
@@ -29,31 +43,459 @@ class ValidationMetadata:
         return field.metadata.get(ValidationMetadata, DEFAULT_METADATA)
 
 
-class ValidatedModel:
-    def __post_init__(self):
-        for field in fields(self):
-            value = self.__dict__[field.name]
+def _is_optional(annotation):
+    return "Optional[" in str(annotation)
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    name: str
+    validator: Optional[FunctionType]
+    dict_validator: Optional[FunctionType]
+    optional: bool
+    default: Any
+    initial: Any
+    schema: Optional[type]
+    is_list: bool
+    # Whether the schema is a ValidatedModel
+    is_model: bool
+
+    def is_unset(self, value) -> bool:
+        if value is None:
+            return True
+        return self.default is not DEFAULT_NOT_SET and value == self.default
+
+
+@dataclass(frozen=True)
+class ValidationPlan:
+    """
+    Everything that validation needs to know about a ValidatedModel, derived
+    once per class from its dataclass fields rather than on every instance.
+    """
+
+    model_name: str
+    fields: Tuple[FieldPlan, ...]
+    validated_fields: Tuple[FieldPlan, ...]
+    required_fields: Tuple[FieldPlan, ...]
+    field_names: FrozenSet[str]
+    aliases: Dict[str, str]
+
+    @classmethod
+    def compile(cls, model: Type[ValidatedModel]) -> ValidationPlan:
+        field_plans = []
+        for field in fields(model):
             metadata = ValidationMetadata.from_field(field)
+            keywords = getattr(metadata.validator, "keywords", {})
+            field_plans.append(
+                FieldPlan(
+                    name=field.name,
+                    validator=metadata.validator,
+                    dict_validator=(
+                        partial(metadata.validator, as_dict=True)
+                        if "schema" in keywords
+                        else metadata.validator
+                    ),
+                    optional=bool(metadata.optional),
+                    default=metadata.default,
+                    initial=None if field.default is MISSING else field.default,
+                    schema=keywords.get("schema"),
+                    is_list=keywords.get("is_list", False),
+                    is_model=_is_model(keywords.get("schema")),
+                )
+            )
+        return cls(
+            model_name=model.__name__,
+            fields=tuple(field_plans),
+            validated_fields=tuple(f for f in field_plans if f.validator),
+            required_fields=tuple(f for f in field_plans if not f.optional),
+            field_names=frozenset(f.name for f in field_plans),
+            aliases={f.name[:-1]: f.name for f in field_plans if f.name.endswith("_")},
+        )
+
+    def check_fields(self, obj: dict):
+        for field in self.required_fields:
+            if field.is_unset(obj.get(field.name)):
+                raise FieldNotFound(
+                    f"Field '{self.model_name}.{field.name}' was expected but not provided."
+                )
+        self.check_unexpected_fields(obj)
+
+    def check_unexpected_fields(self, obj: dict):
+        if not self.field_names.issuperset(obj):
+            field_name = next(name for name in obj if name not in self.field_names)
+            raise UnexpectedField(
+                f"Unexpected field provided: '{self.model_name}.{field_name}'"
+            )
+
+    def collect_errors(
+        self, obj: dict, path: str, errors: List[FieldError], keys: Dict[str, str]
+    ):
+        """
+        Appends to 'errors' every problem that check_fields and the field
+        validators would raise for obj, recursing into sub-models. 'keys'
+        maps field names to their alias in obj, if any.
+        """
+        for field in self.fields:
+            field_path = f"{path}.{keys.get(field.name, field.name)}"
+            value = obj.get(field.name)
+            if field.is_unset(value):
+                if not field.optional:
+                    errors.append(
+                        FieldError(
+                            path=field_path,
+                            error=FieldNotFound,
+                            message=f"Field '{self.model_name}.{field.name}' was expected but not provided.",
+                        )
+                    )
+                continue
+            if field.validator is None:
+                continue
+            if field.is_model:
+                _collect_model_errors(
+                    obj=value,
+                    schema=field.schema,
+                    is_list=field.is_list,
+                    path=field_path,
+                    errors=errors,
+                )
+                continue
+            try:
+                field.validator(value)
+            except VALIDATION_ERRORS as exc:
+                errors.append(
+                    FieldError(path=field_path, error=type(exc), message=str(exc))
+                )
+        for name in obj:
+            if name not in self.field_names:
+                errors.append(
+                    FieldError(
+                        path=f"{path}.{name}",
+                        error=UnexpectedField,
+                        message=f"Unexpected field provided: '{self.model_name}.{name}'",
+                    )
+                )
+
+
+def _is_model(schema) -> bool:
+    return isinstance(schema, type) and issubclass(schema, ValidatedModel)
+
+
+def _type_mismatch(obj, schema: type, path: str) -> FieldError:
+    # As raised by validators._validate_against_schema
+    return FieldError(
+        path=path,
+        error=TypeMismatch,
+        message=f"Item '{obj}' (type '{type(obj).__name__}') was expected to be of type '{schema.__name__}'",
+    )
+
+
+def _collect_model_errors(
+    obj,
+    schema: Type[ValidatedModel],
+    is_list: bool,
+    path: str,
+    errors: List[FieldError],
+):
+    if is_list:
+        if type(obj) is not list:
+            errors.append(_type_mismatch(obj=obj, schema=list, path=path))
+            return
+        for index, item in enumerate(obj):
+            _collect_model_errors(
+                obj=item,
+                schema=schema,
+                is_list=False,
+                path=f"{path}[{index}]",
+                errors=errors,
+            )
+    elif type(obj) is dict:
+        schema.validation_plan().collect_errors(
+            obj=obj, path=path, errors=errors, keys={}
+        )
+    elif type(obj) is not schema:
+        errors.append(_type_mismatch(obj=obj, schema=schema, path=path))
+
+
+def _check_unexpected_fields(plan: ValidationPlan, obj: dict):
+    # As the required fields, unexpected fields of the top-level obj are
+    # reported as a ValidationError
+    try:
+        plan.check_unexpected_fields(obj)
+    except UnexpectedField as exc:
+        raise ValidationError(message=str(exc)) from None
+
+
+def _check_optional_annotations(model: type):
+    # Dataclasses that are recreated with __slots__ no longer hold their
+    # Field objects as class attributes, but do hold __dataclass_fields__
+    dataclass_fields = model.__dict__.get("__dataclass_fields__", model.__dict__)
+    for name, annotation in model.__dict__.get("__annotations__", {}).items():
+        default = dataclass_fields.get(name)
+        metadata = (
+            ValidationMetadata.from_field(default)
+            if isinstance(default, Field)
+            else DEFAULT_METADATA
+        )
+        if _is_optional(annotation) is not bool(metadata.optional):
             if metadata.optional:
-                if (value == metadata.default) or (value is None):
-                    continue
-            if not metadata.validator:
+                message = "has optional=True but does not use typing.Optional."
+            else:
+                message = "uses typing.Optional but has not set optional to True in validate_against_schema."
+            raise InconsistentOptionalField(
+                f"Field '{model.__name__}.{name}' {message}"
+            )
+
+
+def _frozen_setattr(self, name, value):
+    raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+
+def _frozen_delattr(self, name):
+    raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+
+def _freeze(value):
+    _type = type(value)
+    if _type is list or _type is tuple:
+        return tuple(map(_freeze, value))
+    if _type is dict:
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, ValidatedModel):
+        return value.frozen()
+    return value
+
+
+def _thaw(value):
+    _type = type(value)
+    if _type is tuple:
+        return tuple(map(_thaw, value))
+    if _type is MappingProxyType:
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+def _new_frozen(cls: type, values: Dict[str, Any]):
+    frozen = object.__new__(cls.frozen_class())
+    for name, value in values.items():
+        object.__setattr__(frozen, name, _freeze(value))
+    return frozen
+
+
+def _frozen_reduce(self):
+    # Frozen classes are created at runtime and read-only mappings cannot be
+    # pickled, so frozen models are pickled (and copied) via their model class
+    values = {field.name: _thaw(getattr(self, field.name)) for field in fields(self)}
+    return _new_frozen, (type(self).__bases__[0], values)
+
+
+class ValidatedModel:
+    __slots__ = ()
+    __frozen__ = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _check_optional_annotations(cls)
+
+    @classmethod
+    def validation_plan(cls) -> ValidationPlan:
+        try:
+            return cls.__dict__[VALIDATION_PLAN]
+        except KeyError:
+            plan = ValidationPlan.compile(cls)
+            setattr(cls, VALIDATION_PLAN, plan)
+            return plan
+
+    def __post_init__(self):
+        for field in self.validation_plan().validated_fields:
+            value = getattr(self, field.name)
+            if field.optional and field.is_unset(value):
                 continue
             with handle_validation_errors(obj=self, field=field.name):
-                self.__dict__[field.name] = metadata.validator(value)
+                setattr(self, field.name, field.validator(value))
 
     @classmethod
-    def parse_obj(cls: Type[ModelType], obj: dict) -> ModelType:
-        _stripped_obj = strip_empty_json_paths(obj)
-        for field in fields(cls):
-            metadata = ValidationMetadata.from_field(field)
-            if field.name.endswith("_") and field.name[:-1] in _stripped_obj:
-                _stripped_obj[field.name] = _stripped_obj.pop(field.name[:-1], None)
-            if field.name not in _stripped_obj and not metadata.optional:
+    def frozen_class(cls: Type[ModelType]) -> Type[ModelType]:
+        """
+        A subclass of this model (with the same __slots__) whose instances
+        cannot be assigned to, created once per model
+        """
+        if cls.__frozen__:
+            return cls
+        try:
+            return cls.__dict__["__frozen_class__"]
+        except KeyError:
+            frozen_cls = type(cls)(
+                f"Frozen{cls.__name__}",
+                (cls,),
+                {
+                    "__slots__": (),
+                    "__frozen__": True,
+                    "__module__": cls.__module__,
+                    "__setattr__": _frozen_setattr,
+                    "__delattr__": _frozen_delattr,
+                    "__reduce__": _frozen_reduce,
+                },
+            )
+            setattr(cls, "__frozen_class__", frozen_cls)
+            return frozen_cls
+
+    def frozen(self: ModelType) -> ModelType:
+        """
+        Returns a deeply immutable copy of this model, which can be cached and
+        shared between threads: sub-models are frozen, lists become tuples
+        and dicts become read-only mappings. Validation is not repeated.
+        """
+        if self.__frozen__:
+            return self
+        return _new_frozen(
+            type(self),
+            {field.name: getattr(self, field.name) for field in fields(self)},
+        )
+
+    @classmethod
+    def parse_frozen(cls: Type[ModelType], obj: dict) -> ModelType:
+        """As parse_obj, but returns a frozen model"""
+        return cls.parse_obj(obj).frozen()
+
+    @classmethod
+    def _construct(cls: Type[ModelType], obj: dict) -> ModelType:
+        # Builds the model and its sub-models from obj as is, without running
+        # __post_init__ or any validator
+        plan = cls.validation_plan()
+        model = object.__new__(cls)
+        for field in plan.fields:
+            value = obj.get(field.name, field.initial)
+            if field.is_model:
+                construct = field.schema._construct
+                if field.is_list and type(value) is list:
+                    value = [
+                        construct(item) if type(item) is dict else item
+                        for item in value
+                    ]
+                elif type(value) is dict:
+                    value = construct(value)
+            object.__setattr__(model, field.name, value)
+        return model
+
+    @classmethod
+    def _construct_dict(cls, obj: dict) -> dict:
+        # The equivalent of asdict(cls._construct(obj)) with all None values
+        # omitted, i.e. of validate_dict without running any validator
+        plan = cls.validation_plan()
+        constructed = {}
+        for field in plan.fields:
+            value = obj.get(field.name, field.initial)
+            if value is None:
+                continue
+            if field.is_model:
+                construct_dict = field.schema._construct_dict
+                if field.is_list and type(value) is list:
+                    value = [
+                        construct_dict(item) if type(item) is dict else item
+                        for item in value
+                    ]
+                elif type(value) is dict:
+                    value = construct_dict(value)
+            constructed[field.name] = value
+        return constructed
+
+    @classmethod
+    def _prepare_obj(cls, obj: dict, owned: bool = False) -> dict:
+        # An owned obj has already been stripped by the caller's conversion,
+        # so it is used (and its aliases replaced) as is rather than copied
+        plan = cls.validation_plan()
+        _stripped_obj = obj if owned else strip_empty_json_paths(obj)
+        for alias, field_name in plan.aliases.items():
+            if alias in _stripped_obj:
+                _stripped_obj[field_name] = _stripped_obj.pop(alias)
+        for field in plan.required_fields:
+            if field.name not in _stripped_obj:
                 raise ValidationError(
                     message=f"Field '{cls.__name__}.{field.name}' was expected but not provided."
                 )
-        return cls(**_stripped_obj)
+        _check_unexpected_fields(plan=plan, obj=_stripped_obj)
+        return _stripped_obj
+
+    @classmethod
+    def parse_obj(
+        cls: Type[ModelType], obj: dict, trusted: bool = False, _owned: bool = False
+    ) -> ModelType:
+        """
+        Validates obj and returns the model. obj itself is not modified.
+
+        With trusted=True, obj is known to be valid (e.g. it passed validation
+        in an earlier run), so only the top-level fields are checked (that
+        none are missing or unexpected) and the field validators are not run.
+        The model built from an obj that is not valid is undefined.
+
+        _owned=True is for the conversions, whose obj is already the result of
+        strip_empty_json_paths and is theirs to modify: it is then parsed
+        without being copied, and its aliases are replaced in place.
+        """
+        prepared = cls._prepare_obj(obj, owned=_owned)
+        lap(PARSE)
+        model = cls._construct(prepared) if trusted else cls(**prepared)
+        lap(VALIDATE)
+        return model
+
+    @classmethod
+    def parse_dict(cls, obj: dict, trusted: bool = False, _owned: bool = False) -> dict:
+        """As parse_obj, but returns the result of validate_dict"""
+        prepared = cls._prepare_obj(obj, owned=_owned)
+        lap(PARSE)
+        if trusted:
+            validated = cls._construct_dict(prepared)
+        else:
+            validated = cls.validate_dict(prepared)
+        lap(VALIDATE)
+        return validated
+
+    @classmethod
+    def collect_errors(cls, obj: dict) -> List[FieldError]:
+        """
+        Validates obj as parse_obj would, but rather than raising on the first
+        problem, walks all of obj once and returns every problem found as a
+        FieldError. An empty list means that parse_obj would succeed.
+        """
+        if type(obj) is not dict:
+            return [_type_mismatch(obj=obj, schema=dict, path=cls.__name__)]
+        plan = cls.validation_plan()
+        stripped_obj = strip_empty_json_paths(obj)
+        for alias, field_name in plan.aliases.items():
+            if alias in stripped_obj:
+                stripped_obj[field_name] = stripped_obj.pop(alias)
+        errors = []
+        plan.collect_errors(
+            obj=stripped_obj,
+            path=cls.__name__,
+            errors=errors,
+            keys={field_name: alias for alias, field_name in plan.aliases.items()},
+        )
+        return errors
+
+    @classmethod
+    def validate_dict(cls, obj: dict) -> dict:
+        """
+        Applies the same validation as cls(**obj) but without building any
+        models: the result is the equivalent of asdict(cls(**obj)) with all
+        None values omitted. Unexpected fields raise a ValidationError, as
+        they do in parse_obj.
+        """
+        plan = cls.validation_plan()
+        _check_unexpected_fields(plan=plan, obj=obj)
+        validated = {}
+        for field in plan.fields:
+            value = obj.get(field.name, field.initial)
+            if field.validator and not (field.optional and field.is_unset(value)):
+                try:
+                    value = field.dict_validator(value)
+                except (*VALIDATION_ERRORS, ValidationError) as exc:
+                    raise wrap_validation_error(
+                        exc=exc, model_name=plan.model_name, field=field.name
+                    ) from None
+            if value is not None:
+                validated[field.name] = value
+        return validated
 
 
 DEFAULT_METADATA = ValidationMetadata()
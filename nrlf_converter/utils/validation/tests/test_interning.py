@@ -0,0 +1,120 @@
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from nrlf_converter import nrl_to_r4, nrl_to_r4_parsed
+from nrlf_converter.nrl.document_pointer import Coding, DocumentPointer
+from nrlf_converter.utils.stats import CacheStats
+from nrlf_converter.utils.validation.errors import ValidationError
+from nrlf_converter.utils.validation.interning import (
+    InternCache,
+    _structure,
+    disable_interning,
+    enable_interning,
+    intern_stats,
+)
+
+CODING = {"code": "123", "display": "A display", "system": "http://snomed.info/sct"}
+
+
+@pytest.fixture
+def intern_cache():
+    intern_cache = enable_interning()
+    yield intern_cache
+    disable_interning()
+
+
+def _build_coding(obj: dict):
+    return lambda: Coding(**obj)
+
+
+def test__structure():
+    assert _structure({"a": 1, "b": [{"c": "d"}]}) == _structure(
+        {"b": [{"c": "d"}], "a": 1}
+    )
+    assert _structure({"a": 1}) != _structure({"a": True})
+    assert _structure({"a": [1, 2]}) != _structure({"a": [2, 1]})
+    assert _structure({"a": {}}) != _structure({"a": []})
+
+
+def test_intern_cache_returns_shared_frozen_models():
+    cache = InternCache(maxsize=2)
+    coding = cache.intern(schema=Coding, obj=CODING, validate=_build_coding(CODING))
+    assert cache.intern(schema=Coding, obj=dict(CODING), validate=None) is coding
+    assert isinstance(coding, Coding)
+    with pytest.raises(FrozenInstanceError):
+        coding.code = "456"
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.currsize) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_intern_cache_is_bounded():
+    cache = InternCache(maxsize=2)
+    objs = [{**CODING, "code": str(i)} for i in range(3)]
+    for obj in objs:
+        cache.intern(schema=Coding, obj=obj, validate=_build_coding(obj))
+    assert cache.stats().currsize == 2
+
+    # The least recently used is evicted, so is validated again
+    cache.intern(schema=Coding, obj=objs[0], validate=_build_coding(objs[0]))
+    assert cache.stats().misses == 4
+
+    cache.clear()
+    assert cache.stats() == CacheStats(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_intern_cache_does_not_cache_errors():
+    cache = InternCache()
+    obj = {**CODING, "code": 123}
+    for _ in range(2):
+        with pytest.raises(ValidationError):
+            cache.intern(schema=Coding, obj=obj, validate=_build_coding(obj))
+    assert cache.stats().currsize == 0
+
+
+def test_interning_is_disabled_by_default(document_pointer):
+    assert intern_stats() is None
+    first = DocumentPointer.parse_obj(document_pointer)
+    second = DocumentPointer.parse_obj(document_pointer)
+    assert first.type is not second.type
+    first.type.code = "changed"
+
+
+def test_interning_shares_sub_objects(intern_cache: InternCache, document_pointer):
+    first = DocumentPointer.parse_obj(document_pointer)
+    second = DocumentPointer.parse_obj(document_pointer)
+
+    assert first is not second
+    assert first.type is second.type
+    assert first.content[0].format is second.content[0].format
+    with pytest.raises(FrozenInstanceError):
+        first.type.code = "changed"
+    assert intern_stats().hits > 0
+
+
+def test_interning_does_not_change_the_output(
+    intern_cache: InternCache, document_pointers, nhs_number, asid
+):
+    disable_interning()
+    expected = [
+        nrl_to_r4(document_pointer=pointer, nhs_number=nhs_number, asid=asid)
+        for pointer in document_pointers
+    ]
+
+    enable_interning()
+    for _ in range(2):
+        assert [
+            nrl_to_r4(document_pointer=pointer, nhs_number=nhs_number, asid=asid)
+            for pointer in document_pointers
+        ] == expected
+        assert [
+            nrl_to_r4_parsed(
+                document_pointer=DocumentPointer.parse_frozen(pointer),
+                nhs_number=nhs_number,
+                asid=asid,
+            )
+            for pointer in document_pointers
+        ] == expected
+    assert intern_stats().hit_rate > 0.5
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import pickle
 from contextlib import nullcontext as does_not_raise
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, asdict, dataclass
 from datetime import datetime
-from typing import Literal
+from datetime import datetime as dt
+from types import MappingProxyType
+from typing import Literal, Optional
 
+import hypothesis
 import pytest
+from hypothesis.strategies import datetimes, from_regex, one_of, sampled_from, text
 
-from nrlf_converter.utils.validation.errors import ValidationError
+from nrlf_converter.nrl.constants import UPDATE_DATE_FORMAT
+from nrlf_converter.utils.validation.errors import (
+    FieldError,
+    FieldNotFound,
+    InconsistentOptionalField,
+    InvalidValue,
+    TypeMismatch,
+    UnexpectedField,
+    ValidationError,
+)
 from nrlf_converter.utils.validation.model import ValidatedModel
 from nrlf_converter.utils.validation.validators import (
+    R4_DATETIME_REGEX,
+    RFC_1123_REGEX,
+    _validate_datetime,
     validate_against_schema,
     validate_datetime,
     validate_literal,
@@ -38,6 +55,11 @@ class Container(ValidatedModel):
     item: Item = validate_against_schema(schema=Item)
 
 
+@dataclass
+class Loose(ValidatedModel):
+    value: dict = validate_against_schema(schema=dict)
+
+
 A_STR = "i am a string"
 A_LIST_OF_INT = [123, 456]
 A_LIST_OF_MIXED = [123, "not an int"]
@@ -97,3 +119,298 @@ def test_validated_model(
 
     with expectation:
         Container(**container)
+
+
+@pytest.mark.parametrize("str_value", [A_STR, A_LIST_OF_INT])
+@pytest.mark.parametrize("list_int_value", [A_LIST_OF_INT, A_LIST_OF_MIXED, A_STR])
+@pytest.mark.parametrize("iso_datetime_value", [AN_ISO_DATETIME, A_STR])
+@pytest.mark.parametrize("literal_value", [LITERAL_VALUE, A_STR])
+def test_collect_errors(str_value, list_int_value, iso_datetime_value, literal_value):
+    _property = {
+        "str_value": str_value,
+        "list_int_value": list_int_value,
+        "iso_datetime_value": iso_datetime_value,
+        "non_iso_datetime_value": A_NON_ISO_DATETIME,
+        "literal_value": literal_value,
+    }
+    errors = Container.collect_errors(
+        {"item": {"property": _property}, "items": [{"property": _property}]}
+    )
+
+    expected_errors = {
+        (field, error)
+        for field, error, value, valid_value in (
+            ("str_value", TypeMismatch, str_value, A_STR),
+            ("list_int_value", TypeMismatch, list_int_value, A_LIST_OF_INT),
+            ("iso_datetime_value", InvalidValue, iso_datetime_value, AN_ISO_DATETIME),
+            ("literal_value", InvalidValue, literal_value, LITERAL_VALUE),
+        )
+        if value != valid_value
+    }
+    assert sorted((error.path, error.error) for error in errors) == sorted(
+        (f"{path}.{field}", error)
+        for path in ("Container.item.property", "Container.items[0].property")
+        for field, error in expected_errors
+    )
+
+    expectation = pytest.raises(ValidationError) if errors else does_not_raise()
+    with expectation:
+        Container.parse_obj(
+            {"item": {"property": _property}, "items": [{"property": _property}]}
+        )
+
+
+def test_collect_errors_for_missing_unexpected_and_mistyped_fields():
+    errors = Container.collect_errors(
+        {
+            "item": {"property": {"str_value": A_STR, "unexpected": "value"}},
+            "items": [{"property": "not a property"}, "not an item"],
+            "unexpected": "value",
+        }
+    )
+    assert [(error.path, error.error) for error in errors] == [
+        ("Container.items[0].property", TypeMismatch),
+        ("Container.items[1]", TypeMismatch),
+        ("Container.item.property.list_int_value", FieldNotFound),
+        ("Container.item.property.iso_datetime_value", FieldNotFound),
+        ("Container.item.property.non_iso_datetime_value", FieldNotFound),
+        ("Container.item.property.literal_value", FieldNotFound),
+        ("Container.item.property.unexpected", UnexpectedField),
+        ("Container.unexpected", UnexpectedField),
+    ]
+    assert all(type(error) is FieldError for error in errors)
+    assert str(errors[-1]) == (
+        "'UnexpectedField' encountered on 'Container.unexpected':"
+        " Unexpected field provided: 'Container.unexpected'"
+    )
+
+    # Empty values are stripped, as by parse_obj, so are reported as missing
+    assert Loose.collect_errors({"value": {}}) == [
+        FieldError(
+            path="Loose.value",
+            error=FieldNotFound,
+            message="Field 'Loose.value' was expected but not provided.",
+        )
+    ]
+    assert [error.error for error in Loose.collect_errors("not a dict")] == [
+        TypeMismatch
+    ]
+
+
+def test_validation_plan_is_compiled_once_per_model():
+    plan = Property.validation_plan()
+    assert Property.validation_plan() is plan
+    assert Item.validation_plan() is not plan
+    assert plan.field_names == {
+        "str_value",
+        "list_int_value",
+        "iso_datetime_value",
+        "non_iso_datetime_value",
+        "literal_value",
+    }
+    assert {field.name for field in Container.validation_plan().required_fields} == {
+        "items",
+        "item",
+    }
+    assert Container.validation_plan().fields[0].schema is Item
+    assert Container.validation_plan().fields[0].is_list
+    assert Container.validation_plan().fields[0].is_model
+    assert not Property.validation_plan().fields[0].is_model
+
+
+def test_inconsistent_optional_field_raised_at_class_definition():
+    with pytest.raises(InconsistentOptionalField):
+
+        @dataclass
+        class OptionalAnnotationOnly(ValidatedModel):
+            value: Optional[str] = validate_against_schema(schema=str)
+
+    with pytest.raises(InconsistentOptionalField):
+
+        @dataclass
+        class OptionalMetadataOnly(ValidatedModel):
+            value: str = validate_against_schema(schema=str, optional=True)
+
+
+def test_unexpected_field():
+    _property = {
+        "str_value": A_STR,
+        "list_int_value": A_LIST_OF_INT,
+        "iso_datetime_value": AN_ISO_DATETIME,
+        "non_iso_datetime_value": A_NON_ISO_DATETIME,
+        "literal_value": LITERAL_VALUE,
+    }
+    Item(property=_property)
+
+    with pytest.raises(ValidationError) as exc:
+        Item(property={**_property, "unexpected": "value"})
+    assert "'UnexpectedField'" in str(exc.value)
+    assert "Property.unexpected" in str(exc.value)
+
+
+def test_frozen_model():
+    _property = {
+        "str_value": A_STR,
+        "list_int_value": A_LIST_OF_INT,
+        "iso_datetime_value": AN_ISO_DATETIME,
+        "non_iso_datetime_value": A_NON_ISO_DATETIME,
+        "literal_value": LITERAL_VALUE,
+    }
+    container = Container.parse_obj(
+        {"item": {"property": _property}, "items": [{"property": _property}]}
+    )
+    frozen = container.frozen()
+
+    assert isinstance(frozen, Container)
+    assert type(frozen) is Container.frozen_class()
+    assert frozen.frozen() is frozen
+    assert type(frozen.item.property) is Property.frozen_class()
+    assert frozen.items[0].property.list_int_value == tuple(A_LIST_OF_INT)
+    assert type(frozen.items) is tuple
+
+    with pytest.raises(FrozenInstanceError):
+        frozen.item = None
+    with pytest.raises(FrozenInstanceError):
+        frozen.item.property.str_value = "changed"
+    with pytest.raises(FrozenInstanceError):
+        del frozen.items
+    with pytest.raises(TypeError):
+        frozen.items[0].property.list_int_value[0] = 0
+
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+    assert Container.parse_frozen(asdict(container)) == frozen
+
+    # The model that was frozen is unchanged and remains mutable
+    assert type(container.items) is list
+    container.item = None
+
+
+def test_frozen_model_dicts_are_read_only():
+    frozen = Loose.parse_frozen({"value": {"nested": {"key": ["value"]}}})
+    assert type(frozen.value) is MappingProxyType
+    assert type(frozen.value["nested"]) is MappingProxyType
+    assert frozen.value["nested"]["key"] == ("value",)
+    with pytest.raises(TypeError):
+        frozen.value["nested"]["key"] = "changed"
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+def test_parse_owned():
+    _property = {
+        "str_value": A_STR,
+        "list_int_value": A_LIST_OF_INT,
+        "iso_datetime_value": AN_ISO_DATETIME,
+        "non_iso_datetime_value": A_NON_ISO_DATETIME,
+        "literal_value": LITERAL_VALUE,
+    }
+    expected = Item.parse_obj({"property": _property})
+
+    owned = {"property": dict(_property)}
+    assert Item.parse_obj(owned, _owned=True) == expected
+    assert Item.parse_dict(owned, _owned=True) == asdict(expected)
+    # Parsing does not empty the obj, so it can be parsed again
+    assert owned == {"property": _property}
+
+
+def test_parse_trusted():
+    _property = {
+        "str_value": A_STR,
+        "list_int_value": A_LIST_OF_INT,
+        "iso_datetime_value": AN_ISO_DATETIME,
+        "non_iso_datetime_value": A_NON_ISO_DATETIME,
+        "literal_value": LITERAL_VALUE,
+    }
+    container = {"item": {"property": _property}, "items": [{"property": _property}]}
+
+    trusted = Container.parse_obj(container, trusted=True)
+    assert trusted == Container.parse_obj(container)
+    assert type(trusted.items[0].property) is Property
+    assert Container.parse_dict(container, trusted=True) == Container.parse_dict(
+        container
+    )
+
+    # The field validators are not run
+    invalid = {**_property, "literal_value": "another value"}
+    assert (
+        Item.parse_obj({"property": invalid}, trusted=True).property.literal_value
+        == "another value"
+    )
+    with pytest.raises(ValidationError):
+        Item.parse_obj({"property": invalid})
+    # But the required top-level fields are still checked
+    with pytest.raises(ValidationError):
+        Item.parse_obj({}, trusted=True)
+
+
+def _reference_validate_datetime(obj, date_format: str = None):
+    # The implementation of _validate_datetime prior to the fast paths
+    _obj = obj.rstrip("Z")
+    try:
+        if date_format is None:
+            dt.fromisoformat(_obj)
+        else:
+            dt.strptime(_obj, date_format)
+    except (ValueError, TypeError):
+        result = R4_DATETIME_REGEX.match(_obj)
+        if result is None:
+            raise InvalidValue(f"Could not parse datetime from '{obj}'.") from None
+    return obj
+
+
+def _is_valid(validate, obj, date_format):
+    try:
+        validate(obj, date_format=date_format)
+    except InvalidValue:
+        return False
+    return True
+
+
+DATETIME_EDGE_CASES = [
+    "Tue, 13 Sep 2022 10:14:53 GMT",
+    "tue, 13 sep 2022 10:14:53 GMT",
+    "Tue, 3 Sep 2022 10:14:53 GMT",
+    "Tue,  13 Sep 2022 10:14:53 GMT",
+    "Tue, 13 Sep 2022 10:14:53 GMT\n",
+    "Tue, 29 Feb 2022 10:14:53 GMT",
+    "Tue, 29 Feb 2024 10:14:53 GMT",
+    "Tue, 31 Apr 2024 10:14:53 GMT",
+    "Tue, 13 Sep 0000 10:14:53 GMT",
+    "Tue, 13 Sep 2022 24:14:53 GMT",
+    "Tue, 13 Sep 2022 10:60:53 GMT",
+    "Tue, 13 Sep 2022 10:14:60 GMT",
+    "Tue, 13 Sep 2022 10:14:61 GMT",
+    "Tue, 13 Sep 2022 10:14:62 GMT",
+    "Xyz, 13 Sep 2022 10:14:53 GMT",
+    "2022-09-13T10:14:53+00:00",
+    "2022-09-13T10:14:53Z",
+    "0000-09-13",
+    "2022",
+    "202",
+    "",
+    "Z",
+    "not a date",
+    "٢٠٢٢-09-13",
+]
+
+
+@pytest.mark.parametrize("obj", DATETIME_EDGE_CASES)
+@pytest.mark.parametrize("date_format", [None, UPDATE_DATE_FORMAT, "%Y:%m:%d"])
+def test_validate_datetime_equals_reference(obj, date_format):
+    assert _is_valid(_validate_datetime, obj, date_format) is _is_valid(
+        _reference_validate_datetime, obj, date_format
+    )
+
+
+@hypothesis.given(
+    obj=one_of(
+        text(),
+        from_regex(RFC_1123_REGEX, fullmatch=True),
+        datetimes().map(lambda _dt: _dt.strftime(UPDATE_DATE_FORMAT)),
+        datetimes().map(lambda _dt: _dt.isoformat()),
+    ),
+    date_format=sampled_from([None, UPDATE_DATE_FORMAT]),
+)
+def test_validate_datetime_equals_reference_for_any_str(obj, date_format):
+    assert _is_valid(_validate_datetime, obj, date_format) is _is_valid(
+        _reference_validate_datetime, obj, date_format
+    )
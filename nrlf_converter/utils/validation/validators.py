@@ -1,24 +1,37 @@
 import re
+from calendar import monthrange
 from dataclasses import Field
 from dataclasses import field as dataclasses_field
-from dataclasses import fields
 from datetime import datetime as dt
-from functools import partial
+from functools import lru_cache, partial
 from typing import Type, TypeVar
 
-from .errors import (
-    FieldNotFound,
-    InconsistentOptionalField,
-    InvalidValue,
-    TypeMismatch,
-    UnexpectedField,
-)
+from nrlf_converter.nrl.constants import UPDATE_DATE_FORMAT
+
+from . import interning
+from .errors import InvalidValue, TypeMismatch
 from .model import DEFAULT_NOT_SET, ValidatedModel, ValidationMetadata
 
 R4_DATETIME_REGEX = re.compile(
     "([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[0-1])(T([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\\.[0-9]+)?(Z|(\\+|-)((0[0-9]|1[0-3]):[0-5][0-9]|14:00)))?)?)?"
 )
 
+R4_YEAR_REGEX = re.compile("[0-9]{4}")
+RFC_1123_REGEX = re.compile(
+    "(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun), ([0-9]{2}) "
+    "(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) "
+    "([0-9]{4}) ([0-9]{2}):([0-9]{2}):([0-9]{2}) GMT"
+)
+MONTHS = {
+    month: i
+    for i, month in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun")
+        + ("Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        start=1,
+    )
+}
+DATETIME_CACHE_SIZE = 4096
+
 SchemaType = TypeVar("SchemaType")
 ObjType = TypeVar("ObjType")
 
@@ -30,6 +43,10 @@ def _get_loose_schema(item):
         return str
 
 
+def _is_model(schema) -> bool:
+    return isinstance(schema, type) and issubclass(schema, ValidatedModel)
+
+
 def field_validator(obj, optional=False, default=DEFAULT_NOT_SET, **kwargs) -> Field:
     metadata = ValidationMetadata(
         validator=partial(obj, **kwargs), optional=optional, default=default
@@ -45,51 +62,47 @@ def validate_against_schema(
     is_list=False,
     optional=False,
     default=DEFAULT_NOT_SET,
+    intern=False,
 ) -> Field:
+    """
+    With intern=True, models validated from dicts are shared (and frozen)
+    while interning is enabled (see interning.enable_interning)
+    """
     return field_validator(
         _validate_against_schema,
         schema=schema,
         is_list=is_list,
         optional=optional,
         default=default,
+        intern=intern,
     )
 
 
-def _is_optional(annotation):
-    return "Optional[" in str(annotation)
+def _build_model(obj: dict, schema: Type[SchemaType]) -> SchemaType:
+    schema.validation_plan().check_fields(obj)
+    return schema(**obj)
 
 
 def _validate_against_schema(
-    obj: ObjType, schema: Type[SchemaType], is_list=False
+    obj: ObjType, schema: Type[SchemaType], is_list=False, as_dict=False, intern=False
 ) -> SchemaType:
     _schema = None
     if is_list:
         _schema = schema
         schema = list
 
-    if type(obj) is dict and schema is not dict:
-        schema_fields = fields(schema)
-        for field in schema_fields:
-            value = obj.get(field.name)
-            metadata = ValidationMetadata.from_field(field)
-            if (value == metadata.default or value is None) and not metadata.optional:
-                raise FieldNotFound(
-                    f"Field '{schema.__name__}.{field.name}' was expected but not provided."
-                )
-            if _is_optional(field.type) is not metadata.optional:
-                if metadata.optional:
-                    message = "has optional=True but does not use typing.Optional."
-                else:
-                    message = "uses typing.Optional but has not set optional to True in validate_against_schema."
-                raise InconsistentOptionalField(
-                    f"Field '{schema.__name__}.{field.name}' {message}"
-                )
-        for field_name in obj.keys():
-            if field_name not in (field.name for field in schema_fields):
-                raise UnexpectedField(
-                    f"Unexpected field provided: '{schema.__name__}.{field_name}'"
-                )
-        obj = schema(**obj)
+    if type(obj) is dict and _is_model(schema):
+        if as_dict:
+            schema.validation_plan().check_fields(obj)
+            return schema.validate_dict(obj)
+        intern_cache = interning.INTERN_CACHE if intern else None
+        if intern_cache is None:
+            return _build_model(obj=obj, schema=schema)
+        return intern_cache.intern(
+            schema=schema,
+            obj=obj,
+            validate=partial(_build_model, obj=obj, schema=schema),
+        )
 
     if type(obj) is not schema and _get_loose_schema(obj) is not schema:
         raise TypeMismatch(
@@ -97,7 +110,12 @@ def _validate_against_schema(
         )
 
     if is_list:
-        obj = [_validate_against_schema(obj=item, schema=_schema) for item in obj]
+        obj = [
+            _validate_against_schema(
+                obj=item, schema=_schema, as_dict=as_dict, intern=intern
+            )
+            for item in obj
+        ]
     return obj
 
 
@@ -119,14 +137,58 @@ def validate_datetime(date_format: str = None, optional=False):
     )
 
 
-def _validate_datetime(obj, date_format: str = None):
-    _obj = obj.rstrip("Z")
+def _starts_with_r4_year(obj: str) -> bool:
+    # Equivalent to R4_DATETIME_REGEX.match, which accepts any string
+    # starting with a four digit year other than '0000'
+    return R4_YEAR_REGEX.match(obj) is not None and not obj.startswith("0000")
+
+
+def _is_rfc_1123_datetime(obj: str) -> bool:
+    # Fast path for the canonical form of UPDATE_DATE_FORMAT, such as
+    # 'Tue, 13 Sep 2022 10:14:53 GMT'. Other forms fall back to strptime.
+    result = RFC_1123_REGEX.fullmatch(obj)
+    if result is None:
+        return False
+    day, month, year, hour, minute, second = result.groups()
+    year, day = int(year), int(day)
+    return (
+        year >= 1
+        and 1 <= day <= monthrange(year, MONTHS[month])[1]
+        and int(hour) <= 23
+        and int(minute) <= 59
+        and int(second) <= 59
+    )
+
+
+def _parses_as_datetime(obj: str, date_format: str = None) -> bool:
     try:
         if date_format is None:
-            dt.fromisoformat(_obj)
+            dt.fromisoformat(obj)
         else:
-            dt.strptime(_obj, date_format)
+            dt.strptime(obj, date_format)
     except (ValueError, TypeError):
+        return False
+    return True
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _is_valid_datetime(obj: str, date_format: str = None) -> bool:
+    _obj = obj.rstrip("Z")
+    return (
+        _starts_with_r4_year(_obj)
+        or (date_format == UPDATE_DATE_FORMAT and _is_rfc_1123_datetime(_obj))
+        or _parses_as_datetime(_obj, date_format=date_format)
+    )
+
+
+def _validate_datetime(obj, date_format: str = None):
+    if type(obj) is str:
+        if not _is_valid_datetime(obj, date_format):
+            raise InvalidValue(f"Could not parse datetime from '{obj}'.")
+        return obj
+
+    _obj = obj.rstrip("Z")
+    if not _parses_as_datetime(_obj, date_format=date_format):
         result = R4_DATETIME_REGEX.match(_obj)
         if result is None:
             raise InvalidValue(f"Could not parse datetime from '{obj}'.") from None